@@ -9,21 +9,79 @@ import sys
 from pathlib import Path
 from PIL import Image, ImageEnhance, ImageOps
 import numpy as np
-from rembg import remove, new_session
 import cv2
 
+from image_ops import (
+    predict_mask, apply_mask, create_variants, crop_to_alpha,
+    get_inference_settings, inference_copy, upsample_mask,
+    get_tile_settings, needs_tiling, tiled_predict_mask,
+    get_enhance_settings, enhance_rgba
+)
+from batch_runner import find_images, run_batch, run_pipeline, parse_batch_args
+from model_sessions import acquire_session, release_session, quantized_model_path
+from stage_timer import timed
+
 class AdvancedClothingBgRemover:
-    def __init__(self, model_name='u2net_cloth_seg'):
+    def __init__(self, model_name='u2net_cloth_seg', quantized=False):
         self.model_name = model_name
-        self.session = new_session(model_name)
-        print(f"✅ Model yüklendi: {model_name}")
+        # INT8 model istenmişse ve yerelde varsa onu kullan (quantize_models.py)
+        self.quantized = bool(quantized and quantized_model_path(model_name))
+        if quantized and not self.quantized:
+            print(f"⚠️  {model_name} için INT8 model bulunamadı, FP32 kullanılıyor")
+        # Maske önbelleği anahtarı: FP32 ve INT8 maskeleri karışmasın
+        self.model_key = f"{model_name}:int8" if self.quantized else model_name
+        # Aynı modeli kullanan remover'lar süreç içinde tek oturumu paylaşır
+        self.session = acquire_session(model_name, quantized=self.quantized)
+        # API sunucusu mikro-batch zamanlayıcısı ve maske önbelleği bağlayabilir
+        self.scheduler = None
+        self.mask_cache = None
+        # Uyarlanır çıkarım ayarları (config.json inference_settings)
+        self.inference_settings = get_inference_settings()
+        # Uyarlanır modda çok büyük görüntüler döşemeli işlenir (config.json tile_settings)
+        self.tile_settings = get_tile_settings()
+        # İyileştirme faktörleri (config.json enhance_settings.profiles.ecommerce)
+        self.enhance_settings = get_enhance_settings('ecommerce')
+        print(f"✅ Model yüklendi: {self.model_key}")
         
+    def close(self):
+        """
+        Paylaşılan oturum referansını bırak
+        """
+        if self.session is not None:
+            release_session(self.session)
+            self.session = None
+    
+    def predict_mask(self, img):
+        """
+        Maskeyi tahmin et (önbellekte varsa modeli çalıştırma)
+        """
+        if self.mask_cache is not None:
+            return self.mask_cache.get_or_compute(img, self.model_key, self._run_mask_model)
+        return self._run_mask_model(img)
+    
+    def _run_mask_model(self, img):
+        """
+        Modeli çalıştır (zamanlayıcı bağlıysa onun üzerinden)
+        """
+        if self.scheduler is not None:
+            return self.scheduler.predict_mask(img)
+        return predict_mask(self.session, img)
+    
+    @staticmethod
+    def _open_image(image):
+        """
+        Dosya yolu ya da bellekteki PIL görüntüsünü aynı şekilde kabul et
+        """
+        if isinstance(image, Image.Image):
+            return image
+        return Image.open(image)
+    
     def analyze_image(self, image_path):
         """
         Görüntüyü analiz et ve öneriler sun
         """
         try:
-            img = Image.open(image_path)
+            img = self._open_image(image_path)
             width, height = img.size
             aspect_ratio = width / height
             
@@ -54,7 +112,7 @@ class AdvancedClothingBgRemover:
         Görüntüyü rembg için optimize et
         """
         try:
-            img = Image.open(image_path)
+            img = self._open_image(image_path)
             original_size = img.size
             
             # RGB'ye çevir
@@ -65,7 +123,9 @@ class AdvancedClothingBgRemover:
             # Boyut optimizasyonu
             if target_size:
                 if maintain_aspect:
-                    # En-boy oranını koru
+                    # En-boy oranını koru (çağıranın görüntüsünü değiştirme)
+                    if img is image_path:
+                        img = img.copy()
                     img.thumbnail(target_size, Image.Resampling.LANCZOS)
                     print(f"📏 Boyut ayarlandı: {original_size} -> {img.size}")
                 else:
@@ -83,18 +143,35 @@ class AdvancedClothingBgRemover:
             print(f"❌ Ön işleme hatası: {e}")
             return None
     
-    def remove_background_advanced(self, input_path, output_path=None, preprocess=True):
+    def prepare_image(self, image, preprocess=True):
         """
-        Gelişmiş arka plan kaldırma
+        Görüntüyü modele hazırla (decode + EXIF yönü + analiz + ön işleme)
+        Toplu pipeline'da okuma aşaması olarak ayrı çalıştırılır, RGB PIL döndürür
         """
         try:
-            print(f"\n🔄 İşleniyor: {os.path.basename(input_path)}")
+            # Görüntüyü bir kez aç, EXIF yönünü düzelt
+            with timed('decode'):
+                source = ImageOps.exif_transpose(self._open_image(image))
+            
+            with timed('preprocess'):
+                return self._preprocess_source(source, preprocess)
             
+        except Exception as e:
+            print(f"❌ Görüntü hazırlama hatası: {e}")
+            return None
+    
+    def _preprocess_source(self, source, preprocess):
+        """
+        Açılmış görüntüyü analiz et ve (istenirse) model için ön işle
+        """
+        try:
             # Görüntüyü analiz et
-            analysis = self.analyze_image(input_path)
+            analysis = self.analyze_image(source)
             if not analysis:
                 return None
             
+            processed_img = None
+            
             # Ön işleme
             if preprocess:
                 # Optimal boyut hesapla
@@ -107,68 +184,133 @@ class AdvancedClothingBgRemover:
                 print(f"🎯 Hedef boyut: {target_size}x{target_size}")
                 
                 processed_img = self.preprocess_image(
-                    input_path, 
-                    target_size=(target_size, target_size), 
+                    source,
+                    target_size=(target_size, target_size),
                     maintain_aspect=True
                 )
-                
-                if not processed_img:
-                    # Ön işleme başarısızsa orijinal dosyayı kullan
-                    with open(input_path, 'rb') as f:
-                        input_data = f.read()
-                else:
-                    # Ön işlenmiş görüntüyü byte'a çevir
-                    import io
-                    img_byte_arr = io.BytesIO()
-                    processed_img.save(img_byte_arr, format='PNG')
-                    input_data = img_byte_arr.getvalue()
-            else:
-                with open(input_path, 'rb') as f:
-                    input_data = f.read()
             
-            # Arka planı kaldır
+            if processed_img is None:
+                # Ön işleme yoksa ya da başarısızsa orijinal görüntüyü kullan
+                processed_img = source.convert("RGB")
+            
+            return processed_img
+            
+        except Exception as e:
+            print(f"❌ Görüntü hazırlama hatası: {e}")
+            return None
+    
+    def prepare_inference(self, image, preprocess=True, adaptive=False):
+        """
+        (tam görüntü, model girdisi) çiftini hazırla
+        adaptive: kaynak çözünürlük korunur, model yalnızca küçültülmüş kopyayı görür;
+        maske daha sonra upsample_mask ile kaynak boyutuna büyütülür
+        """
+        if not adaptive:
+            processed_img = self.prepare_image(image, preprocess=preprocess)
+            return processed_img, processed_img
+        
+        try:
+            with timed('decode'):
+                source = ImageOps.exif_transpose(self._open_image(image)).convert("RGB")
+            with timed('preprocess'):
+                model_img = inference_copy(source, self.inference_settings['max_side'])
+            print(f"🔬 Uyarlanır çıkarım: {source.size} -> model {model_img.size}")
+            return source, model_img
+            
+        except Exception as e:
+            print(f"❌ Görüntü hazırlama hatası: {e}")
+            return None, None
+    
+    def predict_inference_mask(self, full_img, model_img):
+        """
+        prepare_inference çıktısı için maske tahmini
+        Uyarlanır modda eşiği aşan görüntülerde tam çözünürlükte döşemeli çıkarım
+        yapılır; küçültülmüş kopya kaba maske için kullanılır
+        """
+        if model_img is not full_img and needs_tiling(full_img, self.tile_settings):
+            # Döşeme maskeleri bir daha sorulmaz; maske önbelleğine yazılmaz
+            return tiled_predict_mask(
+                self._run_mask_model, full_img, self.tile_settings, coarse_img=model_img
+            )
+        return self.predict_mask(model_img)
+    
+    def compose_mask(self, full_img, mask):
+        """
+        Maskeyi (gerekirse kaynak çözünürlüğe büyüterek) görüntüye uygula
+        """
+        return apply_mask(full_img, upsample_mask(mask, full_img, self.inference_settings))
+    
+    def remove_background_image(self, image, preprocess=True, adaptive=False):
+        """
+        Gelişmiş arka plan kaldırma (bellek içi)
+        Girdi olarak dosya yolu ya da PIL görüntüsü alır, RGBA PIL görüntüsü döndürür
+        """
+        full_img, model_img = self.prepare_inference(image, preprocess, adaptive)
+        if full_img is None:
+            return None
+        
+        try:
+            # Arka planı kaldır (PNG'ye çevirmeden doğrudan modele ver)
             print("🤖 rembg işlemi başlıyor...")
-            output_data = remove(input_data, session=self.session)
+            with timed('inference'):
+                mask = self.predict_inference_mask(full_img, model_img)
+            
+            with timed('compose'):
+                return self.compose_mask(full_img, mask)
             
+        except Exception as e:
+            print(f"❌ Arka plan kaldırma hatası: {e}")
+            return None
+    
+    def remove_background_advanced(self, input_path, output_path=None, preprocess=True):
+        """
+        Gelişmiş arka plan kaldırma
+        """
+        print(f"\n🔄 İşleniyor: {os.path.basename(input_path)}")
+        
+        result = self.remove_background_image(input_path, preprocess=preprocess)
+        if result is None:
+            return None
+        
+        try:
             # Çıktı dosyası yolu
             if output_path is None:
                 input_file = Path(input_path)
                 output_path = input_file.parent / f"{input_file.stem}_no_bg.png"
             
             # Kaydet
-            with open(output_path, 'wb') as f:
-                f.write(output_data)
+            result.save(output_path, "PNG")
             
             print(f"✅ Arka plan kaldırıldı: {output_path}")
             return str(output_path)
-            
+        
         except Exception as e:
             print(f"❌ Arka plan kaldırma hatası: {e}")
             return None
     
-    def fix_positioning(self, image_path, output_path=None, center_vertically=True, add_padding=True):
+    def fix_positioning_image(self, img, center_vertically=True, add_padding=True, alpha_threshold=0):
         """
-        Görüntü konumlandırmasını düzelt
+        Görüntü konumlandırmasını düzelt (bellek içi)
+        alpha_threshold: nesneye sayılacak en düşük alpha (kenar gürültüsünü yok saymak için)
+        Nesne bulunamazsa ya da hata olursa girdi görüntüsünü aynen döndürür
         """
         try:
-            img = Image.open(image_path).convert("RGBA")
+            if img.mode != "RGBA":
+                img = img.convert("RGBA")
             width, height = img.size
             
             print(f"🔧 Konumlandırma düzeltiliyor: {width}x{height}")
             
             # Alpha kanalından nesne sınırlarını bul
-            alpha = np.array(img)[:,:,3]
-            non_zero_indices = np.where(alpha > 0)
+            object_img, box = crop_to_alpha(img, alpha_threshold)
             
-            if len(non_zero_indices[0]) == 0:
+            if box is None:
                 print("⚠️  Şeffaf olmayan piksel bulunamadı")
-                return image_path
+                return img
             
-            # Nesne sınırları
-            top = np.min(non_zero_indices[0])
-            bottom = np.max(non_zero_indices[0])
-            left = np.min(non_zero_indices[1])
-            right = np.max(non_zero_indices[1])
+            # Nesne sınırları (sağ/alt dahil)
+            left, top = box[0], box[1]
+            right, bottom = box[2] - 1, box[3] - 1
             
             object_height = bottom - top
             object_width = right - left
@@ -197,7 +339,7 @@ class AdvancedClothingBgRemover:
             if center_vertically:
                 # Dikey merkez
                 paste_y = (canvas_size - object_height) // 2
-                # Yatay merkez  
+                # Yatay merkez
                 paste_x = (canvas_size - object_width) // 2
             else:
                 # Üstten %20 boşluk bırak
@@ -205,10 +347,29 @@ class AdvancedClothingBgRemover:
                 paste_x = (canvas_size - object_width) // 2
             
             # Nesneyi yeni konuma yapıştır
-            crop_box = (left, top, right + 1, bottom + 1)
-            object_img = img.crop(crop_box)
             new_canvas.paste(object_img, (paste_x, paste_y), object_img)
             
+            print(f"📏 Yeni boyut: {canvas_size}x{canvas_size}")
+            return new_canvas
+        
+        except Exception as e:
+            print(f"❌ Konumlandırma hatası: {e}")
+            return img
+    
+    def fix_positioning(self, image_path, output_path=None, center_vertically=True, add_padding=True):
+        """
+        Görüntü konumlandırmasını düzelt
+        """
+        try:
+            img = Image.open(image_path).convert("RGBA")
+            new_canvas = self.fix_positioning_image(
+                img,
+                center_vertically=center_vertically,
+                add_padding=add_padding
+            )
+            if new_canvas is img:
+                return image_path
+            
             # Çıktı dosyası
             if output_path is None:
                 input_file = Path(image_path)
@@ -216,44 +377,35 @@ class AdvancedClothingBgRemover:
             
             new_canvas.save(output_path, "PNG")
             print(f"✅ Konumlandırma düzeltildi: {output_path}")
-            print(f"📏 Yeni boyut: {canvas_size}x{canvas_size}")
             
             return str(output_path)
-            
+        
         except Exception as e:
             print(f"❌ Konumlandırma hatası: {e}")
             return image_path
     
+    def enhance_image(self, img):
+        """
+        E-ticaret için görüntüyü iyileştir (bellek içi)
+        """
+        try:
+            # Beyaz zemin + kontrast/parlaklık/doygunluk tek renk dönüşümü +
+            # keskinlik tek evrişim; alpha kanalı korunur
+            return enhance_rgba(img, self.enhance_settings)
+        
+        except Exception as e:
+            print(f"❌ İyileştirme hatası: {e}")
+            return img
+    
     def enhance_for_ecommerce(self, image_path, output_path=None):
         """
         E-ticaret için görüntüyü iyileştir
         """
         try:
             img = Image.open(image_path).convert("RGBA")
-            
-            # Kontrast iyileştirmesi (sadece RGB kanalları)
-            rgb_img = Image.new("RGB", img.size, (255, 255, 255))
-            rgb_img.paste(img, mask=img.split()[3])  # Alpha maskesi ile
-            
-            # Kontrast
-            enhancer = ImageEnhance.Contrast(rgb_img)
-            rgb_img = enhancer.enhance(1.15)
-            
-            # Parlaklık
-            enhancer = ImageEnhance.Brightness(rgb_img)
-            rgb_img = enhancer.enhance(1.05)
-            
-            # Keskinlik
-            enhancer = ImageEnhance.Sharpness(rgb_img)
-            rgb_img = enhancer.enhance(1.1)
-            
-            # Renk doygunluğu
-            enhancer = ImageEnhance.Color(rgb_img)
-            rgb_img = enhancer.enhance(1.1)
-            
-            # Alpha kanalını geri ekle
-            final_img = rgb_img.convert("RGBA")
-            final_img.putalpha(img.split()[3])  # Orijinal alpha kanalı
+            final_img = self.enhance_image(img)
+            if final_img is img:
+                return image_path
             
             # Çıktı dosyası
             if output_path is None:
@@ -264,26 +416,19 @@ class AdvancedClothingBgRemover:
             print(f"✅ E-ticaret iyileştirmesi: {output_path}")
             
             return str(output_path)
-            
+        
         except Exception as e:
             print(f"❌ İyileştirme hatası: {e}")
             return image_path
     
-    def create_product_variants(self, image_path, output_dir=None):
+    def save_product_variants(self, img, base_name, output_dir):
         """
-        Farklı boyutlarda ürün varyantları oluştur
+        Bellekteki görüntüden farklı boyutlarda ürün varyantları oluştur
         """
         try:
-            if output_dir is None:
-                output_dir = Path(image_path).parent / "variants"
-            else:
-                output_dir = Path(output_dir)
-                
+            output_dir = Path(output_dir)
             output_dir.mkdir(exist_ok=True)
             
-            img = Image.open(image_path).convert("RGBA")
-            base_name = Path(image_path).stem
-            
             # E-ticaret standart boyutları
             variants = {
                 "thumbnail": (150, 150),
@@ -293,36 +438,46 @@ class AdvancedClothingBgRemover:
                 "square": (800, 800)
             }
             
-            created_files = []
+            # Tek kaynaktan piramit küçültme + paralel PNG encode
+            paths = create_variants(
+                img,
+                variants,
+                output_dir=output_dir,
+                file_names={name: f"{base_name}_{name}.png" for name in variants}
+            )
             
+            created_files = []
             for variant_name, size in variants.items():
-                # Boyutu ayarla (en-boy oranını koru)
-                img_copy = img.copy()
-                img_copy.thumbnail(size, Image.Resampling.LANCZOS)
-                
-                # Kare canvas oluştur
-                canvas = Image.new("RGBA", size, (0, 0, 0, 0))
-                
-                # Merkezle
-                paste_x = (size[0] - img_copy.width) // 2
-                paste_y = (size[1] - img_copy.height) // 2
-                canvas.paste(img_copy, (paste_x, paste_y), img_copy)
-                
-                # Kaydet
-                variant_path = output_dir / f"{base_name}_{variant_name}.png"
-                canvas.save(variant_path, "PNG")
-                created_files.append(str(variant_path))
+                created_files.append(paths[variant_name])
                 print(f"✅ Varyant oluşturuldu: {variant_name} ({size[0]}x{size[1]})")
             
             return created_files
+        
+        except Exception as e:
+            print(f"❌ Varyant oluşturma hatası: {e}")
+            return []
+    
+    def create_product_variants(self, image_path, output_dir=None):
+        """
+        Farklı boyutlarda ürün varyantları oluştur
+        """
+        try:
+            if output_dir is None:
+                output_dir = Path(image_path).parent / "variants"
+            
+            img = Image.open(image_path).convert("RGBA")
+            base_name = Path(image_path).stem
             
+            return self.save_product_variants(img, base_name, output_dir)
+        
         except Exception as e:
             print(f"❌ Varyant oluşturma hatası: {e}")
             return []
     
-    def process_clothing_complete(self, input_path, options=None):
+    @staticmethod
+    def pipeline_options(options=None):
         """
-        Tam kıyafet işleme pipeline'ı
+        Varsayılan işlem seçeneklerini verilenlerle birleştir
         """
         default_options = {
             'preprocess': True,
@@ -330,51 +485,161 @@ class AdvancedClothingBgRemover:
             'center_vertically': False,  # Üstten boşluk bırak
             'enhance': True,
             'create_variants': False,
-            'add_padding': True
+            'add_padding': True,
+            'alpha_threshold': 0,
+            # Model küçük kopyada, çıktı kaynak çözünürlükte
+            'adaptive_inference': get_inference_settings()['adaptive']
         }
         
         if options:
             default_options.update(options)
         
-        print(f"\n{'='*60}")
-        print(f"🚀 TAM İŞLEM BAŞLIYOR: {os.path.basename(input_path)}")
-        print(f"{'='*60}")
-        
-        current_file = input_path
+        return default_options
+    
+    def process_clothing_image(self, image, options=None):
+        """
+        Tam kıyafet işleme pipeline'ı (bellek içi)
+        Aşamalar arasında tek bir RGBA görüntü taşınır, ara dosya yazılmaz.
+        (görüntü, dosya_eki) döndürür; dosya eki dosya tabanlı API'nin
+        eskiden ürettiği isimle uyumludur (ör. "_no_bg_positioned_enhanced")
+        """
+        default_options = self.pipeline_options(options)
         
         # 1. Arka planı kaldır
-        bg_removed = self.remove_background_advanced(
-            current_file, 
-            preprocess=default_options['preprocess']
+        current_img = self.remove_background_image(
+            image,
+            preprocess=default_options['preprocess'],
+            adaptive=default_options['adaptive_inference']
         )
         
-        if not bg_removed:
-            return None
-            
-        current_file = bg_removed
+        if current_img is None:
+            return None, None
+        
+        return self.finish_clothing_image(current_img, default_options)
+    
+    def finish_clothing_image(self, current_img, options=None):
+        """
+        Arka planı kaldırılmış görüntüye konumlandırma ve iyileştirme uygula
+        (görüntü, dosya_eki) döndürür
+        """
+        default_options = self.pipeline_options(options)
+        suffix = "_no_bg"
         
         # 2. Konumlandırmayı düzelt
         if default_options['fix_positioning']:
-            positioned = self.fix_positioning(
-                current_file,
-                center_vertically=default_options['center_vertically'],
-                add_padding=default_options['add_padding']
-            )
-            current_file = positioned
+            with timed('positioning'):
+                positioned = self.fix_positioning_image(
+                    current_img,
+                    center_vertically=default_options['center_vertically'],
+                    add_padding=default_options['add_padding'],
+                    alpha_threshold=default_options['alpha_threshold']
+                )
+            if positioned is not current_img:
+                suffix += "_positioned"
+            current_img = positioned
         
         # 3. E-ticaret iyileştirmesi
         if default_options['enhance']:
-            enhanced = self.enhance_for_ecommerce(current_file)
-            current_file = enhanced
+            with timed('enhance'):
+                enhanced = self.enhance_image(current_img)
+            if enhanced is not current_img:
+                suffix += "_enhanced"
+            current_img = enhanced
+        
+        return current_img, suffix
+    
+    def save_clothing_result(self, input_path, final_img, suffix, create_variants=False):
+        """
+        Son çıktıyı (ve istenirse varyantları) girdinin yanına kaydet
+        """
+        try:
+            input_file = Path(input_path)
+            current_file = input_file.parent / f"{input_file.stem}{suffix}.png"
+            with timed('encode'):
+                final_img.save(current_file, "PNG")
+        except Exception as e:
+            print(f"❌ Kaydetme hatası: {e}")
+            return None
         
-        # 4. Varyantlar oluştur
-        if default_options['create_variants']:
-            variants = self.create_product_variants(current_file)
+        # 5. Varyantlar oluştur
+        if create_variants:
+            with timed('variants'):
+                variants = self.save_product_variants(
+                    final_img,
+                    current_file.stem,
+                    current_file.parent / "variants"
+                )
             print(f"✅ {len(variants)} varyant oluşturuldu")
         
+        return str(current_file)
+    
+    def process_clothing_complete(self, input_path, options=None):
+        """
+        Tam kıyafet işleme pipeline'ı
+        Bellek içi pipeline'ı çalıştırır, yalnızca son çıktıyı diske yazar
+        """
+        default_options = self.pipeline_options(options)
+        
+        print(f"\n{'='*60}")
+        print(f"🚀 TAM İŞLEM BAŞLIYOR: {os.path.basename(input_path)}")
+        print(f"{'='*60}")
+        
+        print(f"\n🔄 İşleniyor: {os.path.basename(input_path)}")
+        
+        final_img, suffix = self.process_clothing_image(input_path, default_options)
+        if final_img is None:
+            return None
+        
+        # 4. Sadece son çıktıyı kaydet
+        current_file = self.save_clothing_result(
+            input_path, final_img, suffix,
+            create_variants=default_options['create_variants']
+        )
+        if current_file is None:
+            return None
+        
         print(f"\n🎉 İşlem tamamlandı: {current_file}")
         return current_file
-
+    
+    def process_folder_pipelined(self, image_files, options=None, readers=2, writers=2,
+                                 queue_size=4, manifest=None):
+        """
+        Klasörü üç aşamalı pipeline ile işle:
+        okuma/ön işleme (thread havuzu) -> model çıkarımı (tek thread) ->
+        son işleme + PNG/varyant kaydı (thread havuzu)
+        """
+        default_options = self.pipeline_options(options)
+        
+        def read(path):
+            full_img, model_img = self.prepare_inference(
+                path,
+                preprocess=default_options['preprocess'],
+                adaptive=default_options['adaptive_inference']
+            )
+            return None if full_img is None else (full_img, model_img)
+        
+        def infer(data):
+            full_img, model_img = data
+            return full_img, self.predict_inference_mask(full_img, model_img)
+        
+        def write(path, data):
+            full_img, mask = data
+            final_img, suffix = self.finish_clothing_image(
+                self.compose_mask(full_img, mask), default_options
+            )
+            return self.save_clothing_result(
+                path, final_img, suffix,
+                create_variants=default_options['create_variants']
+            )
+        
+        return run_pipeline(
+            image_files, read, infer, write,
+            readers=readers,
+            writers=writers,
+            queue_size=queue_size,
+            manifest=manifest,
+            manifest_options={'method': 'process_clothing_complete', **default_options}
+        )
 
 def main():
     if len(sys.argv) < 2:
@@ -383,12 +648,20 @@ def main():
 
 Kullanım:
   python advanced_clothing_bg_remover.py <görüntü_dosyası>
-  python advanced_clothing_bg_remover.py --folder <klasör>
+  python advanced_clothing_bg_remover.py --folder <klasör> [--workers N|auto] [--mode thread|process|pipeline]
+                                         [--manifest <kayıt.jsonl>]
   python advanced_clothing_bg_remover.py --analyze <görüntü>
   
+  --quantized: INT8 modeli kullan (quantize_models.py ile üretilmiş olmalı)
+  --adaptive:  Modeli küçültülmüş kopyada çalıştır, maskeyi kaynak çözünürlüğe büyüt
+  
 Örnekler:
   python advanced_clothing_bg_remover.py tshirt.jpg
   python advanced_clothing_bg_remover.py --folder ./products
+  python advanced_clothing_bg_remover.py --folder ./products --workers 8
+  python advanced_clothing_bg_remover.py --folder ./products --manifest products.jsonl
+  python advanced_clothing_bg_remover.py --folder ./products --mode pipeline --workers 4
+  python advanced_clothing_bg_remover.py --adaptive büyük_çekim.jpg
   python advanced_clothing_bg_remover.py --analyze product.jpg
   
 Özellikler:
@@ -396,10 +669,21 @@ Kullanım:
   ✅ Konumlandırma düzeltmesi
   ✅ E-ticaret iyileştirmesi
   ✅ Çoklu varyant oluşturma
+  ✅ Kaldığı yerden devam eden toplu işlem
         """)
         return
     
-    remover = AdvancedClothingBgRemover()
+    quantized = '--quantized' in sys.argv
+    if quantized:
+        sys.argv.remove('--quantized')
+    
+    # Uyarlanır çıkarım (verilmezse config.json inference_settings.adaptive)
+    adaptive_options = {}
+    if '--adaptive' in sys.argv:
+        sys.argv.remove('--adaptive')
+        adaptive_options['adaptive_inference'] = True
+    
+    remover = AdvancedClothingBgRemover(quantized=quantized)
     
     if sys.argv[1] == "--analyze":
         if len(sys.argv) < 3:
@@ -417,14 +701,31 @@ Kullanım:
             print(f"❌ Klasör bulunamadı: {folder}")
             return
         
-        supported_formats = {'.jpg', '.jpeg', '.png', '.bmp', '.tiff', '.webp'}
-        image_files = [f for f in folder.iterdir() 
-                      if f.is_file() and f.suffix.lower() in supported_formats]
+        image_files = find_images(folder)
         
         print(f"📁 {len(image_files)} görüntü dosyası bulundu")
         
-        for img_file in image_files:
-            result = remover.process_clothing_complete(str(img_file))
+        batch_options = parse_batch_args(sys.argv, modes=('thread', 'process', 'pipeline'))
+        if batch_options['mode'] == 'pipeline':
+            remover.process_folder_pipelined(
+                image_files,
+                options=adaptive_options,
+                readers=max(1, batch_options['workers'] // 2),
+                writers=batch_options['workers'],
+                manifest=batch_options['manifest']
+            )
+        else:
+            run_batch(
+                image_files,
+                'process_clothing_complete',
+                method_kwargs={'options': adaptive_options} if adaptive_options else None,
+                remover=remover if batch_options['mode'] == 'thread' else None,
+                remover_factory=AdvancedClothingBgRemover,
+                factory_args=(remover.model_name, remover.quantized),
+                workers=batch_options['workers'],
+                mode=batch_options['mode'],
+                manifest=batch_options['manifest']
+            )
         
     else:
         # Tek dosya işle
@@ -437,7 +738,8 @@ Kullanım:
             'center_vertically': False,  # Tişört için üstten boşluk
             'enhance': True,
             'create_variants': True,  # Varyantlar oluştur
-            'add_padding': True
+            'add_padding': True,
+            **adaptive_options
         }
         
         result = remover.process_clothing_complete(input_path, options)
@@ -4,7 +4,7 @@ Kıyafet Arka Plan Kaldırıcı - Web API Server
 iOS projesi için REST API endpoint'leri
 """
 
-from flask import Flask, request, jsonify, send_file, render_template_string
+from flask import Flask, Response, request, jsonify, send_file, render_template_string, g
 from flask_cors import CORS
 import os
 import sys
@@ -15,6 +15,9 @@ from werkzeug.utils import secure_filename
 from PIL import Image
 import io
 import base64
+import json
+import threading
+import copy
 
 # HTML template'i
 INDEX_HTML = """
@@ -87,22 +90,35 @@ INDEX_HTML = """
     <div class="endpoint">
         <h3>Sağlık Kontrolü</h3>
         <p><span class="method">GET</span> <span class="url">/health</span></p>
+        <p>Modeller açılışta ısıtılırken 503 (<code>warming_up</code>), hazır olunca 200 döner.</p>
         <div class="example">
             <strong>Örnek:</strong>
             <pre>curl https://cloth-segmentation-api.onrender.com/health</pre>
         </div>
     </div>
 
+    <div class="endpoint">
+        <h3>Metrikler (Prometheus)</h3>
+        <p><span class="method">GET</span> <span class="url">/metrics</span></p>
+        <p>Endpoint/model/durum bazında istek sayıları, istek ve aşama gecikme histogramları, işlenen istek sayısı, kuyruk derinliği, model yükleme süreleri, önbellek isabet oranı, gelen/giden bayt ve süreç RSS'i.</p>
+        <div class="example">
+            <strong>Örnek:</strong>
+            <pre>curl https://cloth-segmentation-api.onrender.com/metrics</pre>
+        </div>
+    </div>
+
     <div class="endpoint">
         <h3>Arka Plan Kaldırma (Form Data)</h3>
         <p><span class="method">POST</span> <span class="url">/api/remove-background</span></p>
         <p>Parametreler:</p>
         <div class="param">
             <code>image</code>: Görüntü dosyası (PNG, JPG)<br>
-            <code>model</code>: ultra veya advanced (varsayılan: ultra)<br>
+            <code>model</code>: ultra, advanced, ultra_int8 veya advanced_int8 (varsayılan: ultra; diğer değerler <code>other</code> olarak advanced modelde işlenir)<br>
             <code>positioning</code>: smart veya center (varsayılan: smart)<br>
-            <code>enhance</code>: true veya false (varsayılan: false)
+            <code>enhance</code>: true veya false (varsayılan: false)<br>
+            <code>adaptive</code>: true ise model küçültülmüş kopyada çalışır, çıktı kaynak çözünürlükte kalır
         </div>
+        <p>Yanıttaki <code>timings</code> alanı aşama sürelerini (saniye) verir: upload, decode, preprocess, inference, compose, positioning, enhance, encode, variants, total. <code>STAGE_TIMINGS=0</code> ile kapatılır.</p>
         <div class="example">
             <strong>Örnek:</strong>
             <pre>curl -X POST https://cloth-segmentation-api.onrender.com/api/remove-background \\
@@ -118,14 +134,37 @@ INDEX_HTML = """
         <p>JSON Parametreler:</p>
         <div class="param">
             <code>image_base64</code>: Base64 encoded görüntü<br>
-            <code>model</code>: ultra veya advanced<br>
-            <code>positioning</code>: smart veya center
+            <code>model</code>: ultra, advanced, ultra_int8 veya advanced_int8<br>
+            <code>positioning</code>: smart veya center<br>
+            <code>adaptive</code>: true veya false<br>
+            <code>Accept: image/png</code> başlığı gönderilirse sonuç base64 yerine ikili PNG olarak döner
         </div>
+        <p>Aşama süreleri JSON yanıtta <code>timings</code>, ikili yanıtta <code>Server-Timing</code> başlığında döner.</p>
         <div class="example">
             <strong>Örnek:</strong>
             <pre>curl -X POST https://cloth-segmentation-api.onrender.com/api/remove-background-base64 \\
 -H "Content-Type: application/json" \\
--d '{"image_base64": "BASE64_IMAGE_DATA", "model": "ultra"}'</pre>
+-d '{"image_base64": "BASE64_IMAGE_DATA", "model": "ultra"}'
+
+curl -X POST https://cloth-segmentation-api.onrender.com/api/remove-background-base64 \\
+-H "Content-Type: application/json" -H "Accept: image/png" \\
+-d '{"image_base64": "BASE64_IMAGE_DATA"}' -o sonuc.png</pre>
+        </div>
+    </div>
+
+    <div class="endpoint">
+        <h3>Asenkron İş (Uzun İşlemler İçin)</h3>
+        <p><span class="method">POST</span> <span class="url">/api/jobs</span></p>
+        <p>Parametreler <code>/api/remove-background</code> ile aynıdır. Hemen <code>job_id</code> döner.</p>
+        <p><span class="method">GET</span> <span class="url">/api/jobs/&lt;job_id&gt;</span></p>
+        <p>Durum: <code>queued</code>, <code>running</code>, <code>done</code> veya <code>failed</code>. Tamamlanan işin sonucu <code>/api/download/&lt;filename&gt;</code> ile indirilir; <code>timings.stages</code> işin aşama sürelerini verir.</p>
+        <div class="example">
+            <strong>Örnek:</strong>
+            <pre>curl -X POST https://cloth-segmentation-api.onrender.com/api/jobs \\
+-F "image=@image.jpg" \\
+-F "model=ultra"
+
+curl https://cloth-segmentation-api.onrender.com/api/jobs/JOB_ID</pre>
         </div>
     </div>
 
@@ -160,6 +199,13 @@ URLSession.shared.dataTask(with: request) { data, response, error in
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 from ultra_clothing_bg_remover import UltraClothingBgRemover
 from advanced_clothing_bg_remover import AdvancedClothingBgRemover
+from inference_scheduler import BatchInferenceScheduler
+from job_queue import JobQueue, JobQueueFull
+from result_cache import ResultCache, MaskCache
+from image_ops import predict_mask, get_inference_settings
+from model_sessions import session_registry, quantized_model_path
+from stage_timer import track_stages, timed, log_timings
+from metrics import MetricsRegistry, CONTENT_TYPE as METRICS_CONTENT_TYPE, process_collector
 
 app = Flask(__name__)
 CORS(app)  # iOS'tan istek gelebilsin
@@ -169,23 +215,140 @@ UPLOAD_FOLDER = 'uploads'
 PROCESSED_FOLDER = 'processed'
 ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'bmp', 'webp'}
 
+# İstemcinin seçebileceği modeller; diğer değerler 'other' olur (advanced'de işlenir)
+MODEL_TYPES = ('ultra', 'advanced', 'ultra_int8', 'advanced_int8')
+HTTP_METHODS = ('GET', 'POST', 'PUT', 'DELETE', 'PATCH', 'HEAD', 'OPTIONS')
+
+# Mikro-batch çıkarım ayarları (BATCH_MAX_SIZE=1 zamanlayıcıyı kapatır)
+BATCH_MAX_SIZE = int(os.environ.get('BATCH_MAX_SIZE', 4))
+BATCH_MAX_WAIT_MS = float(os.environ.get('BATCH_MAX_WAIT_MS', 15))
+
+# Asenkron iş kuyruğu ayarları
+JOB_QUEUE_SIZE = int(os.environ.get('JOB_QUEUE_SIZE', 16))
+JOB_WORKERS = int(os.environ.get('JOB_WORKERS', 2))
+
+# Sonuç önbelleği ayarları (RESULT_CACHE_ENABLED=false ile kapatılır)
+RESULT_CACHE_ENABLED = os.environ.get('RESULT_CACHE_ENABLED', 'true').lower() == 'true'
+RESULT_CACHE_DIR = os.path.join(PROCESSED_FOLDER, 'cache')
+RESULT_CACHE_ENTRIES = int(os.environ.get('RESULT_CACHE_ENTRIES', 256))
+RESULT_CACHE_MEMORY_MB = int(os.environ.get('RESULT_CACHE_MEMORY_MB', 128))
+RESULT_CACHE_DISK_MB = int(os.environ.get('RESULT_CACHE_DISK_MB', 1024))
+
+# Maske önbelleği: sadece son işlem seçenekleri değişen istekler modeli tekrar çalıştırmaz
+MASK_CACHE_ENABLED = os.environ.get('MASK_CACHE_ENABLED', 'true').lower() == 'true'
+MASK_CACHE_ENTRIES = int(os.environ.get('MASK_CACHE_ENTRIES', 128))
+MASK_CACHE_MEMORY_MB = int(os.environ.get('MASK_CACHE_MEMORY_MB', 256))
+
+# Açılışta ısıtılacak modeller ("ultra,advanced"; "none" ile lazy loading)
+WARMUP_MODELS = [
+    name.strip() for name in os.environ.get('WARMUP_MODELS', 'ultra,advanced').split(',')
+    if name.strip() and name.strip() != 'none'
+]
+WARMUP_IMAGE_SIZE = int(os.environ.get('WARMUP_IMAGE_SIZE', 512))
+# Hazır olmak için: 'any' = en az bir pipeline ısındı, 'all' = listedeki hepsi
+WARMUP_REQUIRE = os.environ.get('WARMUP_REQUIRE', 'any').lower()
+# Yüklenemeyen model için tekrar deneme sayısı ve ilk bekleme (her denemede iki katı)
+WARMUP_RETRIES = int(os.environ.get('WARMUP_RETRIES', 3))
+WARMUP_RETRY_DELAY = float(os.environ.get('WARMUP_RETRY_DELAY', 5))
+
 # Klasörleri oluştur
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 os.makedirs(PROCESSED_FOLDER, exist_ok=True)
 
-# Global remover'lar (lazy loading)
+# Global remover'lar (açılışta ısıtılır ya da lazy loading)
 ultra_remover = None
 advanced_remover = None
+remover_lock = threading.Lock()
+
+# INT8 model kullanan remover'lar (model=ultra_int8 / advanced_int8), ilk istekte yüklenir
+quantized_removers = {}
+
+# Isınma durumu: /health yalnızca 'ready' olduktan sonra hazır der
+warmup_state = {
+    'status': 'pending' if WARMUP_MODELS else 'ready',
+    'models': {},
+    'seconds': None,
+    'error': None
+}
+warmup_lock = threading.Lock()
+
+# Asenkron işler için worker havuzu
+job_queue = JobQueue(max_queue_size=JOB_QUEUE_SIZE, workers=JOB_WORKERS)
+
+# Aynı görüntü + aynı seçenekler için sonuç önbelleği
+result_cache = None
+if RESULT_CACHE_ENABLED:
+    result_cache = ResultCache(
+        RESULT_CACHE_DIR,
+        max_entries=RESULT_CACHE_ENTRIES,
+        memory_bytes=RESULT_CACHE_MEMORY_MB * 1024 * 1024,
+        disk_bytes=RESULT_CACHE_DISK_MB * 1024 * 1024
+    )
+
+# Remover'lar arasında paylaşılan maske önbelleği (anahtarda model adı var)
+mask_cache = None
+if MASK_CACHE_ENABLED:
+    mask_cache = MaskCache(
+        max_entries=MASK_CACHE_ENTRIES,
+        max_bytes=MASK_CACHE_MEMORY_MB * 1024 * 1024
+    )
+
+# Prometheus metrikleri (/metrics); kuyruk, önbellek ve model değerleri okuma anında toplanır
+metrics_registry = MetricsRegistry()
+http_requests = metrics_registry.counter(
+    'cloth_http_requests_total', 'Endpoint, model ve durum koduna göre istek sayısı',
+    ['endpoint', 'method', 'model', 'status']
+)
+http_latency = metrics_registry.histogram(
+    'cloth_http_request_duration_seconds', 'İstek süresi (saniye)', ['endpoint']
+)
+stage_latency = metrics_registry.histogram(
+    'cloth_stage_duration_seconds', 'Pipeline aşama süresi (saniye, STAGE_TIMINGS açıkken)', ['stage']
+)
+requests_in_flight = metrics_registry.gauge(
+    'cloth_http_requests_in_flight', 'İşlenmekte olan istek sayısı'
+)
+requests_in_flight.set(0)
+request_bytes = metrics_registry.counter(
+    'cloth_http_request_bytes_total', 'Gelen istek gövdesi (bayt)', ['endpoint']
+)
+response_bytes = metrics_registry.counter(
+    'cloth_http_response_bytes_total', 'Giden yanıt gövdesi (bayt)', ['endpoint']
+)
+metrics_registry.add_collector(process_collector)
+
+# Oturum başına tek zamanlayıcı: aynı modeli paylaşan remover'ların
+# istekleri aynı batch'lerde birleşir
+schedulers = {}
+
+def configure_remover(remover):
+    """
+    Remover'a maske önbelleğini ve paylaşılan oturum üzerinde
+    mikro-batch zamanlayıcısını bağla
+    """
+    remover.mask_cache = mask_cache
+    if BATCH_MAX_SIZE > 1:
+        scheduler = schedulers.get(id(remover.session))
+        if scheduler is None or scheduler.session is not remover.session:
+            scheduler = BatchInferenceScheduler(
+                remover.session,
+                max_batch_size=BATCH_MAX_SIZE,
+                max_wait_ms=BATCH_MAX_WAIT_MS
+            )
+            schedulers[id(remover.session)] = scheduler
+        remover.scheduler = scheduler
+    return remover
 
 def get_ultra_remover():
     """
     Ultra remover'ı lazy loading ile al
     """
     global ultra_remover
-    if ultra_remover is None:
-        print("🤖 Ultra AI modeli yükleniyor...")
-        ultra_remover = UltraClothingBgRemover()
-        print("✅ Ultra AI modeli hazır!")
+    with remover_lock:
+        if ultra_remover is None:
+            print("🤖 Ultra AI modeli yükleniyor...")
+            ultra_remover = configure_remover(UltraClothingBgRemover())
+            print("✅ Ultra AI modeli hazır!")
     return ultra_remover
 
 def get_advanced_remover():
@@ -193,12 +356,253 @@ def get_advanced_remover():
     Advanced remover'ı lazy loading ile al
     """
     global advanced_remover
-    if advanced_remover is None:
-        print("🤖 Advanced AI modeli yükleniyor...")
-        advanced_remover = AdvancedClothingBgRemover('u2net_cloth_seg')
-        print("✅ Advanced AI modeli hazır!")
+    with remover_lock:
+        if advanced_remover is None:
+            print("🤖 Advanced AI modeli yükleniyor...")
+            advanced_remover = configure_remover(AdvancedClothingBgRemover('u2net_cloth_seg'))
+            print("✅ Advanced AI modeli hazır!")
     return advanced_remover
 
+WARMUP_LOADERS = {'ultra': get_ultra_remover, 'advanced': get_advanced_remover}
+
+def warm_up_model(name, dummy):
+    """
+    Tek modeli yükle ve sahte bir çıkarımla ONNX tamponlarını ayır
+    Sonucu warmup_state['models'][name] içine yazar, başarılıysa True döner
+    """
+    try:
+        load_start = time.time()
+        remover = WARMUP_LOADERS[name]()
+        load_seconds = time.time() - load_start
+        
+        # Önbellek ve zamanlayıcıyı atlayarak modeli doğrudan çalıştır
+        inference_start = time.time()
+        predict_mask(remover.session, dummy)
+        inference_seconds = time.time() - inference_start
+        
+        warmup_state['models'][name] = {
+            'status': 'ready',
+            'load': round(load_seconds, 3),
+            'inference': round(inference_seconds, 3)
+        }
+        print(f"🔥 {name} hazır: yükleme {load_seconds:.2f}s, ilk çıkarım {inference_seconds:.2f}s")
+        return True
+    
+    except Exception as e:
+        attempts = warmup_state['models'].get(name, {}).get('attempts', 0) + 1
+        warmup_state['models'][name] = {'status': 'failed', 'error': str(e), 'attempts': attempts}
+        print(f"❌ {name} ısınma hatası (deneme {attempts}): {e}")
+        return False
+
+def warmup_ready(ready_models):
+    """
+    WARMUP_REQUIRE'a göre worker trafik alabilir mi
+    """
+    wanted = [name for name in WARMUP_MODELS if name in WARMUP_LOADERS]
+    if WARMUP_REQUIRE == 'all':
+        return all(name in ready_models for name in wanted)
+    # Bir pipeline yeterli: ultra yoksa istekler advanced'de işlenir
+    return bool(ready_models) or not wanted
+
+def warm_up():
+    """
+    Modelleri tek tek ısıt; yüklenemeyenler artan beklemeyle tekrar denenir
+    Bir modelin hatası diğerlerini ve /health'i kilitlemez
+    """
+    start = time.time()
+    warmup_state['status'] = 'running'
+    warmup_state['error'] = None
+    print(f"🔥 Isınma başlıyor: {', '.join(WARMUP_MODELS)}")
+    
+    dummy = Image.new('RGB', (WARMUP_IMAGE_SIZE, WARMUP_IMAGE_SIZE), (200, 200, 200))
+    
+    pending = []
+    for name in WARMUP_MODELS:
+        if name in WARMUP_LOADERS:
+            pending.append(name)
+        else:
+            print(f"⚠️  Bilinmeyen ısınma modeli: {name}")
+    
+    ready_models = []
+    delay = WARMUP_RETRY_DELAY
+    for attempt in range(WARMUP_RETRIES + 1):
+        if attempt:
+            print(f"🔁 Isınma tekrar deneniyor ({attempt}/{WARMUP_RETRIES}): {', '.join(pending)}")
+            time.sleep(delay)
+            delay *= 2
+        
+        for name in list(pending):
+            if warm_up_model(name, dummy):
+                pending.remove(name)
+                ready_models.append(name)
+        
+        # Hazır olan pipeline hemen trafik alabilsin, kalanlar denenmeye devam eder
+        if warmup_ready(ready_models):
+            warmup_state['status'] = 'ready'
+        if not pending:
+            break
+    
+    if warmup_state['status'] != 'ready':
+        # Sonraki /health ya da istek ısınmayı yeniden başlatır
+        warmup_state['status'] = 'failed'
+        warmup_state['error'] = f"Isınamayan modeller: {', '.join(pending)}"
+    
+    warmup_state['seconds'] = round(time.time() - start, 3)
+    print(f"✅ Isınma tamamlandı: {warmup_state['seconds']:.2f}s ({warmup_state['status']})")
+
+def start_warmup():
+    """
+    Isınmayı arka planda başlat (süreç başına bir kez; başarısız olduysa yeniden)
+    /health bu sırada yanıt vermeye devam eder ama hazır demez
+    """
+    with warmup_lock:
+        if warmup_state['status'] not in ('pending', 'failed'):
+            return
+        warmup_state['status'] = 'running'
+    
+    threading.Thread(target=warm_up, name="model-warmup", daemon=True).start()
+
+def get_quantized_remover(kind):
+    """
+    INT8 modelli remover'ı lazy loading ile al ('ultra' ya da 'advanced')
+    """
+    with remover_lock:
+        if kind not in quantized_removers:
+            print(f"🤖 {kind} INT8 modeli yükleniyor...")
+            if kind == 'ultra':
+                remover = UltraClothingBgRemover(quantized=True)
+            else:
+                remover = AdvancedClothingBgRemover('u2net_cloth_seg', quantized=True)
+            quantized_removers[kind] = configure_remover(remover)
+            print(f"✅ {kind} INT8 modeli hazır!")
+    return quantized_removers[kind]
+
+def split_model_type(model_type):
+    """
+    'ultra_int8' -> ('ultra', True), 'advanced' -> ('advanced', False)
+    """
+    if model_type.endswith('_int8'):
+        return model_type[:-len('_int8')], True
+    return model_type, False
+
+def resolve_pipeline(model_type):
+    """
+    İstenen modelin şu an hangi pipeline'da çalışacağı: ultra remover yüklü
+    değilse 'ultra' istekleri advanced modelde işlenir ('ultra' -> 'advanced')
+    """
+    base_type, quantized = split_model_type(model_type)
+    if base_type == 'ultra' and (ultra_remover or quantized):
+        return model_type
+    return 'advanced_int8' if quantized else 'advanced'
+
+def get_scheduler_stats():
+    """
+    Yüklü remover'ların zamanlayıcı istatistikleri
+    """
+    stats = {}
+    removers = [('ultra', ultra_remover), ('advanced', advanced_remover)]
+    removers += [(f"{kind}_int8", remover) for kind, remover in quantized_removers.items()]
+    for name, remover in removers:
+        if remover is not None and remover.scheduler is not None:
+            stats[name] = remover.scheduler.get_stats()
+    return stats
+
+def collect_runtime_metrics():
+    """
+    /metrics okunurken kuyruk, model yükleme ve önbellek değerleri
+    """
+    families = []
+    
+    jobs = job_queue.get_stats()
+    families.append(('cloth_job_queue_depth', 'gauge', 'Kuyrukta bekleyen iş sayısı',
+                     [({}, jobs['queue_depth'])]))
+    families.append(('cloth_job_queue_capacity', 'gauge', 'İş kuyruğu kapasitesi',
+                     [({}, jobs['queue_capacity'])]))
+    families.append(('cloth_jobs', 'gauge', 'Duruma göre bellekteki iş sayısı',
+                     [({'status': status}, count) for status, count in jobs['jobs'].items()]))
+    
+    sessions = session_registry.get_stats()['sessions']
+    families.append(('cloth_model_load_seconds', 'gauge', 'Model oturumu yükleme süresi (saniye)',
+                     [({'model': entry['model'], 'quantized': str(entry['quantized']).lower()},
+                       entry['load_seconds']) for entry in sessions]))
+    families.append(('cloth_model_session_refs', 'gauge', 'Model oturumunu kullanan remover sayısı',
+                     [({'model': entry['model'], 'quantized': str(entry['quantized']).lower()},
+                       entry['refs']) for entry in sessions]))
+    if warmup_state['seconds'] is not None:
+        families.append(('cloth_warmup_seconds', 'gauge', 'Açılış ısınma süresi (saniye)',
+                         [({}, warmup_state['seconds'])]))
+    
+    if result_cache is not None:
+        cache = result_cache.get_stats()
+        families.append(('cloth_result_cache_lookups_total', 'counter', 'Sonuç önbelleği sorguları',
+                         [({'result': 'memory_hit'}, cache['memory_hits']),
+                          ({'result': 'disk_hit'}, cache['disk_hits']),
+                          ({'result': 'miss'}, cache['misses'])]))
+        families.append(('cloth_result_cache_hit_ratio', 'gauge', 'Sonuç önbelleği isabet oranı',
+                         [({}, cache['hit_ratio'])]))
+        families.append(('cloth_result_cache_bytes', 'gauge', 'Sonuç önbelleği boyutu (bayt)',
+                         [({'tier': 'memory'}, cache['memory_bytes']),
+                          ({'tier': 'disk'}, cache['disk_bytes'])]))
+    
+    if mask_cache is not None:
+        masks = mask_cache.get_stats()
+        families.append(('cloth_mask_cache_lookups_total', 'counter', 'Maske önbelleği sorguları',
+                         [({'result': 'hit'}, masks['hits']), ({'result': 'miss'}, masks['misses'])]))
+        families.append(('cloth_mask_cache_hit_ratio', 'gauge', 'Maske önbelleği isabet oranı',
+                         [({}, masks['hit_ratio'])]))
+    
+    return families
+
+metrics_registry.add_collector(collect_runtime_metrics)
+
+def metrics_endpoint():
+    """
+    Etiket olarak route kalıbı (/api/jobs/<job_id>); eşleşmeyen yollar tek etikette toplanır
+    """
+    return request.url_rule.rule if request.url_rule is not None else 'unmatched'
+
+@app.before_request
+def ensure_warmup():
+    # __main__ ve gunicorn post_worker_init dışındaki WSGI sunucularında ısınma
+    # ilk istekte (/health dahil) başlar
+    if warmup_state['status'] in ('pending', 'failed'):
+        start_warmup()
+
+@app.before_request
+def start_request_metrics():
+    g.request_started = time.perf_counter()
+    requests_in_flight.inc()
+
+@app.after_request
+def record_request_metrics(response):
+    started = g.get('request_started')
+    if started is None:
+        return response
+    
+    endpoint = metrics_endpoint()
+    http_requests.inc(
+        endpoint=endpoint,
+        method=request.method if request.method in HTTP_METHODS else 'other',
+        model=g.get('metrics_model', ''),
+        status=response.status_code
+    )
+    http_latency.observe(time.perf_counter() - started, endpoint=endpoint)
+    request_bytes.inc(request.content_length or 0, endpoint=endpoint)
+    response_bytes.inc(response.content_length or 0, endpoint=endpoint)
+    return response
+
+@app.teardown_request
+def finish_request_metrics(exc):
+    if g.pop('request_started', None) is not None:
+        requests_in_flight.dec()
+
+def normalize_model_type(value):
+    """
+    İstemciden gelen model adını sabit kümeye indir; metrik etiketleri ve
+    önbellek anahtarları serbest metinle çoğalamaz
+    """
+    return value if value in MODEL_TYPES else 'other'
+
 def allowed_file(filename):
     return '.' in filename and \
            filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
@@ -216,13 +620,16 @@ def generate_unique_filename(original_filename):
 def health_check():
     """
     Server sağlık kontrolü - hızlı yanıt için basit tutuldu
+    Modeller ısınana kadar 503 döner, yük dengeleyici trafik göndermez
     """
+    ready = warmup_state['status'] == 'ready'
     return jsonify({
-        'status': 'healthy',
+        'status': 'healthy' if ready else 'warming_up',
         'timestamp': time.time(),
         'version': '1.0.0',
-        'ready': True
-    }), 200
+        'ready': ready,
+        'warmup': warmup_state
+    }), 200 if ready else 503
 
 @app.route('/api/status', methods=['GET'])
 def api_status():
@@ -238,13 +645,17 @@ def api_status():
         'endpoints': [
             'POST /api/remove-background',
             'POST /api/remove-background-base64',
+            'POST /api/jobs',
+            'GET /api/jobs/<job_id>',
             'GET /api/status',
-            'GET /api/models'
+            'GET /api/models',
+            'GET /metrics'
         ]
     }
     
     try:
         status['ultra_model'] = get_ultra_remover().best_model
+        status['ultra_model_load'] = get_ultra_remover().load_timings
     except:
         status['ultra_model'] = 'not_loaded'
     
@@ -253,8 +664,21 @@ def api_status():
     except:
         status['advanced_model'] = 'not_loaded'
     
+    status['batching'] = get_scheduler_stats()
+    status['jobs'] = job_queue.get_stats()
+    status['cache'] = result_cache.get_stats() if result_cache else {'enabled': False}
+    status['mask_cache'] = mask_cache.get_stats() if mask_cache else {'enabled': False}
+    status['sessions'] = session_registry.get_stats()
+    
     return jsonify(status)
 
+@app.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    """
+    Prometheus metin biçiminde metrikler
+    """
+    return Response(metrics_registry.render(), content_type=METRICS_CONTENT_TYPE)
+
 @app.route('/api/models', methods=['GET'])
 def get_available_models():
     """
@@ -272,6 +696,19 @@ def get_available_models():
             'description': 'Boyut düzeltmeli ve manuel model seçimi',
             'features': ['Boyut optimizasyonu', 'Konumlandırma düzeltmesi'],
             'recommended': False
+        },
+        'ultra_int8': {
+            'name': 'ULTRA AI Model (INT8)',
+            'description': 'Seçilen ultra modelin INT8 sürümü, yoksa FP32',
+            'features': ['2-3x daha hızlı CPU çıkarımı', 'Daha az bellek'],
+            'recommended': False
+        },
+        'advanced_int8': {
+            'name': 'Gelişmiş Model (INT8)',
+            'description': 'u2net_cloth_seg INT8 sürümü',
+            'features': ['2-3x daha hızlı CPU çıkarımı', 'Daha az bellek'],
+            'recommended': False,
+            'available': quantized_model_path('u2net_cloth_seg') is not None
         }
     }
     
@@ -281,59 +718,131 @@ def get_available_models():
         'default': 'ultra'
     })
 
-@app.route('/api/remove-background', methods=['POST'])
-def remove_background():
+class ProcessingError(Exception):
+    """Pipeline sonuç üretemedi"""
+
+def validate_upload():
     """
-    Ana arka plan kaldırma endpoint'i
+    Yüklenen dosyayı doğrula; (dosya, hata_response) döndürür
+    """
+    if 'image' not in request.files:
+        return None, (jsonify({
+            'success': False,
+            'error': 'Görüntü dosyası bulunamadı'
+        }), 400)
+    
+    file = request.files['image']
+    if file.filename == '':
+        return None, (jsonify({
+            'success': False,
+            'error': 'Dosya seçilmedi'
+        }), 400)
+    
+    if not allowed_file(file.filename):
+        return None, (jsonify({
+            'success': False,
+            'error': 'Desteklenmeyen dosya formatı'
+        }), 400)
+    
+    return file, None
+
+def parse_processing_params(form):
+    """
+    İşlem parametrelerini form verisinden oku
+    """
+    params = {
+        'model_type': normalize_model_type(form.get('model', 'ultra')),  # ultra, advanced, ultra_int8 veya advanced_int8
+        'positioning': form.get('positioning', 'smart'),  # smart veya center
+        'create_variants': form.get('variants', 'true').lower() == 'true',
+        'enhance': form.get('enhance', 'false').lower() == 'true',  # Şeffaf PNG için false
+        # Model küçük kopyada çalışır, çıktı kaynak çözünürlükte kalır
+        'adaptive': parse_bool(form.get('adaptive'), get_inference_settings()['adaptive'])
+    }
+    # Çalışacak pipeline istek anında sabitlenir; önbellek anahtarına da girer,
+    # böylece advanced'e düşen bir 'ultra' sonucu sonraki ultra isteklerine dönmez
+    params['pipeline'] = resolve_pipeline(params['model_type'])
+    return params
+
+def parse_bool(value, default=False):
     """
+    Form/JSON değerini bool'a çevir ('true'/'false', bool ya da None)
+    """
+    if value is None:
+        return default
+    if isinstance(value, bool):
+        return value
+    return str(value).lower() in ('1', 'true', 'yes')
+
+def save_upload(file, data):
+    """
+    Yüklenen dosyayı benzersiz isimle uploads klasörüne kaydet
+    """
+    filename = generate_unique_filename(file.filename)
+    filepath = os.path.join(UPLOAD_FOLDER, filename)
+    with open(filepath, 'wb') as f:
+        f.write(data)
+    print(f"📁 Dosya kaydedildi: {filename}")
+    return filepath
+
+def make_cache_key(data, params):
+    """
+    Girdi baytları + parametrelerden önbellek anahtarı (önbellek kapalıysa None)
+    """
+    if result_cache is None:
+        return None
+    return ResultCache.make_key(data, params)
+
+def restore_cached_result(cache_key):
+    """
+    Önbellekteki sonucu döndür, dosyaları processed klasöründe eksikse geri yaz
+    """
+    if result_cache is None or cache_key is None:
+        return None
+    
+    entry = result_cache.get(cache_key)
+    if entry is None:
+        return None
+    
+    for name, data in entry['files'].items():
+        path = os.path.join(PROCESSED_FOLDER, name)
+        if not os.path.exists(path):
+            with open(path, 'wb') as f:
+                f.write(data)
+    
+    response_data = copy.deepcopy(entry['response'])
+    response_data['cached'] = True
+    print(f"⚡ Önbellekten döndü: {response_data['result']['filename']}")
+    return response_data
+
+def process_upload(filepath, params, cache_key=None):
+    """
+    Kaydedilmiş yüklemeyi işle, sonuçları processed klasörüne taşı
+    Başarılı response sözlüğünü döndürür, başarısızsa ProcessingError fırlatır
+    """
+    model_type = params['model_type']
+    positioning = params['positioning']
+    create_variants = params['create_variants']
+    enhance = params['enhance']
+    adaptive = params.get('adaptive', False)
+    
+    print(f"⚙️  Parametreler: model={model_type}, positioning={positioning}")
+    base_type, quantized = split_model_type(params.get('pipeline') or resolve_pipeline(model_type))
+    
     try:
-        # Request validation
-        if 'image' not in request.files:
-            return jsonify({
-                'success': False,
-                'error': 'Görüntü dosyası bulunamadı'
-            }), 400
-        
-        file = request.files['image']
-        if file.filename == '':
-            return jsonify({
-                'success': False,
-                'error': 'Dosya seçilmedi'
-            }), 400
-        
-        if not allowed_file(file.filename):
-            return jsonify({
-                'success': False,
-                'error': 'Desteklenmeyen dosya formatı'
-            }), 400
-        
-        # Parametreler
-        model_type = request.form.get('model', 'ultra')  # ultra veya advanced
-        positioning = request.form.get('positioning', 'smart')  # smart veya center
-        create_variants = request.form.get('variants', 'true').lower() == 'true'
-        enhance = request.form.get('enhance', 'false').lower() == 'true'  # Şeffaf PNG için false
-        
-        # Dosyayı kaydet
-        filename = generate_unique_filename(file.filename)
-        filepath = os.path.join(UPLOAD_FOLDER, filename)
-        file.save(filepath)
-        
-        print(f"📁 Dosya kaydedildi: {filename}")
-        print(f"⚙️  Parametreler: model={model_type}, positioning={positioning}")
-        
         start_time = time.time()
         
         # Model seçimi ve işlem
-        if model_type == 'ultra' and ultra_remover:
+        if base_type == 'ultra':
             options = {
                 'ai_positioning': True,
                 'enhance': enhance,
                 'create_variants': create_variants,
-                'positioning_mode': positioning
+                'positioning_mode': positioning,
+                'adaptive_inference': adaptive
             }
-            remover = get_ultra_remover()
+            remover = get_quantized_remover('ultra') if quantized else get_ultra_remover()
             result_path = remover.ultra_process(filepath, options)
-            used_model = remover.best_model
+            used_model = remover.model_key
             
         else:
             # Advanced model kullan
@@ -343,54 +852,51 @@ def remove_background():
                 'center_vertically': positioning == 'center',
                 'enhance': enhance,
                 'create_variants': create_variants,
-                'add_padding': True
+                'add_padding': True,
+                'adaptive_inference': adaptive
             }
-            remover = get_advanced_remover()
+            remover = get_quantized_remover('advanced') if quantized else get_advanced_remover()
             result_path = remover.process_clothing_complete(filepath, options)
-            used_model = remover.model_name
+            used_model = remover.model_key
         
         process_time = time.time() - start_time
         
         if not result_path or not os.path.exists(result_path):
-            return jsonify({
-                'success': False,
-                'error': 'İşlem başarısız oldu'
-            }), 500
-        
-        # Sonuç dosyasını processed klasörüne taşı
-        result_filename = os.path.basename(result_path)
-        final_path = os.path.join(PROCESSED_FOLDER, result_filename)
-        
-        if os.path.exists(result_path):
-            os.rename(result_path, final_path)
+            raise ProcessingError('İşlem başarısız oldu')
         
-        # Varyantları kontrol et
-        variants_info = []
-        variants_dir = Path(result_path).parent / "variants"
-        ultra_variants_dir = Path(result_path).parent / "ultra_variants"
-        
-        for var_dir in [variants_dir, ultra_variants_dir]:
-            if var_dir.exists():
-                base_name = Path(filepath).stem
-                variant_files = list(var_dir.glob(f"*{base_name}*.png"))
-                for variant_file in variant_files:
-                    # Varyantı da processed'a taşı
-                    var_final_path = os.path.join(PROCESSED_FOLDER, variant_file.name)
-                    os.rename(str(variant_file), var_final_path)
-                    
-                    file_size = os.path.getsize(var_final_path)
-                    variants_info.append({
-                        'filename': variant_file.name,
-                        'size_bytes': file_size,
-                        'download_url': f'/api/download/{variant_file.name}'
-                    })
-        
-        # Orijinal dosyayı sil
-        if os.path.exists(filepath):
-            os.remove(filepath)
-        
-        # Başarılı response
-        file_size = os.path.getsize(final_path)
+        with timed('file_moves'):
+            # Sonuç dosyasını processed klasörüne taşı
+            result_filename = os.path.basename(result_path)
+            final_path = os.path.join(PROCESSED_FOLDER, result_filename)
+            
+            if os.path.exists(result_path):
+                os.rename(result_path, final_path)
+            
+            # Varyantları kontrol et
+            variants_info = []
+            variant_paths = []
+            variants_dir = Path(result_path).parent / "variants"
+            ultra_variants_dir = Path(result_path).parent / "ultra_variants"
+            
+            for var_dir in [variants_dir, ultra_variants_dir]:
+                if var_dir.exists():
+                    base_name = Path(filepath).stem
+                    variant_files = list(var_dir.glob(f"*{base_name}*.png"))
+                    for variant_file in variant_files:
+                        # Varyantı da processed'a taşı
+                        var_final_path = os.path.join(PROCESSED_FOLDER, variant_file.name)
+                        os.rename(str(variant_file), var_final_path)
+                        
+                        file_size = os.path.getsize(var_final_path)
+                        variant_paths.append(var_final_path)
+                        variants_info.append({
+                            'filename': variant_file.name,
+                            'size_bytes': file_size,
+                            'download_url': f'/api/download/{variant_file.name}'
+                        })
+            
+            # Başarılı response
+            file_size = os.path.getsize(final_path)
         
         response_data = {
             'success': True,
@@ -406,13 +912,103 @@ def remove_background():
                 'model_type': model_type,
                 'positioning': positioning,
                 'enhance': enhance,
-                'create_variants': create_variants
+                'create_variants': create_variants,
+                'adaptive': adaptive
             }
         }
         
+        # INT8 model bulunamayıp FP32'ye düşüldüyse sonuç INT8 anahtarına yazılmaz
+        fallback = quantized and not used_model.endswith(':int8')
+        if result_cache is not None and cache_key is not None and not fallback:
+            with timed('cache_store'):
+                result_cache.put(cache_key, response_data, [final_path] + variant_paths)
+        
+        response_data['cached'] = False
+        
         print(f"✅ İşlem başarılı: {process_time:.2f}s, Model: {used_model}")
-        return jsonify(response_data)
+        return response_data
         
+    finally:
+        # Orijinal dosyayı sil
+        if os.path.exists(filepath):
+            os.remove(filepath)
+
+def add_timings(response_data, timer, endpoint):
+    """
+    Yanıta aşama sürelerini ekle ve istek başına tek satır log yaz
+    (aşama ölçümü kapalıysa timer None'dır, yanıt değişmez)
+    """
+    if timer is None:
+        return response_data
+    
+    # Önbellekteki sözlüğe yazmamak için sığ kopya
+    response_data = dict(response_data, timings=timer.as_dict())
+    report_timings(
+        timer,
+        endpoint=endpoint,
+        model=response_data['result']['model_used'],
+        cached=response_data.get('cached', False)
+    )
+    return response_data
+
+def report_timings(timer, **fields):
+    """
+    Aşama sürelerini metrik histogramına ekle ve loga yaz
+    """
+    for stage, seconds in timer.stages.items():
+        stage_latency.observe(seconds, stage=stage)
+    log_timings(timer, **fields)
+
+def server_timing_header(timer):
+    """
+    Aşama sürelerini Server-Timing başlığına çevir (milisaniye)
+    """
+    return ', '.join(
+        f"{name};dur={seconds * 1000:.1f}" for name, seconds in timer.stages.items()
+    ) + f", total;dur={timer.total() * 1000:.1f}"
+
+def process_upload_timed(filepath, params, cache_key=None):
+    """
+    Kuyruk worker'ında çalışan iş: aşama süreleri iş sonucuna eklenir
+    """
+    with track_stages() as timer:
+        return add_timings(process_upload(filepath, params, cache_key), timer, '/api/jobs')
+
+@app.route('/api/remove-background', methods=['POST'])
+def remove_background():
+    """
+    Ana arka plan kaldırma endpoint'i
+    """
+    try:
+        with track_stages() as timer:
+            # Request validation
+            file, error_response = validate_upload()
+            if error_response:
+                return error_response
+            
+            params = parse_processing_params(request.form)
+            g.metrics_model = params['model_type']
+            with timed('upload'):
+                data = file.read()
+            
+            # Aynı görüntü + seçenekler daha önce işlendiyse çıkarımı atla
+            with timed('cache_lookup'):
+                cache_key = make_cache_key(data, params)
+                cached = restore_cached_result(cache_key)
+            if cached is not None:
+                return jsonify(add_timings(cached, timer, '/api/remove-background'))
+            
+            with timed('upload'):
+                filepath = save_upload(file, data)
+            
+            response_data = process_upload(filepath, params, cache_key)
+            return jsonify(add_timings(response_data, timer, '/api/remove-background'))
+        
+    except ProcessingError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
     except Exception as e:
         print(f"❌ API hatası: {str(e)}")
         return jsonify({
@@ -420,6 +1016,85 @@ def remove_background():
             'error': str(e)
         }), 500
 
+@app.route('/api/jobs', methods=['POST'])
+def create_job():
+    """
+    Asenkron arka plan kaldırma işi başlat
+    Hemen iş id'si döner; sonuç /api/jobs/<id> ile sorgulanır
+    """
+    try:
+        file, error_response = validate_upload()
+        if error_response:
+            return error_response
+        
+        params = parse_processing_params(request.form)
+        g.metrics_model = params['model_type']
+        data = file.read()
+        
+        cache_key = make_cache_key(data, params)
+        cached = restore_cached_result(cache_key)
+        filepath = None
+        
+        try:
+            if cached is not None:
+                job_id = job_queue.submit(lambda: cached)
+            else:
+                filepath = save_upload(file, data)
+                job_id = job_queue.submit(process_upload_timed, filepath, params, cache_key)
+        except JobQueueFull as e:
+            if filepath and os.path.exists(filepath):
+                os.remove(filepath)
+            return jsonify({
+                'success': False,
+                'error': str(e)
+            }), 503
+        
+        print(f"📥 İş kuyruğa alındı: {job_id}")
+        return jsonify({
+            'success': True,
+            'job_id': job_id,
+            'status': 'queued',
+            'status_url': f'/api/jobs/{job_id}'
+        }), 202
+        
+    except Exception as e:
+        print(f"❌ İş oluşturma hatası: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job_status(job_id):
+    """
+    İş durumu, süreleri ve (tamamlandıysa) sonuç bilgisi
+    """
+    job = job_queue.get_job(job_id)
+    if job is None:
+        return jsonify({
+            'success': False,
+            'error': 'İş bulunamadı'
+        }), 404
+    
+    response_data = {
+        'success': job['status'] != 'failed',
+        'job_id': job['id'],
+        'status': job['status'],
+        'timings': job['timings']
+    }
+    
+    if job['status'] == 'done':
+        response_data['result'] = job['result']['result']
+        response_data['variants'] = job['result']['variants']
+        response_data['parameters'] = job['result']['parameters']
+        response_data['cached'] = job['result'].get('cached', False)
+        if 'timings' in job['result']:
+            response_data['timings']['stages'] = job['result']['timings']
+    elif job['status'] == 'failed':
+        response_data['error'] = job['error']
+    
+    return jsonify(response_data)
+
 @app.route('/api/download/<filename>', methods=['GET'])
 def download_file(filename):
     """
@@ -460,10 +1135,64 @@ def preview_file(filename):
             'error': str(e)
         }), 500
 
+# Base64 yanıtı parça parça üretilir; 3'ün katı olmalı ki parçalar arası dolgu oluşmasın
+BASE64_CHUNK_BYTES = 3 * 64 * 1024
+
+def process_image_in_memory(img, model_type, positioning, enhance, adaptive):
+    """
+    Görüntüyü dosyaya yazmadan işle; (RGBA görüntü, kullanılan model) döndürür
+    """
+    base_type, quantized = split_model_type(resolve_pipeline(model_type))
+    
+    if base_type == 'ultra':
+        options = {
+            'ai_positioning': True,
+            'enhance': enhance,
+            'positioning_mode': positioning,
+            'adaptive_inference': adaptive
+        }
+        remover = get_quantized_remover('ultra') if quantized else get_ultra_remover()
+        result_img = remover.ultra_process_image(img, options)
+    else:
+        options = {
+            'preprocess': True,
+            'fix_positioning': True,
+            'center_vertically': positioning == 'center',
+            'enhance': enhance,
+            'add_padding': True,
+            'adaptive_inference': adaptive
+        }
+        remover = get_quantized_remover('advanced') if quantized else get_advanced_remover()
+        result_img, _ = remover.process_clothing_image(img, options)
+    
+    return result_img, remover.model_key
+
+def stream_base64_json(payload, fields):
+    """
+    {"result_base64": "...", **fields} JSON'unu parça parça üret
+    payload: PNG baytlarına bakan memoryview; base64 metni hiçbir zaman
+    tek parça olarak bellekte tutulmaz
+    """
+    head = b'{"result_base64": "'
+    tail = b'", ' + json.dumps(fields).encode('utf-8')[1:]
+    
+    def generate():
+        yield head
+        for offset in range(0, len(payload), BASE64_CHUNK_BYTES):
+            yield base64.b64encode(payload[offset:offset + BASE64_CHUNK_BYTES])
+        yield tail
+    
+    encoded_length = 4 * ((len(payload) + 2) // 3)
+    response = Response(generate(), mimetype='application/json')
+    response.headers['Content-Length'] = str(len(head) + encoded_length + len(tail))
+    return response
+
 @app.route('/api/remove-background-base64', methods=['POST'])
 def remove_background_base64():
     """
     Base64 formatında görüntü işleme (iOS için alternatif)
+    Tamamen bellekte çalışır, geçici dosya yazılmaz.
+    Accept: image/png gönderen istemciler sonucu base64'süz ikili PNG olarak alır
     """
     try:
         data = request.get_json()
@@ -474,80 +1203,66 @@ def remove_background_base64():
                 'error': 'image_base64 parametresi gerekli'
             }), 400
         
-        # Base64'ü decode et
-        image_data = base64.b64decode(data['image_base64'])
-        
-        # Geçici dosya oluştur
-        filename = f"temp_{int(time.time())}.png"
-        filepath = os.path.join(UPLOAD_FOLDER, filename)
-        
-        with open(filepath, 'wb') as f:
-            f.write(image_data)
-        
-        # Parametreler
-        model_type = data.get('model', 'ultra')
-        positioning = data.get('positioning', 'smart')
-        enhance = data.get('enhance', False)  # Şeffaf PNG için false
-        create_variants = data.get('create_variants', False)
-        
-        print(f"📱 Base64 işlem: model={model_type}, positioning={positioning}")
-        
-        start_time = time.time()
-        
-        # İşlem
-        if model_type == 'ultra' and ultra_remover:
-            options = {
-                'ai_positioning': True,
-                'enhance': enhance,
-                'create_variants': create_variants,
-                'positioning_mode': positioning
-            }
-            remover = get_ultra_remover()
-            result_path = remover.ultra_process(filepath, options)
-            used_model = remover.best_model
-        else:
-            options = {
-                'preprocess': True,
-                'fix_positioning': True,
-                'center_vertically': positioning == 'center',
-                'enhance': enhance,
-                'create_variants': create_variants,
-                'add_padding': True
-            }
-            remover = get_advanced_remover()
-            result_path = remover.process_clothing_complete(filepath, options)
-            used_model = remover.model_name
-        
-        process_time = time.time() - start_time
-        
-        if not result_path or not os.path.exists(result_path):
-            return jsonify({
-                'success': False,
-                'error': 'İşlem başarısız'
-            }), 500
-        
-        # Sonucu base64'e çevir
-        with open(result_path, 'rb') as f:
-            result_base64 = base64.b64encode(f.read()).decode('utf-8')
-        
-        # Geçici dosyaları temizle
-        for temp_file in [filepath, result_path]:
-            if os.path.exists(temp_file):
-                os.remove(temp_file)
-        
-        response_data = {
-            'success': True,
-            'result_base64': result_base64,
-            'processing_time': round(process_time, 2),
-            'model_used': used_model,
-            'parameters': {
-                'model_type': model_type,
-                'positioning': positioning
+        with track_stages() as timer:
+            # Base64'ü doğrudan bellekte aç
+            with timed('decode'):
+                image = Image.open(io.BytesIO(base64.b64decode(data.pop('image_base64'))))
+                image.load()
+            
+            # Parametreler
+            model_type = normalize_model_type(data.get('model', 'ultra'))
+            g.metrics_model = model_type
+            positioning = data.get('positioning', 'smart')
+            enhance = data.get('enhance', False)  # Şeffaf PNG için false
+            adaptive = parse_bool(data.get('adaptive'), get_inference_settings()['adaptive'])
+            
+            print(f"📱 Base64 işlem: model={model_type}, positioning={positioning}")
+            
+            start_time = time.time()
+            
+            result_img, used_model = process_image_in_memory(
+                image, model_type, positioning, enhance, adaptive
+            )
+            
+            process_time = time.time() - start_time
+            
+            if result_img is None:
+                return jsonify({
+                    'success': False,
+                    'error': 'İşlem başarısız'
+                }), 500
+            
+            # PNG'yi tampona yaz; getbuffer() kopyalamadan bakış verir
+            buffer = io.BytesIO()
+            with timed('encode'):
+                result_img.save(buffer, "PNG")
+            
+            print(f"📱 Base64 işlem başarılı: {process_time:.2f}s")
+            
+            best = request.accept_mimetypes.best_match(['application/json', 'image/png'])
+            if best == 'image/png':
+                buffer.seek(0)
+                response = send_file(buffer, mimetype='image/png')
+                response.headers['X-Processing-Time'] = f"{process_time:.2f}"
+                response.headers['X-Model-Used'] = used_model
+                if timer is not None:
+                    response.headers['Server-Timing'] = server_timing_header(timer)
+                    report_timings(timer, endpoint='/api/remove-background-base64', model=used_model, binary=True)
+                return response
+            
+            fields = {
+                'success': True,
+                'processing_time': round(process_time, 2),
+                'model_used': used_model,
+                'parameters': {
+                    'model_type': model_type,
+                    'positioning': positioning
+                }
             }
-        }
-        
-        print(f"📱 Base64 işlem başarılı: {process_time:.2f}s")
-        return jsonify(response_data)
+            if timer is not None:
+                fields['timings'] = timer.as_dict()
+                report_timings(timer, endpoint='/api/remove-background-base64', model=used_model, binary=False)
+            return stream_base64_json(buffer.getbuffer(), fields)
         
     except Exception as e:
         print(f"❌ Base64 API hatası: {str(e)}")
@@ -562,297 +1277,14 @@ def index():
     Ana sayfa - API dokümantasyonu
     """
     return render_template_string(INDEX_HTML)
-<!DOCTYPE html>
-<html>
-<head>
-    <title>Kıyafet Arka Plan Kaldırıcı API</title>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <style>
-        body { 
-            font-family: -apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, sans-serif; 
-            line-height: 1.6; 
-            padding: 2em; 
-            max-width: 800px; 
-            margin: 0 auto;
-            color: #333;
-        }
-        h1 { color: #2c3e50; }
-        h2 { color: #34495e; margin-top: 1.5em; }
-        pre { 
-            background: #f8f9fa; 
-            padding: 1em; 
-            border-radius: 4px; 
-            overflow-x: auto;
-            border: 1px solid #e9ecef;
-        }
-        .endpoint { 
-            background: #fff; 
-            padding: 1em; 
-            margin: 1em 0; 
-            border-radius: 4px; 
-            border: 1px solid #e9ecef;
-            box-shadow: 0 1px 3px rgba(0,0,0,0.1);
-        }
-        .method { 
-            font-weight: bold; 
-            color: #2ecc71; 
-            background: #f1f9f1;
-            padding: 0.2em 0.5em;
-            border-radius: 3px;
-        }
-        .url { color: #3498db; }
-        .param { margin-left: 1em; }
-        .example { margin-top: 1em; }
-        .note { 
-            background: #fff3cd; 
-            padding: 1em; 
-            border-radius: 4px; 
-            margin: 1em 0;
-            border: 1px solid #ffeeba;
-        }
-        code {
-            background: #f8f9fa;
-            padding: 0.2em 0.4em;
-            border-radius: 3px;
-            font-size: 0.9em;
-        }
-    </style>
-</head>
-<body>
-    <h1>🚀 Kıyafet Arka Plan Kaldırıcı API</h1>
-    
-    <div class="note">
-        <strong>Not:</strong> Bu bir RESTful API servisidir. Kullanım için HTTP istekleri yapmanız gerekir.
-    </div>
-
-    <h2>📡 Endpoints</h2>
-
-    <div class="endpoint">
-        <h3>Sağlık Kontrolü</h3>
-        <p><span class="method">GET</span> <span class="url">/health</span></p>
-        <div class="example">
-            <strong>Örnek:</strong>
-            <pre>curl https://cloth-segmentation-api.onrender.com/health</pre>
-        </div>
-    </div>
-
-    <div class="endpoint">
-        <h3>Arka Plan Kaldırma (Form Data)</h3>
-        <p><span class="method">POST</span> <span class="url">/api/remove-background</span></p>
-        <p>Parametreler:</p>
-        <div class="param">
-            <code>image</code>: Görüntü dosyası (PNG, JPG)<br>
-            <code>model</code>: ultra veya advanced (varsayılan: ultra)<br>
-            <code>positioning</code>: smart veya center (varsayılan: smart)<br>
-            <code>enhance</code>: true veya false (varsayılan: false)
-        </div>
-        <div class="example">
-            <strong>Örnek:</strong>
-            <pre>curl -X POST https://cloth-segmentation-api.onrender.com/api/remove-background \\
--F "image=@image.jpg" \\
--F "model=ultra" \\
--F "positioning=smart"</pre>
-        </div>
-    </div>
-
-    <div class="endpoint">
-        <h3>Arka Plan Kaldırma (Base64)</h3>
-        <p><span class="method">POST</span> <span class="url">/api/remove-background-base64</span></p>
-        <p>JSON Parametreler:</p>
-        <div class="param">
-            <code>image_base64</code>: Base64 encoded görüntü<br>
-            <code>model</code>: ultra veya advanced<br>
-            <code>positioning</code>: smart veya center
-        </div>
-        <div class="example">
-            <strong>Örnek:</strong>
-            <pre>curl -X POST https://cloth-segmentation-api.onrender.com/api/remove-background-base64 \\
--H "Content-Type: application/json" \\
--d '{"image_base64": "BASE64_IMAGE_DATA", "model": "ultra"}'</pre>
-        </div>
-    </div>
-
-    <h2>📱 Swift Örnek Kod</h2>
-    <pre>
-let url = URL(string: "https://cloth-segmentation-api.onrender.com/api/remove-background-base64")!
-var request = URLRequest(url: url)
-request.httpMethod = "POST"
-request.setValue("application/json", forHTTPHeaderField: "Content-Type")
-
-let parameters: [String: Any] = [
-    "image_base64": imageBase64String,
-    "model": "ultra",
-    "positioning": "smart"
-]
-
-request.httpBody = try? JSONSerialization.data(withJSONObject: parameters)
-
-URLSession.shared.dataTask(with: request) { data, response, error in
-    if let data = data {
-        let result = try? JSONSerialization.jsonObject(with: data) as? [String: Any]
-        let resultBase64 = result?["result_base64"] as? String
-        // resultBase64'ü kullanarak görüntüyü gösterin
-    }
-}.resume()</pre>
-
-</body>
-</html>
-'''
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <title>Kıyafet Arka Plan Kaldırıcı API</title>
-        <style>
-            body { font-family: -apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, Helvetica, Arial, sans-serif; line-height: 1.6; padding: 2em; max-width: 800px; margin: 0 auto; }
-            h1 { color: #2c3e50; }
-            h2 { color: #34495e; margin-top: 1.5em; }
-            pre { background: #f8f9fa; padding: 1em; border-radius: 4px; overflow-x: auto; }
-            .endpoint { background: #fff; padding: 1em; margin: 1em 0; border-radius: 4px; border: 1px solid #e9ecef; }
-            .method { font-weight: bold; color: #2ecc71; }
-            .url { color: #3498db; }
-            .param { margin-left: 1em; }
-            .example { margin-top: 1em; }
-            .note { background: #fff3cd; padding: 1em; border-radius: 4px; margin: 1em 0; }
-        </style>
-    </head>
-    <body>
-        <h1>🚀 Kıyafet Arka Plan Kaldırıcı API</h1>
-        
-        <div class="note">
-            <strong>Not:</strong> Bu bir RESTful API servisidir. Kullanım için HTTP istekleri yapmanız gerekir.
-        </div>
-
-        <h2>📡 Endpoints</h2>
-
-        <div class="endpoint">
-            <h3>Sağlık Kontrolü</h3>
-            <p><span class="method">GET</span> <span class="url">/health</span></p>
-            <div class="example">
-                <strong>Örnek:</strong>
-                <pre>curl https://cloth-segmentation-api.onrender.com/health</pre>
-            </div>
-        </div>
-
-        <div class="endpoint">
-            <h3>Arka Plan Kaldırma (Form Data)</h3>
-            <p><span class="method">POST</span> <span class="url">/api/remove-background</span></p>
-            <p>Parametreler:</p>
-            <div class="param">
-                <code>image</code>: Görüntü dosyası (PNG, JPG)<br>
-                <code>model</code>: ultra veya advanced (varsayılan: ultra)<br>
-                <code>positioning</code>: smart veya center (varsayılan: smart)<br>
-                <code>enhance</code>: true veya false (varsayılan: false)
-            </div>
-            <div class="example">
-                <strong>Örnek:</strong>
-                <pre>curl -X POST https://cloth-segmentation-api.onrender.com/api/remove-background \\
-    -F "image=@image.jpg" \\
-    -F "model=ultra" \\
-    -F "positioning=smart"</pre>
-            </div>
-        </div>
-
-        <div class="endpoint">
-            <h3>Arka Plan Kaldırma (Base64)</h3>
-            <p><span class="method">POST</span> <span class="url">/api/remove-background-base64</span></p>
-            <p>JSON Parametreler:</p>
-            <div class="param">
-                <code>image_base64</code>: Base64 encoded görüntü<br>
-                <code>model</code>: ultra veya advanced<br>
-                <code>positioning</code>: smart veya center
-            </div>
-            <div class="example">
-                <strong>Örnek:</strong>
-                <pre>curl -X POST https://cloth-segmentation-api.onrender.com/api/remove-background-base64 \\
-    -H "Content-Type: application/json" \\
-    -d '{"image_base64": "BASE64_IMAGE_DATA", "model": "ultra"}'</pre>
-            </div>
-        </div>
-
-        <h2>📱 Swift Örnek Kod</h2>
-        <pre>
-let url = URL(string: "https://cloth-segmentation-api.onrender.com/api/remove-background-base64")!
-var request = URLRequest(url: url)
-request.httpMethod = "POST"
-request.setValue("application/json", forHTTPHeaderField: "Content-Type")
-
-let parameters: [String: Any] = [
-    "image_base64": imageBase64String,
-    "model": "ultra",
-    "positioning": "smart"
-]
-
-request.httpBody = try? JSONSerialization.data(withJSONObject: parameters)
-
-URLSession.shared.dataTask(with: request) { data, response, error in
-    if let data = data {
-        let result = try? JSONSerialization.jsonObject(with: data) as? [String: Any]
-        let resultBase64 = result?["result_base64"] as? String
-        // resultBase64'ü kullanarak görüntüyü gösterin
-    }
-}.resume()</pre>
-
-    </body>
-    </html>
-    """
-    return docs_html
-            '/api/remove-background': {
-                'method': 'POST',
-                'description': 'Görüntünün arka planını kaldır (multipart/form-data)',
-                'parameters': {
-                    'image': 'Görüntü dosyası (PNG, JPG)',
-                    'model': 'ultra veya advanced (varsayılan: ultra)',
-                    'positioning': 'smart veya center (varsayılan: smart)',
-                    'enhance': 'true veya false (varsayılan: false)'
-                },
-                'example': """
-                curl -X POST https://cloth-segmentation-api.onrender.com/api/remove-background \\
-                  -F "image=@image.jpg" \\
-                  -F "model=ultra" \\
-                  -F "positioning=smart"
-                """
-            },
-            '/api/remove-background-base64': {
-                'method': 'POST',
-                'description': 'Base64 formatında görüntünün arka planını kaldır (iOS için)',
-                'parameters': {
-                    'image_base64': 'Base64 encoded görüntü',
-                    'model': 'ultra veya advanced',
-                    'positioning': 'smart veya center'
-                },
-                'example': """
-                curl -X POST https://cloth-segmentation-api.onrender.com/api/remove-background-base64 \\
-                  -H "Content-Type: application/json" \\
-                  -d '{"image_base64": "BASE64_IMAGE_DATA", "model": "ultra"}'
-                """
-            }
-        },
-        'swift_example': """
-        // Swift örnek kod
-        let url = URL(string: "https://cloth-segmentation-api.onrender.com/api/remove-background-base64")!
-        var request = URLRequest(url: url)
-        request.httpMethod = "POST"
-        request.setValue("application/json", forHTTPHeaderField: "Content-Type")
-        
-        let parameters: [String: Any] = [
-            "image_base64": imageBase64String,
-            "model": "ultra",
-            "positioning": "smart"
-        ]
-        
-        request.httpBody = try? JSONSerialization.data(withJSONObject: parameters)
-        
-        URLSession.shared.dataTask(with: request) { data, response, error in
-            // Handle response
-        }.resume()
-        """
-    }
-    return jsonify(docs)
 
 if __name__ == '__main__':
     port = int(os.environ.get('PORT', 8000))
     print(f"🚀 Server starting on port {port}")
-    print("💡 AI modeller ilk kullanımda yüklenecek (lazy loading)")
+    if WARMUP_MODELS:
+        print("💡 AI modeller arka planda ısıtılıyor, /health hazır olunca trafik alınabilir")
+        start_warmup()
+    else:
+        print("💡 AI modeller ilk kullanımda yüklenecek (lazy loading)")
     app.run(host='0.0.0.0', port=port, debug=False, threaded=True)
 
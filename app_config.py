@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Uygulama Ayarları
+config.json'u bir kez okur, bölüm bazında varsayılanlarla birleştirir
+"""
+
+import os
+import json
+
+CONFIG_PATH = os.environ.get(
+    'CLOTH_CONFIG',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'config.json')
+)
+
+_config = None
+
+
+def load_config(path=None):
+    """
+    config.json içeriğini döndür (ilk okumadan sonra bellekten)
+    Dosya yoksa ya da bozuksa boş sözlük
+    """
+    global _config
+    if path is None and _config is not None:
+        return _config
+
+    try:
+        with open(path or CONFIG_PATH, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"⚠️  Ayar dosyası okunamadı ({path or CONFIG_PATH}): {e}")
+        config = {}
+
+    if path is None:
+        _config = config
+    return config
+
+
+def get_settings(section, defaults=None):
+    """
+    Bir ayar bölümünü varsayılanların üzerine yazarak döndür
+    """
+    settings = dict(defaults or {})
+    settings.update(load_config().get(section) or {})
+    return settings
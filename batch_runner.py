@@ -0,0 +1,510 @@
+#!/usr/bin/env python3
+"""
+Paralel Toplu İşlem
+Klasör modları için thread havuzu (tek paylaşılan ONNX oturumu), süreç havuzu
+(süreç başına bir oturum) ya da üç aşamalı okuma/çıkarım/yazma pipeline'ı ile
+işleme, devam ettirilebilir işlem kaydı (manifest) ve özet raporu
+"""
+
+import os
+import json
+import time
+import queue
+import hashlib
+import threading
+import multiprocessing
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+
+SUPPORTED_FORMATS = {'.jpg', '.jpeg', '.png', '.bmp', '.tiff', '.webp'}
+
+# Remover'ların girdinin yanına yazdığı çıktı ekleri (ör. gomlek_no_bg_storefront.png)
+OUTPUT_SUFFIXES = (
+    '_no_bg', '_positioned', '_enhanced', '_storefront', '_with_shadow',
+    '_ultra_bg_removed', '_ai_positioned', '_ultra_enhanced'
+)
+
+# Süreç havuzunda her sürecin kendi remover'ı
+_worker_remover = None
+
+# Pipeline kuyruklarında aşama sonu işareti
+_STOP = object()
+
+
+def find_images(folder, supported_formats=SUPPORTED_FORMATS, skip_outputs=True):
+    """
+    Klasördeki desteklenen görüntü dosyalarını sıralı liste olarak döndür
+    skip_outputs: önceki çalıştırmaların aynı klasöre yazdığı çıktılar girdi sayılmaz
+    """
+    folder = Path(folder)
+    files = sorted(
+        f for f in folder.iterdir()
+        if f.is_file() and f.suffix.lower() in supported_formats
+    )
+    if not skip_outputs:
+        return files
+
+    stems = {f.stem for f in files}
+    return [f for f in files if not is_derived_output(f, stems)]
+
+
+def is_derived_output(path, stems):
+    """
+    <kaynak><ek...>.png biçiminde ve kaynağı aynı klasörde duran çıktı dosyası mı
+    """
+    path = Path(path)
+    if path.suffix.lower() != '.png':
+        return False
+
+    stem = path.stem
+    stripped = True
+    while stripped:
+        stripped = False
+        for suffix in OUTPUT_SUFFIXES:
+            if stem.endswith(suffix):
+                stem = stem[:-len(suffix)]
+                stripped = True
+                if stem in stems:
+                    return True
+    return False
+
+
+def file_hash(path, chunk_size=1024 * 1024):
+    """
+    Dosya içeriğinin sha256 özeti (parça parça okunur)
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def file_signature(path):
+    """
+    Hash'ten önce bakılan ucuz değişiklik imzası: boyut + değiştirilme zamanı
+    """
+    stat = os.stat(path)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+class BatchManifest:
+    """
+    Devam ettirilebilir toplu işlem kaydı (JSONL)
+    Her deneme bir satır olarak eklenir; aynı girdinin son satırı geçerlidir.
+    İçerik hash'i ve seçenekler aynı, durum 'ok' ve çıktılar diskte ise
+    girdi tekrar işlenmez; hatalı ya da değişmiş girdiler yeniden denenir.
+    Boyut ve mtime kayıttakiyle aynıysa dosya hash'lenmeden atlanır
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._entries = {}
+        self._outputs = set()
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        if not self.path.exists():
+            return
+
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                    self._entries[entry['input']] = entry
+                    self._add_outputs(entry)
+                except (ValueError, KeyError):
+                    # Çökme anında yarım yazılmış son satır olabilir
+                    continue
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _add_outputs(self, entry):
+        self._outputs.update(os.path.abspath(path) for path in entry.get('outputs', []))
+
+    def is_output(self, path):
+        """
+        Bu kayıttaki herhangi bir işlemin ürettiği dosya mı (tekrar girdi yapılmaz)
+        """
+        return os.path.abspath(path) in self._outputs
+
+    @staticmethod
+    def normalize_options(options):
+        return json.loads(json.dumps(options, sort_keys=True, default=str))
+
+    def is_done(self, input_path, options, content_hash=None, signature=None):
+        """
+        content_hash ya da (ucuz kontrol için) signature ile karşılaştır
+        """
+        entry = self._entries.get(str(input_path))
+        if not entry or entry.get('status') != 'ok':
+            return False
+        if content_hash is not None and entry.get('content_hash') != content_hash:
+            return False
+        if signature is not None and any(entry.get(k) != v for k, v in signature.items()):
+            return False
+        if entry.get('options') != self.normalize_options(options):
+            return False
+        return all(os.path.exists(path) for path in entry.get('outputs', []))
+
+    def record(self, result, content_hash, options):
+        """
+        İşlem sonucunu kayda ekle (satır hemen diske yazılır)
+        """
+        try:
+            signature = file_signature(result['input'])
+        except OSError:
+            signature = {}
+
+        entry = {
+            'input': str(result['input']),
+            'content_hash': content_hash,
+            **signature,
+            'options': self.normalize_options(options),
+            'outputs': [result['output']] if result['output'] else [],
+            'status': result['status'],
+            'error': result['error'],
+            'seconds': result['seconds'],
+            'finished_at': round(time.time(), 3)
+        }
+
+        with self._lock:
+            self._entries[entry['input']] = entry
+            self._add_outputs(entry)
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+                f.flush()
+
+
+def parse_batch_args(argv, default_workers=1, modes=('thread', 'process')):
+    """
+    Komut satırından --workers N, --mode <mod> ve --manifest <dosya>
+    seçeneklerini oku
+    """
+    options = {'workers': default_workers, 'mode': 'thread', 'manifest': None}
+
+    if '--workers' in argv:
+        index = argv.index('--workers')
+        if index + 1 < len(argv):
+            value = argv[index + 1]
+            options['workers'] = (os.cpu_count() or 1) if value == 'auto' else max(1, int(value))
+
+    if '--mode' in argv:
+        index = argv.index('--mode')
+        if index + 1 < len(argv) and argv[index + 1] in modes:
+            options['mode'] = argv[index + 1]
+
+    if '--manifest' in argv:
+        index = argv.index('--manifest')
+        if index + 1 < len(argv):
+            options['manifest'] = argv[index + 1]
+
+    return options
+
+
+def _filter_pending(image_files, manifest, options):
+    """
+    Manifest verilmişse tamamlanmış girdileri ve önceki çıktıları ayıkla
+    (manifest, bekleyen_dosyalar, içerik_hashleri, atlanan_sayısı) döndürür
+    Hash yalnızca boyut/mtime değişmiş ya da kaydı olmayan dosyalar için hesaplanır
+    """
+    image_files = [str(f) for f in image_files]
+    if manifest is None:
+        return None, image_files, {}, 0
+
+    if not isinstance(manifest, BatchManifest):
+        manifest = BatchManifest(manifest)
+
+    hashes = {}
+    pending = []
+    outputs = 0
+    for path in image_files:
+        if manifest.is_output(path):
+            outputs += 1
+            continue
+        if manifest.is_done(path, options, signature=file_signature(path)):
+            continue
+        hashes[path] = file_hash(path)
+        if not manifest.is_done(path, options, content_hash=hashes[path]):
+            pending.append(path)
+
+    skipped = len(image_files) - len(pending) - outputs
+    print(f"📒 Manifest: {manifest.path} - {skipped} tamamlanmış girdi atlandı"
+          + (f", {outputs} önceki çıktı girdi sayılmadı" if outputs else ""))
+    return manifest, pending, hashes, skipped
+
+
+def _print_progress(result, done, total, start):
+    icon = "✅" if result['status'] == 'ok' else "❌"
+    elapsed = time.time() - start
+    rate = done / elapsed if elapsed > 0 else 0.0
+    print(f"{icon} [{done}/{total}] {os.path.basename(result['input'])} "
+          f"({result['seconds']:.2f}s) - {rate:.2f} görüntü/sn")
+
+
+def _init_process_worker(remover_factory, factory_args):
+    global _worker_remover
+    _worker_remover = remover_factory(*factory_args)
+
+
+def _run_in_process_worker(method_name, image_path, method_kwargs):
+    return _run_one(_worker_remover, method_name, image_path, method_kwargs)
+
+
+def _run_one(remover, method_name, image_path, method_kwargs):
+    start = time.time()
+    try:
+        output = getattr(remover, method_name)(image_path, **method_kwargs)
+        status = 'ok' if output else 'failed'
+        error = None if output else 'İşlem sonuç üretmedi'
+    except Exception as e:
+        output = None
+        status = 'failed'
+        error = str(e)
+
+    return {
+        'input': image_path,
+        'output': str(output) if output else None,
+        'status': status,
+        'error': error,
+        'seconds': round(time.time() - start, 3)
+    }
+
+
+def run_batch(image_files, method_name, method_kwargs=None, remover=None,
+              remover_factory=None, factory_args=(), workers=1, mode='thread',
+              manifest=None):
+    """
+    Görüntüleri paralel işle ve özet döndür
+
+    thread:   verilen remover (tek ONNX oturumu) tüm thread'lerde paylaşılır;
+              decode, çıkarım ve encode adımları thread'ler arasında örtüşür
+    process:  her süreç remover_factory(*factory_args) ile kendi oturumunu açar
+    manifest: BatchManifest ya da dosya yolu; tamamlanmış girdiler atlanır
+    """
+    method_kwargs = method_kwargs or {}
+    manifest_options = {'method': method_name, **method_kwargs}
+    manifest, image_files, hashes, skipped = _filter_pending(
+        image_files, manifest, manifest_options
+    )
+
+    total = len(image_files)
+    workers = max(1, min(workers, total or 1))
+
+    print(f"⚡ Paralel işlem: {total} görüntü, {workers} worker ({mode})")
+
+    results = []
+    start = time.time()
+
+    if mode == 'process':
+        # fork, ONNX Runtime ve rembg'nin arka plan thread'leriyle güvenli değil;
+        # her süreç temiz bir yorumlayıcıda kendi oturumunu açar
+        executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_process_worker,
+            initargs=(remover_factory, factory_args)
+        )
+        submit = lambda path: executor.submit(
+            _run_in_process_worker, method_name, path, method_kwargs
+        )
+    else:
+        if remover is None:
+            remover = remover_factory(*factory_args)
+        executor = ThreadPoolExecutor(max_workers=workers)
+        submit = lambda path: executor.submit(
+            _run_one, remover, method_name, path, method_kwargs
+        )
+
+    with executor:
+        futures = [submit(path) for path in image_files]
+
+        for done, future in enumerate(as_completed(futures), 1):
+            result = future.result()
+            results.append(result)
+
+            if manifest is not None:
+                manifest.record(result, hashes[result['input']], manifest_options)
+
+            _print_progress(result, done, total, start)
+
+    summary = summarize(results, time.time() - start, workers, mode)
+    summary['skipped'] = skipped
+    print_summary(summary)
+    return summary
+
+
+def _run_stage(item, name, func, *args):
+    """
+    Pipeline aşamasını çalıştır; hata ya da boş sonuç öğeyi başarısız işaretler
+    """
+    stage_start = time.time()
+    try:
+        item['data'] = func(*args)
+        if item['data'] is None:
+            item['error'] = f"{name} aşaması sonuç üretmedi"
+    except Exception as e:
+        item['data'] = None
+        item['error'] = f"{name}: {e}"
+    item['stages'][name] = round(time.time() - stage_start, 3)
+
+
+def run_pipeline(image_files, read, infer, write, readers=2, writers=2, queue_size=4,
+                 manifest=None, manifest_options=None):
+    """
+    Üç aşamalı akış: okuma -> çıkarım -> yazma
+
+    read(path) -> veri         : decode + ön işleme, `readers` thread
+    infer(veri) -> veri        : model, tek thread (ONNX oturumu hep dolu kalır)
+    write(path, veri) -> çıktı : son işleme + encode/kayıt, `writers` thread
+
+    Aşamalar arası kuyruklar queue_size ile sınırlıdır; dolunca önceki aşama
+    bekler, böylece bellekteki çözülmüş görüntü sayısı sabit kalır
+    """
+    manifest_options = manifest_options or {}
+    manifest, image_files, hashes, skipped = _filter_pending(
+        image_files, manifest, manifest_options
+    )
+
+    total = len(image_files)
+    readers = max(1, min(readers, total or 1))
+    writers = max(1, min(writers, total or 1))
+
+    print(f"🔀 Pipeline: {total} görüntü, okuma {readers} / çıkarım 1 / "
+          f"yazma {writers} thread, kuyruk {queue_size}")
+
+    paths = queue.Queue()
+    for path in image_files:
+        paths.put(path)
+    decoded = queue.Queue(maxsize=queue_size)
+    inferred = queue.Queue(maxsize=queue_size)
+    finished = queue.Queue()
+
+    def reader():
+        while True:
+            try:
+                path = paths.get_nowait()
+            except queue.Empty:
+                break
+            item = {'input': path, 'start': time.time(), 'stages': {}, 'error': None}
+            _run_stage(item, 'read', read, path)
+            decoded.put(item)
+        decoded.put(_STOP)
+
+    def inferrer():
+        stopped = 0
+        while stopped < readers:
+            item = decoded.get()
+            if item is _STOP:
+                stopped += 1
+                continue
+            if item['error'] is None:
+                _run_stage(item, 'infer', infer, item['data'])
+            inferred.put(item)
+        for _ in range(writers):
+            inferred.put(_STOP)
+
+    def writer():
+        while True:
+            item = inferred.get()
+            if item is _STOP:
+                break
+            if item['error'] is None:
+                _run_stage(item, 'write', write, item['input'], item['data'])
+            finished.put(item)
+
+    threads = (
+        [threading.Thread(target=reader, name=f"pipeline-read-{i}", daemon=True)
+         for i in range(readers)] +
+        [threading.Thread(target=inferrer, name="pipeline-infer", daemon=True)] +
+        [threading.Thread(target=writer, name=f"pipeline-write-{i}", daemon=True)
+         for i in range(writers)]
+    )
+
+    results = []
+    start = time.time()
+    for thread in threads:
+        thread.start()
+
+    for done in range(1, total + 1):
+        item = finished.get()
+        ok = item['error'] is None
+        result = {
+            'input': item['input'],
+            'output': str(item['data']) if ok else None,
+            'status': 'ok' if ok else 'failed',
+            'error': item['error'],
+            'seconds': round(time.time() - item['start'], 3),
+            'stages': item['stages']
+        }
+        results.append(result)
+
+        if manifest is not None:
+            manifest.record(result, hashes[result['input']], manifest_options)
+
+        _print_progress(result, done, total, start)
+
+    for thread in threads:
+        thread.join()
+
+    elapsed = time.time() - start
+    summary = summarize(results, elapsed, writers, 'pipeline')
+    summary['skipped'] = skipped
+
+    # Çıkarım aşamasının doluluk oranı: 1'e yakınsa model hiç boşta beklemiyor
+    infer_seconds = sum(r['stages'].get('infer', 0) for r in results)
+    summary['stage_seconds'] = {
+        name: round(sum(r['stages'].get(name, 0) for r in results) / len(results), 3)
+        for name in ('read', 'infer', 'write')
+    } if results else {}
+    summary['inference_utilization'] = round(infer_seconds / elapsed, 3) if elapsed > 0 else 0.0
+
+    print_summary(summary)
+    return summary
+
+
+def summarize(results, elapsed, workers, mode):
+    """
+    Sonuç listesinden verim özeti çıkar
+    """
+    succeeded = [r for r in results if r['status'] == 'ok']
+    failed = [r for r in results if r['status'] != 'ok']
+    latencies = sorted(r['seconds'] for r in results)
+
+    return {
+        'total': len(results),
+        'succeeded': len(succeeded),
+        'failed': len(failed),
+        'skipped': 0,
+        'workers': workers,
+        'mode': mode,
+        'elapsed': round(elapsed, 2),
+        'images_per_second': round(len(results) / elapsed, 3) if elapsed > 0 else 0.0,
+        'avg_seconds': round(sum(latencies) / len(latencies), 3) if latencies else 0.0,
+        'p95_seconds': latencies[int(0.95 * (len(latencies) - 1))] if latencies else 0.0,
+        'results': results
+    }
+
+
+def print_summary(summary):
+    print(f"\n{'='*50}")
+    print("📊 Toplu işlem özeti")
+    print(f"{'='*50}")
+    print(f"📁 Toplam: {summary['total']}  ✅ Başarılı: {summary['succeeded']}  "
+          f"❌ Hatalı: {summary['failed']}  ⏭️  Atlanan: {summary['skipped']}")
+    print(f"⚙️  Worker: {summary['workers']} ({summary['mode']})")
+    print(f"⏱️  Süre: {summary['elapsed']:.2f}s - {summary['images_per_second']:.2f} görüntü/sn")
+    print(f"📈 Görüntü başına: ort {summary['avg_seconds']:.2f}s, p95 {summary['p95_seconds']:.2f}s")
+
+    if summary.get('stage_seconds'):
+        stages = summary['stage_seconds']
+        print(f"🔀 Aşama ortalamaları: okuma {stages['read']:.2f}s, "
+              f"çıkarım {stages['infer']:.2f}s, yazma {stages['write']:.2f}s "
+              f"- çıkarım doluluğu %{summary['inference_utilization'] * 100:.0f}")
+
+    for result in summary['results']:
+        if result['status'] != 'ok':
+            print(f"   ❌ {os.path.basename(result['input'])}: {result['error']}")
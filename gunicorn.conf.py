@@ -2,11 +2,25 @@ import os
 
 bind = f"0.0.0.0:{os.environ.get('PORT', 8000)}"
 workers = 1  # Model memory usage için tek worker
-worker_class = "sync"
+# Thread'li worker: eşzamanlı istekler mikro-batch zamanlayıcısında birleşir
+worker_class = "gthread"
+threads = int(os.environ.get('GUNICORN_THREADS', 8))
 worker_connections = 1000
 timeout = 300  # 5 minute timeout for image processing
 keepalive = 5
 max_requests = 100
 max_requests_jitter = 10
-preload_app = False  # Lazy loading için false
+# Varsayılan kapalı: ONNX Runtime oturumları fork güvenli olmadığından master'da
+# oluşturulamaz, model ağırlıkları ve ORT arenaları her worker'da ayrı yüklenir ve
+# copy-on-write ile paylaşılamaz. Açmak yalnızca import edilen kütüphane kod
+# sayfalarını (rembg/onnxruntime/numpy/cv2) paylaşır; bunun bedeli master'ın da
+# bu kütüphaneleri yüklemesi ve kod değişikliğinde reload'un çalışmamasıdır
+preload_app = os.environ.get('GUNICORN_PRELOAD', 'false').lower() == 'true'
 graceful_timeout = 60
+
+
+def post_worker_init(worker):
+    # ONNX Runtime oturumları fork güvenli değil: modeller her worker'da
+    # fork'tan sonra yüklenip ısıtılır, /health o zamana kadar 503 döner
+    import api_server
+    api_server.start_warmup()
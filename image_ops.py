@@ -0,0 +1,616 @@
+#!/usr/bin/env python3
+"""
+Ortak görüntü işlemleri
+Remover sınıflarının paylaştığı bellek içi segmentasyon ve varyant yardımcıları
+"""
+
+import io
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image
+import numpy as np
+import cv2
+
+from app_config import get_settings
+
+# Çözünürlüğe uyarlanır çıkarım: model küçültülmüş kopyada çalışır,
+# maske kılavuzlu filtre ile kaynak çözünürlüğe büyütülür
+INFERENCE_DEFAULTS = {
+    'adaptive': False,
+    'max_side': 1024,
+    'guided_radius': 8,
+    'guided_eps': 1e-4
+}
+
+# Döşemeli çıkarım: uzun kenarı min_side'ı aşan görüntüler örtüşen döşemelerle
+# işlenir, çalışma belleği görüntü boyutundan bağımsız olarak döşeme boyutuyla sınırlı kalır
+TILE_DEFAULTS = {
+    'enabled': True,
+    'min_side': 4096,
+    'tile_size': 2048,
+    'overlap': 256,
+    'coarse_side': 1024,
+    'skip_margin': 8
+}
+
+# İyileştirme faktörleri (ImageEnhance ile aynı anlam, 1.0 = değişiklik yok)
+# config.json enhance_settings.profiles altında profil bazında değiştirilebilir
+ENHANCE_DEFAULTS = {
+    'contrast_factor': 1.0,
+    'brightness_factor': 1.0,
+    'sharpness_factor': 1.0,
+    'color_factor': 1.0
+}
+
+# Gölge: ofset (piksel), blur_radius (gölgenin nesneden taştığı mesafe, piksel),
+# opacity (0-255), color (RGB). config.json shadow_settings ile değiştirilir
+SHADOW_DEFAULTS = {
+    'offset_x': 10,
+    'offset_y': 15,
+    'blur_radius': 15,
+    'opacity': 100,
+    'color': [0, 0, 0]
+}
+
+# Bölge sınırlı son işlemede nesne kutusuna eklenen pay (3x3 çekirdek için 1 yeterli)
+ROI_MARGIN = 2
+
+# PIL "L" dönüşüm ağırlıkları (ImageEnhance.Color/Contrast bunları kullanır)
+LUMA_WEIGHTS = (0.299, 0.587, 0.114)
+
+
+def predict_mask(session, img):
+    """
+    Modeli doğrudan çalıştır, maskeyi uint8 numpy dizisi olarak döndür
+    rembg.remove'un PNG encode/decode adımlarını atlar
+    """
+    if img.mode != "RGB":
+        img = img.convert("RGB")
+
+    return merge_masks(session.predict(img))
+
+
+def merge_masks(masks):
+    """
+    Birden fazla maske dönen modellerde (ör. u2net_cloth_seg: üst/alt/tam)
+    maskeleri tek bir kıyafet maskesinde birleştir
+    """
+    mask = np.asarray(masks[0].convert("L"), dtype=np.uint8)
+    for extra in masks[1:]:
+        mask = np.maximum(mask, np.asarray(extra.convert("L"), dtype=np.uint8))
+
+    return mask
+
+
+def apply_mask(img, mask):
+    """
+    Maskeyi alpha kanalı olarak uygula, RGBA PIL görüntüsü döndür
+    """
+    rgba = img.convert("RGBA")
+    rgba.putalpha(Image.fromarray(mask))
+    return rgba
+
+
+def get_inference_settings():
+    """
+    config.json inference_settings bölümünü varsayılanlarla birleştir
+    """
+    return get_settings('inference_settings', INFERENCE_DEFAULTS)
+
+
+def inference_copy(img, max_side):
+    """
+    Model için uzun kenarı max_side'ı geçmeyen RGB kopya
+    Görüntü zaten küçükse kendisi döner (büyütme yapılmaz)
+    """
+    if img.mode != "RGB":
+        img = img.convert("RGB")
+    if max(img.size) <= max_side:
+        return img
+
+    small = img.copy()
+    small.thumbnail((max_side, max_side), Image.Resampling.BILINEAR, reducing_gap=2.0)
+    return small
+
+
+def guided_upsample(mask, guide, radius=8, eps=1e-4):
+    """
+    Düşük çözünürlüklü maskeyi kılavuz görüntünün boyutuna kenar korumalı büyüt
+    (hızlı kılavuzlu filtre: katsayılar maske çözünürlüğünde hesaplanır,
+    yalnızca a*I + b adımı tam çözünürlükte yapılır)
+    mask: uint8 (yükseklik, genişlik), guide: tam boyutlu PIL görüntüsü
+    """
+    width, height = guide.size
+    mask_height, mask_width = mask.shape
+    guide_gray = guide.convert("L")
+
+    low_guide = np.asarray(
+        guide_gray.resize((mask_width, mask_height), Image.Resampling.BILINEAR),
+        dtype=np.float32
+    ) / 255.0
+    low_mask = mask.astype(np.float32) / 255.0
+
+    ksize = (2 * radius + 1, 2 * radius + 1)
+
+    def box(arr):
+        return cv2.boxFilter(arr, -1, ksize)
+
+    mean_i = box(low_guide)
+    mean_p = box(low_mask)
+    cov_ip = box(low_guide * low_mask) - mean_i * mean_p
+    var_i = box(low_guide * low_guide) - mean_i * mean_i
+
+    a = cov_ip / (var_i + eps)
+    b = mean_p - a * mean_i
+
+    # Ortalama katsayıları tam çözünürlüğe taşı ve kılavuza uygula
+    full_a = cv2.resize(box(a), (width, height), interpolation=cv2.INTER_LINEAR)
+    full_b = cv2.resize(box(b), (width, height), interpolation=cv2.INTER_LINEAR)
+
+    full_guide = np.asarray(guide_gray, dtype=np.float32)
+    full_a *= full_guide
+    full_b *= 255.0
+    full_a += full_b
+
+    return np.clip(full_a + 0.5, 0, 255).astype(np.uint8)
+
+
+def upsample_mask(mask, img, settings=None):
+    """
+    Maske görüntüden küçükse kılavuzlu filtre ile görüntü boyutuna getir
+    """
+    if mask.shape == (img.height, img.width):
+        return mask
+
+    settings = settings or get_inference_settings()
+    return guided_upsample(
+        mask, img,
+        radius=int(settings['guided_radius']),
+        eps=float(settings['guided_eps'])
+    )
+
+
+def get_tile_settings():
+    """
+    config.json tile_settings bölümünü varsayılanlarla birleştir
+    """
+    return get_settings('tile_settings', TILE_DEFAULTS)
+
+
+def needs_tiling(img, settings=None):
+    """
+    Görüntü döşemeli çıkarım eşiğini aşıyor mu (img: PIL görüntüsü ya da (genişlik, yükseklik))
+    """
+    settings = settings or get_tile_settings()
+    size = img.size if isinstance(img, Image.Image) else img
+    return bool(settings['enabled']) and max(size) > int(settings['min_side'])
+
+
+def _tile_starts(length, tile_size, overlap):
+    """
+    Bir eksen boyunca döşeme başlangıçları; son döşeme kenara hizalanır
+    """
+    if length <= tile_size:
+        return [0]
+    starts = list(range(0, length - tile_size, tile_size - overlap))
+    starts.append(length - tile_size)
+    return starts
+
+
+def _ramp(length, lead):
+    """
+    Bir eksen boyunca ağırlık: ilk `lead` piksel 0'dan 1'e yükselir, kalanı 1
+    """
+    weights = np.ones(length, dtype=np.float32)
+    if lead > 0:
+        weights[:lead] = (np.arange(lead, dtype=np.float32) + 0.5) / lead
+    return weights
+
+
+def tiled_predict_mask(predict, img, settings=None, coarse_img=None):
+    """
+    Çok büyük görüntüler için döşemeli maske tahmini
+    1. Küçültülmüş kopyada kaba maske (genel bağlam)
+    2. Kaba maskeye göre tamamen içeride/dışarıda kalan döşemeler modelden geçmez
+    3. Nesne kenarına denk gelen döşemeler tam çözünürlükte modelden geçer
+    4. Döşemeler satır sırasıyla yazılır; sol/üst örtüşmede önceki döşemeyle
+       doğrusal geçişle harmanlanır (ek görünmez)
+    predict(PIL) -> uint8 maske; uint8 (yükseklik, genişlik) maske döndürür
+    """
+    settings = settings or get_tile_settings()
+    tile_size = int(settings['tile_size'])
+    overlap = min(int(settings['overlap']), tile_size // 2)
+    margin = int(settings['skip_margin'])
+
+    if img.mode != "RGB":
+        img = img.convert("RGB")
+    width, height = img.size
+
+    if coarse_img is None:
+        coarse_img = inference_copy(img, int(settings['coarse_side']))
+    coarse = Image.fromarray(predict(coarse_img))
+    scale_x = coarse.width / width
+    scale_y = coarse.height / height
+
+    mask = np.zeros((height, width), dtype=np.uint8)
+    xs = _tile_starts(width, tile_size, overlap)
+    ys = _tile_starts(height, tile_size, overlap)
+    refined = 0
+
+    for row, y0 in enumerate(ys):
+        y1 = min(y0 + tile_size, height)
+        # Önceki satırla gerçek örtüşme (son döşeme kenara hizalandığı için değişebilir)
+        top = ys[row - 1] + tile_size - y0 if row > 0 else 0
+
+        for col, x0 in enumerate(xs):
+            x1 = min(x0 + tile_size, width)
+            left = xs[col - 1] + tile_size - x0 if col > 0 else 0
+
+            coarse_box = (x0 * scale_x, y0 * scale_y, x1 * scale_x, y1 * scale_y)
+            low = np.asarray(coarse.crop(tuple(int(round(v)) for v in coarse_box)))
+
+            if low.size and (low.min() >= 255 - margin or low.max() <= margin):
+                # Tamamen nesne içinde ya da dışında: kaba maske yeterli
+                tile_mask = np.asarray(coarse.resize(
+                    (x1 - x0, y1 - y0), Image.Resampling.BILINEAR, box=coarse_box
+                ))
+            else:
+                tile_mask = predict(img.crop((x0, y0, x1, y1)))
+                refined += 1
+
+            if top == 0 and left == 0:
+                mask[y0:y1, x0:x1] = tile_mask
+                continue
+
+            weights = _ramp(y1 - y0, top)[:, None] * _ramp(x1 - x0, left)[None, :]
+            region = mask[y0:y1, x0:x1].astype(np.float32)
+            region += (tile_mask.astype(np.float32) - region) * weights
+            mask[y0:y1, x0:x1] = np.clip(region + 0.5, 0, 255).astype(np.uint8)
+
+    print(f"🧩 Döşemeli çıkarım: {len(xs) * len(ys)} döşeme, {refined} tanesi modelden geçti")
+    return mask
+
+
+def get_enhance_settings(profile=None):
+    """
+    config.json enhance_settings bölümü; profile verilirse profiles[profile]
+    değerleri üst düzey değerlerin üzerine yazılır
+    """
+    settings = get_settings('enhance_settings', ENHANCE_DEFAULTS)
+    profiles = settings.pop('profiles', None) or {}
+    if profile is not None:
+        settings.update(profiles.get(profile) or {})
+    return settings
+
+
+def _luma_mean(histogram, pixel_count):
+    """
+    L (gri) ortalaması; gri kopya oluşturmadan RGB kanal histogramlarından
+    histogram: 768 elemanlı R, G, B histogramı
+    """
+    histogram = np.asarray(histogram[:768], dtype=np.float64).reshape(3, 256)
+    channel_means = histogram @ np.arange(256) / pixel_count
+    return int(float(np.dot(LUMA_WEIGHTS, channel_means)) + 0.5)
+
+
+def enhancement_matrix(mean, contrast=1.0, brightness=1.0, color=1.0):
+    """
+    Kontrast -> parlaklık -> doygunluk adımlarını tek bir 3x4 afin matrise katla
+    (cv2.transform ile tek geçişte uygulanır)
+    """
+    weights = np.array([LUMA_WEIGHTS] * 3)
+    # Kontrast: ortalamaya göre ölçekle, parlaklık: siyaha göre ölçekle
+    linear = np.eye(3) * contrast * brightness
+    offset = np.full(3, (1.0 - contrast) * mean * brightness)
+    # Doygunluk: kendi grisi ile karışım
+    saturation = color * np.eye(3) + (1.0 - color) * weights
+    linear = saturation @ linear
+    offset = saturation @ offset
+    return np.hstack([linear, offset[:, None]]).astype(np.float32)
+
+
+def sharpen_kernel(factor):
+    """
+    ImageEnhance.Sharpness ile aynı sonuç veren tek 3x3 çekirdek:
+    factor * görüntü + (1 - factor) * SMOOTH(görüntü)
+    """
+    smooth = np.array([1, 1, 1, 1, 5, 1, 1, 1, 1], dtype=np.float64) / 13
+    identity = np.zeros(9)
+    identity[4] = 1.0
+    weights = factor * identity + (1.0 - factor) * smooth
+    return weights.reshape(3, 3).astype(np.float32)
+
+
+def expand_box(box, margin, size):
+    """
+    (sol, üst, sağ, alt) kutusunu her yönde margin kadar büyüt, görüntüyle sınırla
+    """
+    width, height = size
+    return (
+        max(0, box[0] - margin),
+        max(0, box[1] - margin),
+        min(width, box[2] + margin),
+        min(height, box[3] + margin)
+    )
+
+
+def enhance_rgba(img, settings, flatten=True):
+    """
+    Kontrast/parlaklık/doygunluk tek afin renk dönüşümü, keskinlik tek
+    evrişim olarak uygulanır (ImageEnhance zincirinin dört ayrı geçişi yerine).
+    Yalnızca nesnenin sınır kutusu (+ çekirdek payı) işlenir; kutu dışı
+    tamamen şeffaf olduğundan sabit değerle doldurulur, sonuç tam kare
+    işlemle aynıdır.
+    flatten: renkler önce beyaz zemin üzerine alınır (e-ticaret çıktısı)
+    Alpha kanalı değişmez, RGBA döndürür
+    """
+    if img.mode != "RGBA":
+        img = img.convert("RGBA")
+    size = img.size
+    pixel_count = size[0] * size[1]
+
+    box = alpha_bbox(img)
+    if box is None:
+        box = (0, 0) + size
+    # Keskinlik çekirdeği 3x3: kutu dışındaki bir piksellik halka yeterli
+    roi_box = expand_box(box, ROI_MARGIN, size)
+    roi = img if roi_box == (0, 0) + size else img.crop(roi_box)
+    alpha = roi.getchannel("A")
+
+    if flatten:
+        rgb = Image.new("RGB", roi.size, (255, 255, 255))
+        rgb.paste(roi, mask=alpha)
+        fill = (255, 255, 255)
+    else:
+        rgb = roi.convert("RGB")
+        fill = None
+
+    contrast = float(settings['contrast_factor'])
+    brightness = float(settings['brightness_factor'])
+    color = float(settings['color_factor'])
+    sharpness = float(settings['sharpness_factor'])
+
+    arr = np.asarray(rgb)
+
+    if (contrast, brightness, color) != (1.0, 1.0, 1.0):
+        mean = 0
+        if contrast != 1.0:
+            if flatten:
+                # Kutu dışı beyaz zemin ortalamaya histogramla eklenir
+                histogram = rgb.histogram()
+                for channel in range(3):
+                    histogram[channel * 256 + 255] += pixel_count - roi.width * roi.height
+            else:
+                histogram = img.histogram()
+            mean = _luma_mean(histogram, pixel_count)
+
+        matrix = enhancement_matrix(mean, contrast, brightness, color)
+        arr = cv2.transform(arr, matrix)
+        if fill is not None:
+            fill = tuple(int(v) for v in cv2.transform(np.full((1, 1, 3), 255, np.uint8), matrix)[0, 0])
+
+    if sharpness != 1.0:
+        arr = cv2.filter2D(arr, -1, sharpen_kernel(sharpness), borderType=cv2.BORDER_REPLICATE)
+
+    result = Image.fromarray(arr)
+    result.putalpha(alpha)
+
+    if roi is img:
+        return result
+
+    canvas = Image.new("RGBA", size, (fill or (0, 0, 0)) + (0,))
+    canvas.paste(result, roi_box[:2])
+    return canvas
+
+
+def get_shadow_settings():
+    """
+    config.json shadow_settings bölümünü varsayılanlarla birleştir
+    """
+    return get_settings('shadow_settings', SHADOW_DEFAULTS)
+
+
+def blur_alpha(alpha, radius):
+    """
+    uint8 alpha'yı Gauss ile bulanıklaştır, 0-1 float32 döndür
+    Büyük yarıçaplarda bulanıklık küçültülmüş kopyada yapılıp geri büyütülür;
+    maliyet yarıçaptan neredeyse bağımsızdır
+    """
+    if radius <= 0:
+        return alpha.astype(np.float32) / 255.0
+
+    height, width = alpha.shape
+    # Yarıçap ~3 sigma; küçük kopyada sigma 2 piksel civarında tutulur
+    sigma = radius / 3.0
+    factor = max(1, int(sigma // 2))
+
+    if factor > 1:
+        small = cv2.resize(
+            alpha,
+            (max(1, width // factor), max(1, height // factor)),
+            interpolation=cv2.INTER_AREA
+        )
+    else:
+        small = alpha
+
+    small = cv2.GaussianBlur(small.astype(np.float32) / 255.0, (0, 0), sigma / factor)
+
+    if small.shape != alpha.shape:
+        small = cv2.resize(small, (width, height), interpolation=cv2.INTER_LINEAR)
+    return small
+
+
+def render_shadow(img, settings=None):
+    """
+    RGBA görüntünün altına yumuşak düşen gölge ekle (bellek içi)
+    Gölge nesne alfasından üretilir, yalnızca gölge kutusunda tek numpy
+    geçişiyle alpha-over (görüntü gölgenin üstünde) birleştirilir.
+    Canvas, görüntü ve gölgenin tamamını içerecek kadar genişletilir
+    """
+    settings = settings or get_shadow_settings()
+    if img.mode != "RGBA":
+        img = img.convert("RGBA")
+    width, height = img.size
+
+    box = alpha_bbox(img)
+    if box is None:
+        return img.copy()
+
+    offset_x = int(settings['offset_x'])
+    offset_y = int(settings['offset_y'])
+    radius = max(0, int(settings['blur_radius']))
+    opacity = min(255, max(0, int(settings['opacity']))) / 255.0
+    shadow_color = np.asarray(settings.get('color') or (0, 0, 0), dtype=np.float32)[:3]
+
+    # Gölge kaynağı: nesne kutusu + bulanıklık payı (görüntü dışı sıfırla doldurulur)
+    source_box = (box[0] - radius, box[1] - radius, box[2] + radius, box[3] + radius)
+    shadow = blur_alpha(np.asarray(img.getchannel("A").crop(source_box)), radius)
+    shadow *= opacity
+
+    # Canvas: görüntü [0, w) x [0, h) ile kaydırılmış gölge kutusunun birleşimi
+    shadow_left, shadow_top = source_box[0] + offset_x, source_box[1] + offset_y
+    canvas_left, canvas_top = min(0, shadow_left), min(0, shadow_top)
+    canvas_right = max(width, source_box[2] + offset_x)
+    canvas_bottom = max(height, source_box[3] + offset_y)
+
+    canvas = Image.new("RGBA", (canvas_right - canvas_left, canvas_bottom - canvas_top), (0, 0, 0, 0))
+    canvas.paste(img, (-canvas_left, -canvas_top))
+
+    # Gölge kutusu canvas koordinatlarında; üstteki görüntü pikselleri ile birleştir
+    region_box = (
+        shadow_left - canvas_left,
+        shadow_top - canvas_top,
+        shadow_left - canvas_left + shadow.shape[1],
+        shadow_top - canvas_top + shadow.shape[0]
+    )
+    front = np.asarray(canvas.crop(region_box))
+    front_alpha = front[:, :, 3].astype(np.float32)
+    front_alpha *= 1.0 / 255.0
+
+    # Alpha-over: ön plan gölgenin üstünde, düz (premultiplied olmayan) çıktı
+    #   a = a_f + a_g * (1 - a_f),  rgb = (rgb_f * a_f + renk * a_g * (1 - a_f)) / a
+    shadow *= 1.0 - front_alpha
+    out_alpha = front_alpha + shadow
+    safe_alpha = np.maximum(out_alpha, 1e-6)
+    front_alpha /= safe_alpha
+    shadow /= safe_alpha
+
+    out_rgb = front[:, :, :3] * front_alpha[:, :, None]
+    if shadow_color.any():
+        out_rgb += shadow_color * shadow[:, :, None]
+    out_rgb += 0.5
+    out_alpha *= 255.0
+    out_alpha += 0.5
+
+    result = np.empty(front.shape, dtype=np.uint8)
+    np.clip(out_rgb, 0, 255, out=out_rgb)
+    result[:, :, :3] = out_rgb
+    result[:, :, 3] = np.minimum(out_alpha, 255)
+    canvas.paste(Image.fromarray(result, "RGBA"), region_box[:2])
+    return canvas
+
+
+def alpha_bbox(img, threshold=0):
+    """
+    Alfa değeri threshold'dan büyük piksellerin sınır kutusu
+    PIL biçiminde (sol, üst, sağ, alt) döndürür, sağ/alt hariç; nesne yoksa None.
+    np.where yerine tek kanalda C tarafında satır/sütun taraması yapar,
+    tam boyutlu indeks dizileri oluşturmaz
+    """
+    if img.mode != "RGBA":
+        img = img.convert("RGBA")
+
+    alpha = img.getchannel("A")
+    if threshold > 0:
+        alpha = alpha.point(lambda value: 255 if value > threshold else 0)
+
+    return alpha.getbbox()
+
+
+def crop_to_alpha(img, threshold=0):
+    """
+    Görüntüyü nesnenin sınır kutusuna kırp
+    (kırpılmış görüntü, kutu) döndürür; yalnızca kutu bölgesi kopyalanır
+    """
+    box = alpha_bbox(img, threshold)
+    if box is None:
+        return None, None
+    return img.crop(box), box
+
+
+def build_variants(img, sizes):
+    """
+    Varyantları piramit şeklinde üret: büyükten küçüğe, her seviye bir önceki
+    küçültülmüş görüntüden türetilir (kaynak yeterince büyük olduğu sürece).
+    sizes: {isim: (genişlik, yükseklik)} -> {isim: ortalanmış RGBA canvas}
+    """
+    if img.mode != "RGBA":
+        img = img.convert("RGBA")
+
+    def scale_for(size):
+        return min(1.0, size[0] / img.width, size[1] / img.height)
+
+    level, level_scale = img, 1.0
+    canvases = {}
+
+    for name in sorted(sizes, key=lambda n: scale_for(sizes[n]), reverse=True):
+        size = sizes[name]
+        scale = scale_for(size)
+
+        # Önceki seviye bu boyut için yeterli çözünürlükteyse onu küçült
+        scaled = (level if level_scale >= scale else img).copy()
+        scaled.thumbnail(size, Image.Resampling.LANCZOS)
+
+        canvas = Image.new("RGBA", size, (0, 0, 0, 0))
+        paste_x = (size[0] - scaled.width) // 2
+        paste_y = (size[1] - scaled.height) // 2
+        canvas.paste(scaled, (paste_x, paste_y), scaled)
+
+        canvases[name] = canvas
+        level, level_scale = scaled, scale
+
+    return {name: canvases[name] for name in sizes}
+
+
+def encode_images(images, format="PNG", workers=4, **save_kwargs):
+    """
+    {isim: PIL görüntüsü} sözlüğünü paralel encode et -> {isim: bayt}
+    (zlib/encoder C tarafında GIL'i bıraktığı için thread'ler gerçekten örtüşür)
+    """
+    def encode(img):
+        buffer = io.BytesIO()
+        img.save(buffer, format, **save_kwargs)
+        return buffer.getvalue()
+
+    names = list(images)
+    if len(names) <= 1 or workers <= 1:
+        return {name: encode(images[name]) for name in names}
+
+    with ThreadPoolExecutor(max_workers=min(workers, len(names))) as executor:
+        return dict(zip(names, executor.map(encode, (images[name] for name in names))))
+
+
+def create_variants(img, sizes, output_dir=None, file_names=None, format="PNG", workers=4):
+    """
+    Tek kaynaktan tüm varyantları üret ve paralel encode et
+    output_dir verilmezse {isim: bayt}, verilirse {isim: dosya_yolu} döndürür
+    file_names: {isim: dosya_adı} (varsayılan "<isim>.png")
+    """
+    encoded = encode_images(build_variants(img, sizes), format=format, workers=workers)
+
+    if output_dir is None:
+        return encoded
+
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    paths = {}
+    for name, data in encoded.items():
+        file_name = (file_names or {}).get(name, f"{name}.{format.lower()}")
+        path = output_dir / file_name
+        with open(path, 'wb') as f:
+            f.write(data)
+        paths[name] = str(path)
+
+    return paths
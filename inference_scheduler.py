@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Mikro-batch Çıkarım Zamanlayıcısı
+Eşzamanlı istekleri kısa bir süre toplayıp paylaşılan ONNX oturumunda
+tek bir batch olarak çalıştırır
+"""
+
+import threading
+import queue
+import time
+from concurrent.futures import Future
+
+from PIL import Image
+import numpy as np
+
+from image_ops import predict_mask, merge_masks
+
+# rembg oturumlarının ön/son işleme parametreleri (batch halinde çalıştırmak için)
+# 'output': 'sigmoid' -> min/max normalize edilmiş tek kanal
+#           'cloth'   -> sınıf argmax'ı, rembg gibi sınıf başına paletle ayrılır
+BATCH_MODEL_SPECS = {
+    'u2net': {
+        'mean': (0.485, 0.456, 0.406), 'std': (0.229, 0.224, 0.225),
+        'size': (320, 320), 'output': 'sigmoid'
+    },
+    'u2netp': {
+        'mean': (0.485, 0.456, 0.406), 'std': (0.229, 0.224, 0.225),
+        'size': (320, 320), 'output': 'sigmoid'
+    },
+    'u2net_human_seg': {
+        'mean': (0.485, 0.456, 0.406), 'std': (0.229, 0.224, 0.225),
+        'size': (320, 320), 'output': 'sigmoid'
+    },
+    'silueta': {
+        'mean': (0.485, 0.456, 0.406), 'std': (0.229, 0.224, 0.225),
+        'size': (320, 320), 'output': 'sigmoid'
+    },
+    'isnet-general-use': {
+        'mean': (0.5, 0.5, 0.5), 'std': (1.0, 1.0, 1.0),
+        'size': (1024, 1024), 'output': 'sigmoid'
+    },
+    'u2net_cloth_seg': {
+        'mean': (0.485, 0.456, 0.406), 'std': (0.229, 0.224, 0.225),
+        'size': (768, 768), 'output': 'cloth'
+    },
+}
+
+# rembg Unet2ClothSession paletleri: üst, alt ve tam kıyafet sınıfları.
+# Etiket haritası LANCZOS ile büyütüldükten sonra uygulanır; kenarlarda oluşan
+# ara etiketler de rembg'deki gibi sınıflanır
+CLOTH_PALETTES = (
+    [0, 0, 0, 255, 255, 255, 0, 0, 0, 0, 0, 0],
+    [0, 0, 0, 0, 0, 0, 255, 255, 255, 0, 0, 0],
+    [0, 0, 0, 0, 0, 0, 0, 0, 0, 255, 255, 255],
+)
+
+
+def cloth_masks(pred, size):
+    """
+    Sınıf skorlarından (C, H, W) rembg'nin döndürdüğü üç kıyafet maskesini üret
+    """
+    labels = Image.fromarray(np.argmax(pred, axis=0).astype("uint8"), mode="L")
+    labels = labels.resize(size, Image.Resampling.LANCZOS)
+
+    masks = []
+    for palette in CLOTH_PALETTES:
+        mask = labels.copy()
+        mask.putpalette(palette)
+        masks.append(mask.convert("RGB").convert("L"))
+    return masks
+
+
+def supports_batching(session):
+    """
+    Oturum batch çıkarımı destekliyor mu?
+    Model bilinmeli ve girdi tensörünün batch boyutu sabit 1 olmamalı
+    """
+    model_name = getattr(session, 'model_name', None)
+    if model_name not in BATCH_MODEL_SPECS:
+        return False
+
+    inner = getattr(session, 'inner_session', None)
+    if inner is None:
+        return False
+
+    try:
+        batch_dim = inner.get_inputs()[0].shape[0]
+    except Exception:
+        return False
+
+    # Dinamik boyutlar isim (str) ya da None olarak gelir
+    return not (isinstance(batch_dim, int) and batch_dim == 1)
+
+
+def predict_masks_batched(session, images):
+    """
+    Birden fazla görüntüyü tek bir ONNX çağrısında çalıştır
+    Her görüntü için uint8 maske dizisi döndürür; son işleme session.predict +
+    predict_mask ile aynıdır, sonuç isteğin batch'e düşüp düşmemesine bağlı değildir
+    """
+    spec = BATCH_MODEL_SPECS[session.model_name]
+
+    inputs = [
+        session.normalize(img, spec['mean'], spec['std'], spec['size'])
+        for img in images
+    ]
+    input_name = next(iter(inputs[0]))
+    batch = np.concatenate([item[input_name] for item in inputs], axis=0)
+
+    ort_outs = session.inner_session.run(None, {input_name: batch})
+
+    masks = []
+    for i, img in enumerate(images):
+        if spec['output'] == 'cloth':
+            masks.append(merge_masks(cloth_masks(ort_outs[0][i], img.size)))
+            continue
+
+        pred = ort_outs[0][i, 0, :, :]
+        ma = np.max(pred)
+        mi = np.min(pred)
+        pred = (pred - mi) / max(ma - mi, 1e-6)
+        mask = Image.fromarray((pred.clip(0, 1) * 255).astype("uint8"))
+
+        mask = mask.resize(img.size, Image.Resampling.LANCZOS)
+        masks.append(np.asarray(mask, dtype=np.uint8))
+
+    return masks
+
+
+class BatchInferenceScheduler:
+    """
+    İstekleri en fazla max_wait_ms kadar ya da max_batch_size dolana kadar
+    toplayıp tek batch olarak çalıştırır, sonucu her çağırana geri verir
+    """
+
+    def __init__(self, session, max_batch_size=4, max_wait_ms=15):
+        self.session = session
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+        self.batching = supports_batching(session)
+
+        self.stats = {
+            'batches': 0,
+            'images': 0,
+            'largest_batch': 0
+        }
+        self._stats_lock = threading.Lock()
+        self._queue = queue.Queue()
+
+        self._worker = threading.Thread(
+            target=self._run,
+            name=f"batch-inference-{getattr(session, 'model_name', 'model')}",
+            daemon=True
+        )
+        self._worker.start()
+
+        mode = "batch" if self.batching else "sıralı (model batch desteklemiyor)"
+        print(f"⚙️  Çıkarım zamanlayıcısı: B={self.max_batch_size}, "
+              f"bekleme={max_wait_ms}ms, mod={mode}")
+
+    def submit(self, img):
+        """
+        Görüntüyü kuyruğa ekle, maske için Future döndür
+        """
+        future = Future()
+        self._queue.put((img, future))
+        return future
+
+    def predict_mask(self, img):
+        """
+        Görüntüyü kuyruğa ekle ve maskeyi bekle
+        """
+        return self.submit(img).result()
+
+    def queue_depth(self):
+        return self._queue.qsize()
+
+    def get_stats(self):
+        with self._stats_lock:
+            stats = dict(self.stats)
+        stats['batching'] = self.batching
+        stats['max_batch_size'] = self.max_batch_size
+        stats['max_wait_ms'] = round(self.max_wait * 1000, 2)
+        stats['queue_depth'] = self.queue_depth()
+        stats['avg_batch_size'] = (
+            round(stats['images'] / stats['batches'], 2) if stats['batches'] else 0
+        )
+        return stats
+
+    def _collect_batch(self):
+        """
+        İlk isteği bekle, ardından süre ya da boyut sınırına kadar topla
+        """
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect_batch()
+            images = [img for img, _ in batch]
+
+            try:
+                if self.batching and len(images) > 1:
+                    masks = predict_masks_batched(self.session, images)
+                else:
+                    masks = [predict_mask(self.session, img) for img in images]
+            except Exception as e:
+                print(f"❌ Batch çıkarım hatası: {e}")
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            for (_, future), mask in zip(batch, masks):
+                future.set_result(mask)
+
+            with self._stats_lock:
+                self.stats['batches'] += 1
+                self.stats['images'] += len(batch)
+                self.stats['largest_batch'] = max(self.stats['largest_batch'], len(batch))
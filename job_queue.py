@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Asenkron İş Kuyruğu
+Uzun süren işlemleri sınırlı bir kuyruk ve worker havuzu ile arka planda çalıştırır
+"""
+
+import os
+import threading
+import queue
+import time
+import uuid
+from collections import OrderedDict
+
+
+class JobQueueFull(Exception):
+    """Kuyruk dolu, yeni iş kabul edilemiyor"""
+
+
+class JobQueue:
+    """
+    Sınırlı iş kuyruğu + worker havuzu
+    Her iş bir id ile izlenir; durum, süre ve sonuç get_job ile sorgulanır
+    """
+
+    def __init__(self, max_queue_size=16, workers=2, max_finished_jobs=500):
+        self.max_finished_jobs = max_finished_jobs
+        self.worker_count = workers
+        self._queue = queue.Queue(maxsize=max_queue_size)
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+        self._workers = []
+        self._workers_pid = None
+        self._start_workers()
+
+        # fork sonrası (gunicorn preload_app) thread'ler çocuk sürece geçmez
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._reset_after_fork)
+
+        print(f"⚙️  İş kuyruğu: {workers} worker, kapasite {max_queue_size}")
+
+    def _reset_after_fork(self):
+        """
+        Çocuk süreçte kuyruğu ve kilidi yeniden kur; eski kuyruğun koşul
+        değişkeni ölü thread'leri bekleyen olarak tutar, bildirimler kaybolur.
+        Worker'lar ilk submit'te başlatılır
+        """
+        self._queue = queue.Queue(maxsize=self._queue.maxsize)
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self._workers = []
+        self._workers_pid = None
+
+    def _start_workers(self):
+        """
+        Worker thread'lerini bu süreçte (henüz başlamadıysa) başlat
+        """
+        with self._lock:
+            if self._workers_pid == os.getpid():
+                return
+            self._workers_pid = os.getpid()
+            self._workers = []
+            for i in range(self.worker_count):
+                worker = threading.Thread(target=self._run, name=f"job-worker-{i}", daemon=True)
+                worker.start()
+                self._workers.append(worker)
+
+    def submit(self, func, *args, **kwargs):
+        """
+        İşi kuyruğa ekle ve iş id'sini döndür
+        Kuyruk doluysa JobQueueFull fırlatır
+        """
+        self._start_workers()
+        job_id = uuid.uuid4().hex
+        job = {
+            'id': job_id,
+            'status': 'queued',
+            'created_at': time.time(),
+            'started_at': None,
+            'finished_at': None,
+            'result': None,
+            'error': None
+        }
+
+        with self._lock:
+            self._jobs[job_id] = job
+
+        try:
+            self._queue.put_nowait((job_id, func, args, kwargs))
+        except queue.Full:
+            with self._lock:
+                del self._jobs[job_id]
+            raise JobQueueFull("İş kuyruğu dolu")
+
+        return job_id
+
+    def get_job(self, job_id):
+        """
+        İşin anlık durumunu (kopya olarak) döndür, bilinmiyorsa None
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            job = dict(job)
+
+        job['timings'] = self._timings(job)
+        return job
+
+    def queue_depth(self):
+        return self._queue.qsize()
+
+    def get_stats(self):
+        with self._lock:
+            counts = {}
+            for job in self._jobs.values():
+                counts[job['status']] = counts.get(job['status'], 0) + 1
+
+        return {
+            'workers': len(self._workers),
+            'queue_depth': self.queue_depth(),
+            'queue_capacity': self._queue.maxsize,
+            'jobs': counts
+        }
+
+    @staticmethod
+    def _timings(job):
+        now = time.time()
+        timings = {}
+
+        started = job['started_at']
+        finished = job['finished_at']
+
+        timings['queue_wait'] = round((started or now) - job['created_at'], 3)
+        if started:
+            timings['processing'] = round((finished or now) - started, 3)
+        timings['total'] = round((finished or now) - job['created_at'], 3)
+
+        return timings
+
+    def _set(self, job_id, **fields):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                job.update(fields)
+
+    def _prune(self):
+        """
+        Bitmiş eski işleri at, bellek kullanımını sınırlı tut
+        """
+        with self._lock:
+            finished = [
+                job_id for job_id, job in self._jobs.items()
+                if job['status'] in ('done', 'failed')
+            ]
+            for job_id in finished[:max(0, len(finished) - self.max_finished_jobs)]:
+                del self._jobs[job_id]
+
+    def _run(self):
+        while True:
+            job_id, func, args, kwargs = self._queue.get()
+            self._set(job_id, status='running', started_at=time.time())
+
+            try:
+                result = func(*args, **kwargs)
+                self._set(job_id, status='done', result=result, finished_at=time.time())
+            except Exception as e:
+                print(f"❌ İş hatası ({job_id}): {e}")
+                self._set(job_id, status='failed', error=str(e), finished_at=time.time())
+            finally:
+                self._queue.task_done()
+                self._prune()
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Prometheus Metrikleri
+Harici bağımlılık olmadan sayaç, gauge ve histogram tutar; /metrics için
+Prometheus metin biçimini (0.0.4) üretir. Kuyruk, önbellek gibi anlık
+değerler kayıt anında değil, collector fonksiyonlarıyla okuma anında toplanır
+"""
+
+import os
+import sys
+import math
+import time
+import threading
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Saniye cinsinden gecikme kovaları: hızlı aşamalardan (encode, compose)
+# büyük görüntüdeki çıkarıma kadar
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def format_value(value):
+    """
+    Prometheus sayı biçimi: tam sayılar noktasız, sonsuz +Inf/-Inf
+    """
+    if isinstance(value, bool):
+        return '1' if value else '0'
+    if isinstance(value, int):
+        return str(value)
+    value = float(value)
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    if math.isnan(value):
+        return 'NaN'
+    if value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+def escape_help(text):
+    return text.replace('\\', '\\\\').replace('\n', '\\n')
+
+
+def escape_label(value):
+    return escape_help(str(value)).replace('"', '\\"')
+
+
+def format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{escape_label(value)}"' for name, value in labels) + '}'
+
+
+class Metric:
+    """
+    Etiket değerleri -> değer; etiket adları kayıtta sabitlenir
+    """
+
+    metric_type = 'untyped'
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name}: etiketler {self.labelnames} olmalı, gelen {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self):
+        """
+        (ek_ad, [(etiket, değer)], değer) listesi
+        """
+        with self._lock:
+            items = list(self._values.items())
+        return [('', list(zip(self.labelnames, key)), value) for key, value in items]
+
+
+class Counter(Metric):
+    metric_type = 'counter'
+
+    def inc(self, amount=1, **labels):
+        if amount < 0:
+            raise ValueError(f"{self.name}: sayaç azaltılamaz")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    metric_type = 'gauge'
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(Metric):
+    """
+    Kümülatif kovalar + _sum + _count; p95 gibi yüzdelikler Prometheus
+    tarafında histogram_quantile ile hesaplanır
+    """
+
+    metric_type = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = {'counts': [0] * len(self.buckets), 'sum': 0.0, 'count': 0}
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state['counts'][index] += 1
+                    break
+            state['sum'] += value
+            state['count'] += 1
+
+    def samples(self):
+        with self._lock:
+            items = [(key, dict(state, counts=list(state['counts']))) for key, state in self._values.items()]
+
+        samples = []
+        for key, state in items:
+            labels = list(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, count in zip(self.buckets, state['counts']):
+                cumulative += count
+                samples.append(('_bucket', labels + [('le', format_value(bound))], cumulative))
+            samples.append(('_bucket', labels + [('le', '+Inf')], state['count']))
+            samples.append(('_sum', labels, state['sum']))
+            samples.append(('_count', labels, state['count']))
+        return samples
+
+
+class MetricsRegistry:
+    """
+    Metrikleri ve okuma anı collector'larını tutar, metin çıktısını üretir
+    Collector: [(ad, tür, açıklama, [(etiket_sözlüğü, değer)])] döndüren fonksiyon
+    """
+
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+
+    def _register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def add_collector(self, collector):
+        self._collectors.append(collector)
+        return collector
+
+    def collect(self):
+        families = [
+            (metric.name, metric.metric_type, metric.documentation, metric.samples())
+            for metric in self._metrics
+        ]
+
+        for collector in self._collectors:
+            try:
+                for name, metric_type, documentation, values in collector():
+                    samples = [('', sorted(labels.items()), value) for labels, value in values]
+                    families.append((name, metric_type, documentation, samples))
+            except Exception as e:
+                # Bir collector'ın hatası tüm /metrics çıktısını düşürmesin
+                print(f"⚠️  Metrik toplanamadı ({getattr(collector, '__name__', collector)}): {e}")
+
+        return families
+
+    def render(self):
+        lines = []
+        for name, metric_type, documentation, samples in self.collect():
+            lines.append(f"# HELP {name} {escape_help(documentation)}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            for suffix, labels, value in samples:
+                lines.append(f"{name}{suffix}{format_labels(labels)} {format_value(value)}")
+        return '\n'.join(lines) + '\n'
+
+
+def process_resident_memory_bytes():
+    """
+    Anlık RSS: Linux'ta /proc/self/statm, değilse getrusage tepe değeri
+    """
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # macOS bayt, Linux KB döndürür
+        return peak if sys.platform == 'darwin' else peak * 1024
+    except Exception:
+        return None
+
+
+PROCESS_START_TIME = time.time()
+
+
+def process_collector():
+    """
+    Standart process_* metrikleri
+    """
+    families = [
+        ('process_cpu_seconds_total', 'counter', 'Kullanıcı + sistem CPU süresi (saniye)',
+         [({}, time.process_time())]),
+        ('process_start_time_seconds', 'gauge', 'Süreç başlangıç zamanı (unix saniye)',
+         [({}, PROCESS_START_TIME)]),
+    ]
+
+    rss = process_resident_memory_bytes()
+    if rss is not None:
+        families.append(('process_resident_memory_bytes', 'gauge', 'Yerleşik bellek (bayt)',
+                         [({}, rss)]))
+    return families
@@ -0,0 +1,433 @@
+#!/usr/bin/env python3
+"""
+Model Oturum Yardımcıları
+Süreç genelinde paylaşılan oturum kaydı (referans sayımlı), oturum açmadan
+yerel model dosyalarını yoklama, seçilen modelin kaydı ve yükleme süreleri
+"""
+
+import os
+import json
+import time
+import platform
+import threading
+from pathlib import Path
+
+import onnxruntime as ort
+from rembg import new_session
+from rembg.sessions import sessions_class
+
+from app_config import get_settings
+
+# Model adı ile aynı isimli tek .onnx dosyası kullanmayan modeller
+MODEL_FILES = {
+    'sam': ('sam_vit_b_01ec64.encoder.onnx', 'sam_vit_b_01ec64.decoder.onnx'),
+}
+
+# quantize_models.py'nin ürettiği INT8 modellerin dosya eki (FP32 modelin yanında)
+QUANTIZED_SUFFIX = '.int8.onnx'
+
+# Seçilen modelin kaydı (yeniden başlatmalarda yoklamayı atlamak için)
+MODEL_SELECTION_FILE = os.environ.get('MODEL_SELECTION_FILE', 'model_selection.json')
+
+# Kullanılmayan (referansı kalmamış) oturumların bellekte tutulma süresi, saniye
+# Boş ya da 0: kullanılmayan oturumlar da süreç boyunca saklanır
+SESSION_IDLE_TIMEOUT = float(os.environ.get('SESSION_IDLE_TIMEOUT', 0) or 0)
+
+# ONNX Runtime oturum ayarları: config.json "onnx_settings" bölümü, ardından
+# ortam değişkenleri. 0 thread = onnxruntime varsayılanı (tüm çekirdekler)
+ONNX_DEFAULTS = {
+    'intra_op_num_threads': 0,
+    'inter_op_num_threads': 0,
+    'execution_mode': 'sequential',
+    'graph_optimization_level': 'all',
+    'enable_mem_pattern': True,
+    'enable_cpu_mem_arena': True,
+    'optimized_model_cache': ''
+}
+
+ONNX_ENV_OVERRIDES = {
+    'intra_op_num_threads': ('ORT_INTRA_OP_THREADS', int),
+    'inter_op_num_threads': ('ORT_INTER_OP_THREADS', int),
+    'execution_mode': ('ORT_EXECUTION_MODE', str),
+    'graph_optimization_level': ('ORT_GRAPH_OPTIMIZATION', str),
+    'enable_mem_pattern': ('ORT_ENABLE_MEM_PATTERN', lambda value: value.lower() == 'true'),
+    'enable_cpu_mem_arena': ('ORT_ENABLE_CPU_MEM_ARENA', lambda value: value.lower() == 'true'),
+    'optimized_model_cache': ('ORT_OPTIMIZED_MODEL_CACHE', str)
+}
+
+EXECUTION_MODES = {
+    'sequential': ort.ExecutionMode.ORT_SEQUENTIAL,
+    'parallel': ort.ExecutionMode.ORT_PARALLEL
+}
+
+GRAPH_OPTIMIZATION_LEVELS = {
+    'disable': ort.GraphOptimizationLevel.ORT_DISABLE_ALL,
+    'basic': ort.GraphOptimizationLevel.ORT_ENABLE_BASIC,
+    'extended': ort.GraphOptimizationLevel.ORT_ENABLE_EXTENDED,
+    'all': ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+}
+
+# Anahtara giren onnxruntime.SessionOptions alanları
+SESSION_OPTION_FIELDS = (
+    'intra_op_num_threads',
+    'inter_op_num_threads',
+    'execution_mode',
+    'graph_optimization_level',
+    'enable_cpu_mem_arena',
+    'enable_mem_pattern',
+    'optimized_model_filepath'
+)
+
+
+def get_onnx_settings():
+    """
+    Birleştirilmiş ONNX Runtime ayarları (config.json + ortam değişkenleri)
+    """
+    settings = get_settings('onnx_settings', ONNX_DEFAULTS)
+    for field, (env_name, parse) in ONNX_ENV_OVERRIDES.items():
+        if os.environ.get(env_name):
+            settings[field] = parse(os.environ[env_name])
+    return settings
+
+
+def build_session_options(settings=None):
+    """
+    Ayarlardan onnxruntime.SessionOptions oluştur
+    """
+    settings = settings or get_onnx_settings()
+    sess_opts = ort.SessionOptions()
+
+    sess_opts.intra_op_num_threads = int(settings['intra_op_num_threads'])
+    sess_opts.inter_op_num_threads = int(settings['inter_op_num_threads'])
+    sess_opts.execution_mode = EXECUTION_MODES[settings['execution_mode']]
+    sess_opts.graph_optimization_level = GRAPH_OPTIMIZATION_LEVELS[settings['graph_optimization_level']]
+    sess_opts.enable_mem_pattern = bool(settings['enable_mem_pattern'])
+    sess_opts.enable_cpu_mem_arena = bool(settings['enable_cpu_mem_arena'])
+
+    return sess_opts
+
+
+def optimized_model_path(cache_dir, model_name, settings):
+    """
+    Optimize edilmiş modelin önbellek yolu
+    Optimize grafik donanıma ve onnxruntime sürümüne bağlı olduğundan ikisi de isimde
+    """
+    fname = (f"{model_name}.{settings['graph_optimization_level']}."
+             f"ort{ort.__version__}.{platform.machine()}.onnx")
+    return os.path.join(cache_dir, fname)
+
+
+def _session_from_file(model_name, model_path, sess_opts, **kwargs):
+    """
+    rembg oturum sınıfını indirme yerine verilen model dosyasıyla aç
+    """
+    session_class = get_session_class(model_name)
+    local_class = type(
+        session_class.__name__,
+        (session_class,),
+        {'download_models': classmethod(lambda cls, *args, **kw: model_path)}
+    )
+    return local_class(model_name, sess_opts, **kwargs)
+
+
+def quantized_model_path(model_name):
+    """
+    Modelin yerel INT8 sürümünün yolu, yoksa None
+    """
+    session_class = get_session_class(model_name)
+    if session_class is None:
+        return None
+    return _resolve_model_file(session_class, f"{model_name}{QUANTIZED_SUFFIX}")
+
+
+def create_session(model_name, sess_opts=None, quantized=False, **kwargs):
+    """
+    Ayarlı ONNX oturumu oluştur
+    sess_opts verilmezse ayarlardan kurulur. optimized_model_cache ayarlıysa
+    ilk açılışta onnxruntime'ın optimize ettiği grafik diske yazılır, sonraki
+    açılışlarda grafik optimizasyonu atlanarak o dosya yüklenir.
+    quantized=True ise modelin INT8 sürümü açılır (yoksa FileNotFoundError)
+    """
+    settings = get_onnx_settings()
+    if sess_opts is None:
+        sess_opts = build_session_options(settings)
+
+    if quantized:
+        model_path = quantized_model_path(model_name)
+        if model_path is None:
+            raise FileNotFoundError(
+                f"{model_name} için INT8 model yok, önce: python quantize_models.py --models {model_name}"
+            )
+        return _session_from_file(model_name, model_path, sess_opts, **kwargs)
+
+    cache_dir = settings.get('optimized_model_cache')
+    cacheable = (
+        cache_dir and model_name not in MODEL_FILES and get_session_class(model_name) is not None
+    )
+
+    if cacheable:
+        cached_path = optimized_model_path(cache_dir, model_name, settings)
+
+        if os.path.exists(cached_path):
+            try:
+                sess_opts.graph_optimization_level = GRAPH_OPTIMIZATION_LEVELS['disable']
+                session = _session_from_file(model_name, cached_path, sess_opts, **kwargs)
+                print(f"⚡ Optimize model önbellekten yüklendi: {os.path.basename(cached_path)}")
+                return session
+            except Exception as e:
+                print(f"⚠️  Optimize model açılamadı, yeniden oluşturulacak: {e}")
+                os.remove(cached_path)
+                sess_opts = build_session_options(settings)
+
+        os.makedirs(cache_dir, exist_ok=True)
+        sess_opts.optimized_model_filepath = cached_path
+
+    return new_session(model_name, sess_opts=sess_opts, **kwargs)
+
+
+class SessionRegistry:
+    """
+    Süreç genelinde paylaşılan rembg oturumları
+    Anahtar: (model adı, ONNX oturum seçenekleri, ek argümanlar); seçenek
+    verilmeyen oturumlar config.json/ortam ayarlarıyla açılır.
+    Aynı modeli kullanan tüm remover'lar tek oturumu paylaşır; acquire/release
+    ile referans sayılır, referansı kalmayan oturum idle_timeout sonra atılır.
+    Trafik kesilse de atılması için ilk boşa düşen oturumla birlikte arka
+    planda periyodik bir süpürücü başlar (sweep_interval, varsayılan
+    idle_timeout'un yarısı)
+    """
+
+    def __init__(self, idle_timeout=None, sweep_interval=None):
+        self.idle_timeout = idle_timeout or None
+        self.sweep_interval = sweep_interval or (self.idle_timeout / 2 if self.idle_timeout else None)
+        self._entries = {}
+        self._key_locks = {}
+        self._lock = threading.Lock()
+        self._sweeper = None
+        self._stop_sweeper = threading.Event()
+
+    @staticmethod
+    def make_key(model_name, sess_opts=None, quantized=False, **kwargs):
+        options = ()
+        if sess_opts is not None:
+            options = tuple(
+                (field, str(getattr(sess_opts, field, None)))
+                for field in SESSION_OPTION_FIELDS
+            )
+        extra = tuple(sorted((name, repr(value)) for name, value in kwargs.items()))
+        return (model_name, bool(quantized), options, extra)
+
+    def acquire(self, model_name, sess_opts=None, quantized=False, **kwargs):
+        """
+        Oturumu al (gerekirse yükle) ve referans sayısını artır
+        (oturum, yükleme_süresi) döndürür; paylaşılan oturumda süre 0'dır
+        """
+        key = self.make_key(model_name, sess_opts, quantized, **kwargs)
+
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        # Aynı model için eşzamanlı istekler tek yükleme bekler
+        with key_lock:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    entry['refs'] += 1
+                    entry['released_at'] = None
+                    return entry['session'], 0.0
+
+            start = time.time()
+            session = create_session(model_name, sess_opts, quantized, **kwargs)
+            seconds = round(time.time() - start, 3)
+
+            with self._lock:
+                self._entries[key] = {
+                    'session': session,
+                    'refs': 1,
+                    'load_seconds': seconds,
+                    'loaded_at': time.time(),
+                    'released_at': None
+                }
+
+        self.evict_idle()
+        return session, seconds
+
+    def release(self, session):
+        """
+        Referansı bırak; referansı kalmayan oturum boşta sayılır
+        """
+        with self._lock:
+            for entry in self._entries.values():
+                if entry['session'] is session:
+                    entry['refs'] = max(0, entry['refs'] - 1)
+                    if entry['refs'] == 0:
+                        entry['released_at'] = time.time()
+                    break
+
+        self.evict_idle()
+        self.start_sweeper()
+
+    def start_sweeper(self):
+        """
+        Boştaki oturumları periyodik olarak atan daemon thread'i başlat (bir kez)
+        """
+        if self.idle_timeout is None:
+            return
+        with self._lock:
+            if self._sweeper is not None and self._sweeper.is_alive():
+                return
+            self._stop_sweeper.clear()
+            self._sweeper = threading.Thread(target=self._sweep, name="session-sweeper", daemon=True)
+            self._sweeper.start()
+
+    def stop_sweeper(self):
+        self._stop_sweeper.set()
+        sweeper = self._sweeper
+        if sweeper is not None:
+            sweeper.join()
+
+    def _sweep(self):
+        while not self._stop_sweeper.wait(self.sweep_interval):
+            try:
+                self.evict_idle()
+            except Exception as e:
+                print(f"⚠️  Oturum süpürme hatası: {e}")
+
+    def evict_idle(self, idle_timeout=None):
+        """
+        Belirtilen süredir referansı olmayan oturumları bırak, sayısını döndür
+        """
+        idle_timeout = idle_timeout if idle_timeout is not None else self.idle_timeout
+        if idle_timeout is None:
+            return 0
+
+        now = time.time()
+        with self._lock:
+            expired = [
+                key for key, entry in self._entries.items()
+                if entry['refs'] == 0 and entry['released_at'] is not None
+                and now - entry['released_at'] >= idle_timeout
+            ]
+            for key in expired:
+                del self._entries[key]
+
+        for key in expired:
+            print(f"🧹 Boştaki oturum bırakıldı: {key[0]}")
+        return len(expired)
+
+    def get_stats(self):
+        with self._lock:
+            return {
+                'sessions': [
+                    {
+                        'model': key[0],
+                        'quantized': key[1],
+                        'refs': entry['refs'],
+                        'load_seconds': entry['load_seconds'],
+                        'idle': entry['refs'] == 0
+                    }
+                    for key, entry in self._entries.items()
+                ],
+                'idle_timeout': self.idle_timeout
+            }
+
+
+# Süreç genelinde tek kayıt
+session_registry = SessionRegistry(idle_timeout=SESSION_IDLE_TIMEOUT)
+
+
+def acquire_session(model_name, sess_opts=None, quantized=False, **kwargs):
+    """
+    Paylaşılan oturumu al: session_registry.acquire kısayolu, yalnızca oturum döndürür
+    """
+    session, _ = session_registry.acquire(model_name, sess_opts, quantized, **kwargs)
+    return session
+
+
+def release_session(session):
+    session_registry.release(session)
+
+
+def get_session_class(model_name):
+    """
+    rembg'de modele karşılık gelen oturum sınıfı, yoksa None
+    """
+    for session_class in sessions_class:
+        if session_class.name() == model_name:
+            return session_class
+    return None
+
+
+def _resolve_model_file(session_class, fname):
+    # Yeni rembg: <home>/models/<isim>/ ve eski düz ~/.u2net dizini
+    if hasattr(session_class, 'resolve_existing'):
+        return session_class.resolve_existing(fname)
+
+    path = os.path.join(session_class.u2net_home(), fname)
+    return path if os.path.exists(path) else None
+
+
+def probe_model(model_name):
+    """
+    Modelin yerelde hazır olup olmadığını dosya sisteminden kontrol et
+    Oturum oluşturmaz, indirme yapmaz
+    """
+    session_class = get_session_class(model_name)
+    if session_class is None:
+        return {'model': model_name, 'known': False, 'available': False, 'files': []}
+
+    files = []
+    for fname in MODEL_FILES.get(model_name, (f"{model_name}.onnx",)):
+        path = _resolve_model_file(session_class, fname)
+        if path is None:
+            return {'model': model_name, 'known': True, 'available': False, 'files': []}
+        files.append(path)
+
+    size_mb = sum(os.path.getsize(path) for path in files) / (1024 * 1024)
+    return {
+        'model': model_name,
+        'known': True,
+        'available': True,
+        'files': files,
+        'size_mb': round(size_mb, 1)
+    }
+
+
+def load_model_selection(path=MODEL_SELECTION_FILE):
+    """
+    Kayıtlı model seçimini oku, yoksa ya da bozuksa None
+    """
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def save_model_selection(model_name, timings, path=MODEL_SELECTION_FILE):
+    """
+    Seçilen modeli ve yükleme sürelerini kaydet
+    """
+    record = {
+        'model': model_name,
+        'selected_at': round(time.time(), 3),
+        'timings': timings
+    }
+
+    try:
+        path = Path(path)
+        tmp_path = path.with_name(path.name + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(record, f, indent=2)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"⚠️  Model seçimi kaydedilemedi: {e}")
+
+    return record
+
+
+def timed_new_session(model_name, sess_opts=None, quantized=False, **kwargs):
+    """
+    Paylaşılan kayıttan oturum al, (oturum, yükleme_süresi) döndür
+    """
+    return session_registry.acquire(model_name, sess_opts, quantized, **kwargs)
@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+INT8 Model Dönüştürücü
+Modelleri onnxruntime.quantization ile INT8'e çevirir, FP32 modelin yanına
+<model>.int8.onnx olarak kaydeder ve FP32 maskeye göre doğruluk raporu üretir
+(IoU, ortalama alpha farkı, hız ve boyut)
+"""
+
+import os
+import sys
+import json
+import time
+from pathlib import Path
+from PIL import Image, ImageOps
+import numpy as np
+from rembg import new_session
+
+from image_ops import predict_mask
+from inference_scheduler import BATCH_MODEL_SPECS
+from batch_runner import find_images
+from model_sessions import (
+    QUANTIZED_SUFFIX, get_session_class, build_session_options, _session_from_file
+)
+
+DEFAULT_MODELS = ['u2net_cloth_seg', 'isnet-general-use']
+
+
+def load_images(folder, max_images):
+    """
+    Kalibrasyon / değerlendirme görüntülerini RGB olarak yükle
+    """
+    images = []
+    for path in find_images(folder)[:max_images]:
+        try:
+            images.append(ImageOps.exif_transpose(Image.open(path)).convert("RGB"))
+        except Exception as e:
+            print(f"⚠️  Atlandı: {path.name} ({e})")
+    return images
+
+
+def make_calibration_reader(session, model_name, images):
+    """
+    Statik kuantizasyon için kendi görüntülerimizden kalibrasyon verisi
+    Ön işleme, modelin rembg'deki normalize adımıyla aynıdır
+    """
+    from onnxruntime.quantization import CalibrationDataReader
+
+    spec = BATCH_MODEL_SPECS[model_name]
+
+    class ImageCalibrationReader(CalibrationDataReader):
+        def __init__(self):
+            self._inputs = iter([
+                session.normalize(img, spec['mean'], spec['std'], spec['size'])
+                for img in images
+            ])
+
+        def get_next(self):
+            return next(self._inputs, None)
+
+    return ImageCalibrationReader()
+
+
+def quantize_model(model_name, method='dynamic', calibration_images=None):
+    """
+    Modeli INT8'e çevir, (fp32_yolu, int8_yolu) döndür
+    """
+    try:
+        from onnxruntime.quantization import (
+            quantize_dynamic, quantize_static, QuantType, QuantFormat
+        )
+    except ImportError as e:
+        raise RuntimeError(
+            f"onnxruntime.quantization kullanılamıyor ({e}); 'pip install onnx' gerekli"
+        )
+
+    session_class = get_session_class(model_name)
+    if session_class is None:
+        raise ValueError(f"Bilinmeyen model: {model_name}")
+
+    # FP32 model yerelde yoksa rembg indirir
+    fp32_path = str(session_class.download_models())
+    int8_path = fp32_path[:-len('.onnx')] + QUANTIZED_SUFFIX
+    tmp_path = int8_path + '.tmp'
+
+    print(f"🔧 {model_name}: {method} INT8 kuantizasyon")
+    start = time.time()
+
+    if method == 'static':
+        if not calibration_images:
+            raise ValueError("Statik kuantizasyon için kalibrasyon görüntüleri gerekli")
+        session = new_session(model_name)
+        reader = make_calibration_reader(session, model_name, calibration_images)
+        quantize_static(
+            fp32_path,
+            tmp_path,
+            reader,
+            quant_format=QuantFormat.QDQ,
+            per_channel=True,
+            activation_type=QuantType.QUInt8,
+            weight_type=QuantType.QInt8
+        )
+    else:
+        quantize_dynamic(fp32_path, tmp_path, weight_type=QuantType.QUInt8)
+
+    os.replace(tmp_path, int8_path)
+    print(f"✅ Kaydedildi: {int8_path} ({time.time() - start:.1f}s)")
+    return fp32_path, int8_path
+
+
+def mask_iou(mask_a, mask_b, threshold=128):
+    """
+    İki alpha maskesinin ikili IoU'su
+    """
+    a = mask_a >= threshold
+    b = mask_b >= threshold
+    union = np.logical_or(a, b).sum()
+    if union == 0:
+        return 1.0
+    return float(np.logical_and(a, b).sum() / union)
+
+
+def evaluate(model_name, fp32_path, int8_path, images):
+    """
+    FP32 ve INT8 maskelerini karşılaştır, rapor sözlüğü döndür
+    """
+    fp32_session = _session_from_file(model_name, fp32_path, build_session_options())
+    int8_session = _session_from_file(model_name, int8_path, build_session_options())
+
+    # İlk çağrılar ısınma: tampon ayırma süreleri ölçüme karışmasın
+    predict_mask(fp32_session, images[0])
+    predict_mask(int8_session, images[0])
+
+    ious = []
+    alpha_diffs = []
+    fp32_seconds = 0.0
+    int8_seconds = 0.0
+
+    for img in images:
+        start = time.time()
+        fp32_mask = predict_mask(fp32_session, img)
+        fp32_seconds += time.time() - start
+
+        start = time.time()
+        int8_mask = predict_mask(int8_session, img)
+        int8_seconds += time.time() - start
+
+        ious.append(mask_iou(fp32_mask, int8_mask))
+        alpha_diffs.append(float(np.abs(fp32_mask.astype(np.int16) - int8_mask).mean()))
+
+    fp32_mb = os.path.getsize(fp32_path) / (1024 * 1024)
+    int8_mb = os.path.getsize(int8_path) / (1024 * 1024)
+
+    return {
+        'model': model_name,
+        'images': len(images),
+        'iou_mean': round(float(np.mean(ious)), 4),
+        'iou_min': round(float(np.min(ious)), 4),
+        'alpha_mae': round(float(np.mean(alpha_diffs)), 2),
+        'fp32_ms_per_image': round(fp32_seconds / len(images) * 1000, 1),
+        'int8_ms_per_image': round(int8_seconds / len(images) * 1000, 1),
+        'speedup': round(fp32_seconds / int8_seconds, 2) if int8_seconds > 0 else None,
+        'fp32_mb': round(fp32_mb, 1),
+        'int8_mb': round(int8_mb, 1),
+        'size_ratio': round(int8_mb / fp32_mb, 3) if fp32_mb > 0 else None
+    }
+
+
+def print_report(report):
+    print(f"\n{'='*60}")
+    print(f"📊 {report['model']} INT8 raporu ({report['images']} görüntü)")
+    print(f"{'='*60}")
+    print(f"🎯 IoU: ort {report['iou_mean']:.4f}, en düşük {report['iou_min']:.4f}")
+    print(f"🔍 Ortalama alpha farkı: {report['alpha_mae']:.2f} / 255")
+    print(f"⏱️  FP32 {report['fp32_ms_per_image']:.1f} ms -> INT8 {report['int8_ms_per_image']:.1f} ms "
+          f"({report['speedup']}x)")
+    print(f"💾 {report['fp32_mb']:.1f} MB -> {report['int8_mb']:.1f} MB")
+
+
+def main():
+    if len(sys.argv) < 2 or '--help' in sys.argv:
+        print("""
+🔧 INT8 Model Dönüştürücü
+
+Kullanım:
+  python quantize_models.py --images <klasör> [--models m1,m2] [--method dynamic|static]
+                            [--max-images N] [--report rapor.json]
+
+Örnekler:
+  python quantize_models.py --images ./products
+  python quantize_models.py --images ./products --method static --max-images 64
+  python quantize_models.py --images ./products --models u2net_cloth_seg
+
+Notlar:
+  - Varsayılan modeller: u2net_cloth_seg, isnet-general-use
+  - static: görüntülerin yarısı kalibrasyon, yarısı değerlendirme için kullanılır
+  - INT8 model FP32 modelin yanına <model>.int8.onnx olarak kaydedilir;
+    remover'lar --quantized, API model=ultra_int8 / advanced_int8 ile kullanır
+  - onnx paketi gerekir: pip install onnx
+        """)
+        return
+
+    def arg(name, default=None):
+        if name in sys.argv:
+            index = sys.argv.index(name)
+            if index + 1 < len(sys.argv):
+                return sys.argv[index + 1]
+        return default
+
+    images_dir = arg('--images')
+    if not images_dir or not Path(images_dir).exists():
+        print("❌ Görüntü klasörü belirtiniz (--images)")
+        return
+
+    models = arg('--models', ','.join(DEFAULT_MODELS)).split(',')
+    method = arg('--method', 'dynamic')
+    max_images = int(arg('--max-images', 32))
+    report_path = arg('--report', 'quantization_report.json')
+
+    images = load_images(images_dir, max_images)
+    if len(images) < 2:
+        print("❌ En az 2 görüntü gerekli")
+        return
+
+    # Kalibrasyon ve değerlendirme için ayrı görüntüler
+    if method == 'static':
+        calibration_images = images[:len(images) // 2]
+        eval_images = images[len(images) // 2:]
+    else:
+        calibration_images = None
+        eval_images = images
+
+    reports = []
+    for model_name in models:
+        try:
+            fp32_path, int8_path = quantize_model(model_name, method, calibration_images)
+            report = evaluate(model_name, fp32_path, int8_path, eval_images)
+            report['method'] = method
+            print_report(report)
+            reports.append(report)
+        except Exception as e:
+            print(f"❌ {model_name} kuantizasyon hatası: {e}")
+
+    with open(report_path, 'w', encoding='utf-8') as f:
+        json.dump(reports, f, indent=2)
+    print(f"\n📄 Rapor: {report_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""
+İçerik Adresli Sonuç Önbelleği
+Girdi baytlarının hash'i + normalize edilmiş seçeneklerle anahtarlanan
+bellek (LRU) ve disk katmanlı önbellek, ayrıca segmentasyon maskesi önbelleği
+"""
+
+import os
+import json
+import shutil
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+
+class LRUCache:
+    """
+    Girdi sayısı ve toplam bayt ile sınırlı, thread-safe LRU önbellek
+    """
+
+    def __init__(self, max_entries=256, max_bytes=128 * 1024 * 1024, sizeof=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof or (lambda value: 0)
+        self.total_bytes = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._data:
+                return None
+            self._data.move_to_end(key)
+            return self._data[key][0]
+
+    def put(self, key, value):
+        size = self.sizeof(value)
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            if key in self._data:
+                self.total_bytes -= self._data.pop(key)[1]
+
+            self._data[key] = (value, size)
+            self.total_bytes += size
+
+            while self._data and (
+                len(self._data) > self.max_entries or self.total_bytes > self.max_bytes
+            ):
+                _, (_, evicted_size) = self._data.popitem(last=False)
+                self.total_bytes -= evicted_size
+
+    def __len__(self):
+        return len(self._data)
+
+
+class ResultCache:
+    """
+    API sonuç önbelleği
+    Bellek katmanı: response + dosya baytları (LRU)
+    Disk katmanı: cache_dir/<anahtar>/ altında meta.json + dosyalar, boyut sınırlı
+    """
+
+    def __init__(self, cache_dir, max_entries=256, memory_bytes=128 * 1024 * 1024,
+                 disk_bytes=1024 * 1024 * 1024):
+        self.cache_dir = Path(cache_dir)
+        self.disk_bytes = disk_bytes
+        self.memory = LRUCache(
+            max_entries=max_entries,
+            max_bytes=memory_bytes,
+            sizeof=lambda entry: sum(len(data) for data in entry['files'].values())
+        )
+        self.counters = {
+            'memory_hits': 0,
+            'disk_hits': 0,
+            'misses': 0,
+            'stores': 0,
+            'disk_evictions': 0
+        }
+        self._lock = threading.Lock()
+
+        # Disk katmanı dizini: anahtar -> (boyut, son erişim)
+        self._disk_index = {}
+        if self.disk_bytes > 0:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            self._scan_disk()
+
+    @staticmethod
+    def make_key(data, options):
+        """
+        Girdi baytları ve seçeneklerden önbellek anahtarı üret
+        """
+        digest = hashlib.sha256(data)
+        digest.update(json.dumps(options, sort_keys=True).encode('utf-8'))
+        return digest.hexdigest()
+
+    def get(self, key):
+        """
+        Önbellekteki girdiyi döndür: {'response': dict, 'files': {isim: bayt}}
+        """
+        entry = self.memory.get(key)
+        if entry is not None:
+            self._count('memory_hits')
+            return entry
+
+        entry = self._read_disk(key)
+        if entry is not None:
+            self._count('disk_hits')
+            self.memory.put(key, entry)
+            return entry
+
+        self._count('misses')
+        return None
+
+    def put(self, key, response, file_paths):
+        """
+        Sonucu önbelleğe al; file_paths: response'taki dosyaların disk yolları
+        """
+        try:
+            files = {}
+            for path in file_paths:
+                with open(path, 'rb') as f:
+                    files[os.path.basename(path)] = f.read()
+
+            entry = {'response': response, 'files': files}
+            self.memory.put(key, entry)
+            self._write_disk(key, entry)
+            self._count('stores')
+
+        except Exception as e:
+            print(f"⚠️  Önbelleğe yazılamadı: {e}")
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self.counters)
+            disk_entries = len(self._disk_index)
+            disk_size = sum(size for size, _ in self._disk_index.values())
+
+        hits = stats['memory_hits'] + stats['disk_hits']
+        lookups = hits + stats['misses']
+        stats['hit_ratio'] = round(hits / lookups, 3) if lookups else 0.0
+        stats['memory_entries'] = len(self.memory)
+        stats['memory_bytes'] = self.memory.total_bytes
+        stats['disk_entries'] = disk_entries
+        stats['disk_bytes'] = disk_size
+        return stats
+
+    def _count(self, name):
+        with self._lock:
+            self.counters[name] += 1
+
+    def _scan_disk(self):
+        for entry_dir in self.cache_dir.iterdir():
+            meta_path = entry_dir / 'meta.json'
+            if not entry_dir.is_dir() or not meta_path.exists():
+                continue
+            size = sum(f.stat().st_size for f in entry_dir.iterdir() if f.is_file())
+            self._disk_index[entry_dir.name] = (size, meta_path.stat().st_mtime)
+
+    def _read_disk(self, key):
+        if self.disk_bytes <= 0:
+            return None
+
+        with self._lock:
+            if key not in self._disk_index:
+                return None
+
+        entry_dir = self.cache_dir / key
+        try:
+            with open(entry_dir / 'meta.json', 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+
+            files = {}
+            for name in meta['files']:
+                with open(entry_dir / name, 'rb') as f:
+                    files[name] = f.read()
+
+            # LRU için son erişimi güncelle
+            now = time.time()
+            os.utime(entry_dir / 'meta.json', (now, now))
+            with self._lock:
+                size, _ = self._disk_index[key]
+                self._disk_index[key] = (size, now)
+
+            return {'response': meta['response'], 'files': files}
+
+        except Exception as e:
+            print(f"⚠️  Önbellek girdisi okunamadı ({key[:12]}): {e}")
+            self._remove_disk(key)
+            return None
+
+    def _write_disk(self, key, entry):
+        if self.disk_bytes <= 0:
+            return
+
+        size = sum(len(data) for data in entry['files'].values())
+        if size > self.disk_bytes:
+            return
+
+        entry_dir = self.cache_dir / key
+        tmp_dir = self.cache_dir / f".{key}.tmp"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        tmp_dir.mkdir(parents=True)
+
+        for name, data in entry['files'].items():
+            with open(tmp_dir / name, 'wb') as f:
+                f.write(data)
+
+        with open(tmp_dir / 'meta.json', 'w', encoding='utf-8') as f:
+            json.dump({'response': entry['response'], 'files': list(entry['files'])}, f)
+
+        shutil.rmtree(entry_dir, ignore_errors=True)
+        os.replace(tmp_dir, entry_dir)
+
+        with self._lock:
+            self._disk_index[key] = (size, time.time())
+
+        self._evict_disk()
+
+    def _evict_disk(self):
+        """
+        Disk katmanı boyut sınırını aşarsa en eski girdileri sil
+        """
+        while True:
+            with self._lock:
+                total = sum(size for size, _ in self._disk_index.values())
+                if total <= self.disk_bytes or not self._disk_index:
+                    return
+                oldest = min(self._disk_index, key=lambda k: self._disk_index[k][1])
+
+            self._remove_disk(oldest)
+            self._count('disk_evictions')
+
+    def _remove_disk(self, key):
+        shutil.rmtree(self.cache_dir / key, ignore_errors=True)
+        with self._lock:
+            self._disk_index.pop(key, None)
+
+
+class MaskCache:
+    """
+    Ham alpha maskesi önbelleği
+    Anahtar: (ön işlenmiş görüntünün hash'i, model adı, ön işleme boyutu).
+    Sadece konumlandırma/iyileştirme/varyant seçenekleri değişen istekler
+    segmentasyonu tekrar çalıştırmaz
+    """
+
+    def __init__(self, max_entries=128, max_bytes=256 * 1024 * 1024):
+        self.memory = LRUCache(
+            max_entries=max_entries,
+            max_bytes=max_bytes,
+            sizeof=lambda mask: mask.nbytes
+        )
+        self.counters = {'hits': 0, 'misses': 0}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(img, model_name):
+        digest = hashlib.blake2b(img.tobytes(), digest_size=20)
+        digest.update(img.mode.encode('ascii'))
+        return (digest.hexdigest(), model_name, img.size)
+
+    def get_or_compute(self, img, model_name, compute):
+        """
+        Maske önbellekte varsa döndür, yoksa compute(img) ile üretip sakla
+        """
+        key = self.make_key(img, model_name)
+
+        mask = self.memory.get(key)
+        if mask is not None:
+            self._count('hits')
+            return mask
+
+        self._count('misses')
+        mask = compute(img)
+        # Paylaşılan maskenin yerinde değiştirilmesini engelle
+        mask.flags.writeable = False
+        self.memory.put(key, mask)
+        return mask
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self.counters)
+
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_ratio'] = round(stats['hits'] / lookups, 3) if lookups else 0.0
+        stats['entries'] = len(self.memory)
+        stats['memory_bytes'] = self.memory.total_bytes
+        return stats
+
+    def _count(self, name):
+        with self._lock:
+            self.counters[name] += 1
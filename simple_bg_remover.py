@@ -4,37 +4,91 @@ Simple Background Remover - Render.com Compatible
 Lightweight version without heavy dependencies
 """
 
-from PIL import Image
-import io
+import os
+from PIL import Image, ImageFilter
+import numpy as np
 
 class SimpleBgRemover:
-    def __init__(self):
-        print("✅ Simple BG Remover initialized - lightweight mode")
+    """
+    Modes:
+      crop  - keep the center area, everything else transparent
+      matte - color-distance matte against the border color (plain backgrounds)
+    Default mode comes from SIMPLE_BG_MODE, per-call override via options['bg_mode']
+    """
+    
+    def __init__(self, mode=None):
+        self.mode = mode or os.environ.get('SIMPLE_BG_MODE', 'crop')
+        print(f"✅ Simple BG Remover initialized - lightweight mode ({self.mode})")
         self.model_name = "simple_crop_remover"
     
+    def center_crop(self, img):
+        """
+        Keep center portion (2/3 width, 3/4 height) on a transparent canvas
+        """
+        width, height = img.size
+        margin_x = width // 6  # Keep 2/3 width
+        margin_y = height // 8  # Keep 3/4 height
+        
+        # Create transparent background and copy center area in one paste
+        result = Image.new('RGBA', (width, height), (0, 0, 0, 0))
+        box = (margin_x, margin_y, width - margin_x, height - margin_y)
+        result.paste(img.crop(box), box[:2])
+        return result
+    
+    def color_matte(self, img, low=30, high=80, work_size=512, full_size=True):
+        """
+        Cheap segmentation for studio shots on a plain background
+        Background color = median of the border pixels; alpha ramps from 0 to 255
+        as the color distance goes from `low` to `high`. Computed on a downscaled
+        copy (work_size) and the matte is upscaled, so cost stays flat per image
+        The matte is written into img's alpha channel in place (img must be RGBA);
+        full_size=False returns just the matte at working resolution instead
+        """
+        scale = min(1.0, work_size / max(img.size))
+        small_size = (max(1, int(img.width * scale)), max(1, int(img.height * scale)))
+        # Nearest sampling is enough for a color matte and avoids a full-image filter
+        small = img.convert('RGB') if scale == 1.0 else img.resize(small_size, Image.Resampling.NEAREST)
+        rgb = np.asarray(small, dtype=np.float32)[:, :, :3]
+        
+        border = np.concatenate([rgb[0], rgb[-1], rgb[:, 0], rgb[:, -1]])
+        background = np.median(border, axis=0)
+        
+        distance = np.sqrt(((rgb - background) ** 2).sum(axis=2))
+        alpha = np.clip((distance - low) / float(high - low), 0, 1) * 255
+        
+        # Remove speckles, then bring the matte back to full size
+        matte = Image.fromarray(alpha.astype(np.uint8)).filter(ImageFilter.MedianFilter(3))
+        if not full_size:
+            return matte
+        
+        img.putalpha(self.upscale_matte(matte, img.size))
+        return img
+    
+    def upscale_matte(self, matte, size):
+        """
+        Bilinear up to half the target size, then a nearest 2x step: edges stay
+        smooth (within a few levels of a full bilinear resize) at about half the cost
+        """
+        half = ((size[0] + 1) // 2, (size[1] + 1) // 2)
+        if matte.width * 2 >= size[0]:
+            return matte.resize(size, Image.Resampling.BILINEAR)
+        return matte.resize(half, Image.Resampling.BILINEAR).resize(size, Image.Resampling.NEAREST)
+    
     def process_image(self, input_path, options=None):
         """
-        Simple background removal - center crop with transparency
+        Simple background removal - center crop or color matte with transparency
         """
         print(f"🔄 Processing image: {input_path}")
         
         try:
             # Load image
             img = Image.open(input_path).convert('RGBA')
-            width, height = img.size
-            
-            # Create transparent background
-            result = Image.new('RGBA', (width, height), (0, 0, 0, 0))
-            
-            # Keep center portion (simple crop-based removal)
-            margin_x = width // 6  # Keep 2/3 width
-            margin_y = height // 8  # Keep 3/4 height
             
-            # Copy center area
-            for x in range(margin_x, width - margin_x):
-                for y in range(margin_y, height - margin_y):
-                    pixel = img.getpixel((x, y))
-                    result.putpixel((x, y), pixel)
+            mode = (options or {}).get('bg_mode', self.mode)
+            if mode == 'matte':
+                result = self.color_matte(img)
+            else:
+                result = self.center_crop(img)
             
             # Save result
             output_path = input_path.replace('.', '_bg_removed.')
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Aşama Zamanlayıcı
+İstek başına aşama sürelerini (decode, ön işleme, çıkarım, konumlandırma,
+iyileştirme, encode, ...) toplar. Aktif zamanlayıcı thread'e bağlıdır;
+remover'lar yalnızca `timed("aşama")` çağırır, imza değişmez.
+Aktif zamanlayıcı yoksa timed() paylaşılan boş bir context döndürür
+"""
+
+import os
+import json
+import time
+import threading
+from contextlib import contextmanager
+
+# STAGE_TIMINGS=0 ile API ölçüm yapmaz (yanıtta timings alanı ve log satırı olmaz)
+STAGE_TIMINGS_ENABLED = os.environ.get('STAGE_TIMINGS', '1').lower() not in ('0', 'false', 'no')
+
+_local = threading.local()
+
+
+class _NullStage:
+    """Zamanlayıcı yokken kullanılan, hiçbir şey yapmayan context"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    __slots__ = ('timer', 'name', 'start')
+
+    def __init__(self, timer, name):
+        self.timer = timer
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.timer.add(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class StageTimer:
+    """
+    Aşama adı -> toplam saniye; aynı aşama birden fazla kez çalışırsa süreler toplanır
+    """
+
+    def __init__(self):
+        self.stages = {}
+        self.started_at = time.perf_counter()
+
+    def stage(self, name):
+        return _Stage(self, name)
+
+    def add(self, name, seconds):
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def total(self):
+        return time.perf_counter() - self.started_at
+
+    def as_dict(self):
+        """
+        Yanıtlara eklenecek biçim: saniye, 3 basamak; 'other' ölçülmeyen kısım
+        """
+        total = self.total()
+        timings = {name: round(seconds, 3) for name, seconds in self.stages.items()}
+        timings['other'] = round(max(0.0, total - sum(self.stages.values())), 3)
+        timings['total'] = round(total, 3)
+        return timings
+
+
+def current_timer():
+    return getattr(_local, 'timer', None)
+
+
+def timed(name):
+    """
+    Aktif zamanlayıcıya aşama süresi ekleyen context
+    with timed("inference"): ...
+    """
+    timer = getattr(_local, 'timer', None)
+    if timer is None:
+        return _NULL_STAGE
+    return timer.stage(name)
+
+
+@contextmanager
+def track_stages(enabled=None):
+    """
+    Bu thread için zamanlayıcı başlat; devre dışıysa None verir.
+    İç içe çağrıda mevcut zamanlayıcı kullanılır
+    """
+    if enabled is None:
+        enabled = STAGE_TIMINGS_ENABLED
+
+    existing = current_timer()
+    if not enabled or existing is not None:
+        yield existing
+        return
+
+    timer = StageTimer()
+    _local.timer = timer
+    try:
+        yield timer
+    finally:
+        _local.timer = None
+
+
+def log_timings(timer, **fields):
+    """
+    İstek başına tek satır yapılandırılmış (JSON) log
+    """
+    if timer is None:
+        return
+    record = {'event': 'stage_timings', **fields, 'timings': timer.as_dict()}
+    print(json.dumps(record, ensure_ascii=False), flush=True)
@@ -0,0 +1,51 @@
+import os
+import sys
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+# Modüller depo kökünde düz duruyor
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class FakeOnnxSession:
+    """
+    Girdiden deterministik çıktı üreten ONNX yerine geçen nesne; aynı görüntü
+    tek başına da batch içinde de aynı çıktıyı alır
+    """
+
+    def __init__(self, channels):
+        self.channels = channels
+
+    def get_inputs(self):
+        return [SimpleNamespace(name='input.1', shape=['batch', 3, None, None])]
+
+    def run(self, output_names, feed):
+        x = feed['input.1']
+        if self.channels == 1:
+            return [x[:, :1] * 0.7 + x[:, 1:2] * 0.2 - x[:, 2:3] * 0.4]
+        # Arka plan koyu -> sınıf 0, kırmızı/yeşil/mavi bölgeler -> sınıf 1/2/3
+        return [np.concatenate([-x.sum(axis=1, keepdims=True), 2 * x], axis=1)]
+
+
+@pytest.fixture
+def fake_session():
+    """
+    Gerçek rembg oturum sınıfı (ön/son işleme rembg'nin), model yerine FakeOnnxSession
+    """
+    pytest.importorskip("rembg")
+    from model_sessions import get_session_class
+
+    def make(model_name, channels=None):
+        session_class = get_session_class(model_name)
+        if session_class is None:
+            pytest.skip(f"rembg'de {model_name} yok")
+        session = session_class.__new__(session_class)
+        session.model_name = model_name
+        if channels is None:
+            channels = 4 if model_name == 'u2net_cloth_seg' else 1
+        session.inner_session = FakeOnnxSession(channels)
+        return session
+
+    return make
@@ -0,0 +1,227 @@
+"""
+api_server: sonuç önbelleği anahtarı, /metrics, ısınma ve base64 akışı (modeller yerine sahte remover'lar)
+"""
+
+import io
+import os
+import json
+import base64
+import importlib
+import threading
+from pathlib import Path
+
+import numpy as np
+import pytest
+from PIL import Image
+
+pytest.importorskip("rembg")
+pytest.importorskip("flask")
+
+
+class FakeRemover:
+    """Çağrıları sayan, girdinin yanına PNG yazan remover"""
+
+    def __init__(self, model_key):
+        self.model_key = model_key
+        self.calls = 0
+
+    def _write(self, filepath):
+        self.calls += 1
+        output = Path(filepath).with_name(f"{Path(filepath).stem}_{self.model_key.replace(':', '_')}.png")
+        Image.new("RGBA", (8, 8), (255, 0, 0, 255)).save(output)
+        return str(output)
+
+    def ultra_process(self, filepath, options):
+        return self._write(filepath)
+
+    def process_clothing_complete(self, filepath, options):
+        return self._write(filepath)
+
+
+@pytest.fixture(scope="module")
+def api_module(tmp_path_factory):
+    # uploads/ ve processed/ çalışma dizinine göre oluşturulur
+    workdir = tmp_path_factory.mktemp("api")
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    os.environ['WARMUP_MODELS'] = 'none'
+    try:
+        yield importlib.import_module("api_server")
+    finally:
+        os.chdir(cwd)
+
+
+@pytest.fixture
+def api(api_module, tmp_path, monkeypatch):
+    from result_cache import ResultCache
+
+    monkeypatch.setattr(api_module, 'result_cache', ResultCache(str(tmp_path / "cache")))
+    monkeypatch.setattr(api_module, 'ultra_remover', None)
+    monkeypatch.setattr(api_module, 'advanced_remover', FakeRemover('u2net_cloth_seg'))
+    monkeypatch.setattr(api_module, 'quantized_removers', {})
+    return api_module
+
+
+def upload(client, model):
+    buffer = io.BytesIO()
+    Image.new("RGB", (16, 16), (10, 200, 30)).save(buffer, "PNG")
+    buffer.seek(0)
+    response = client.post(
+        '/api/remove-background',
+        data={'image': (buffer, 'shirt.png'), 'model': model, 'variants': 'false'},
+        content_type='multipart/form-data'
+    )
+    assert response.status_code == 200, response.get_json()
+    return response.get_json()
+
+
+def test_fallback_result_is_not_served_to_later_ultra_requests(api):
+    client = api.app.test_client()
+
+    # Ultra yüklü değil: istek advanced modelde çalışır
+    first = upload(client, 'ultra')
+    assert first['result']['model_used'] == 'u2net_cloth_seg'
+    assert upload(client, 'ultra')['cached'] is True
+
+    # Ultra yüklendikten sonra aynı istek ultra modelde yeniden işlenir
+    ultra = FakeRemover('isnet-general-use')
+    api.ultra_remover = ultra
+    again = upload(client, 'ultra')
+    assert again['cached'] is False
+    assert again['result']['model_used'] == 'isnet-general-use'
+    assert ultra.calls == 1
+
+
+def test_int8_fallback_is_not_cached(api):
+    client = api.app.test_client()
+    fp32_fallback = FakeRemover('u2net_cloth_seg')
+    api.quantized_removers['advanced'] = fp32_fallback
+
+    upload(client, 'advanced_int8')
+    assert upload(client, 'advanced_int8')['cached'] is False
+    assert fp32_fallback.calls == 2
+
+
+def test_identical_requests_hit_the_cache(api):
+    client = api.app.test_client()
+    upload(client, 'advanced')
+    assert upload(client, 'advanced')['cached'] is True
+    assert api.advanced_remover.calls == 1
+
+
+def test_unknown_models_collapse_to_one_label_and_cache_key(api):
+    client = api.app.test_client()
+
+    first = upload(client, 'model-a')
+    second = upload(client, 'model-b')
+    assert first['parameters']['model_type'] == 'other'
+    assert second['cached'] is True
+
+    text = client.get('/metrics').get_data(as_text=True)
+    assert 'model="model-a"' not in text and 'model="model-b"' not in text
+    assert 'model="other"' in text
+
+
+def test_unknown_http_methods_share_one_label(api):
+    client = api.app.test_client()
+    client.open('/api/status', method='FROBNICATE')
+
+    text = client.get('/metrics').get_data(as_text=True)
+    assert 'FROBNICATE' not in text
+    assert 'method="other"' in text
+
+
+class FakeSessionRemover:
+    session = None
+
+
+def broken_loader():
+    raise RuntimeError("model indirilemedi")
+
+
+@pytest.fixture
+def warmup(api_module, monkeypatch):
+    monkeypatch.setattr(api_module, 'WARMUP_MODELS', ['ultra', 'advanced'])
+    monkeypatch.setattr(api_module, 'WARMUP_RETRIES', 1)
+    monkeypatch.setattr(api_module, 'WARMUP_RETRY_DELAY', 0)
+    monkeypatch.setattr(api_module, 'predict_mask', lambda session, image: None)
+    monkeypatch.setattr(api_module, 'warmup_state',
+                        {'status': 'pending', 'models': {}, 'seconds': None, 'error': None})
+    monkeypatch.setitem(api_module.WARMUP_LOADERS, 'ultra', broken_loader)
+    monkeypatch.setitem(api_module.WARMUP_LOADERS, 'advanced', FakeSessionRemover)
+    return api_module
+
+
+def test_one_failing_model_does_not_block_readiness(warmup):
+    warmup.warm_up()
+
+    state = warmup.warmup_state
+    assert state['status'] == 'ready'
+    assert state['models']['advanced']['status'] == 'ready'
+    assert state['models']['ultra'] == {'status': 'failed', 'error': 'model indirilemedi', 'attempts': 2}
+
+    response = warmup.app.test_client().get('/health')
+    assert response.status_code == 200
+
+
+def test_failed_warmup_restarts_on_next_request(warmup, monkeypatch):
+    monkeypatch.setattr(warmup, 'WARMUP_REQUIRE', 'all')
+    warmup.warm_up()
+    assert warmup.warmup_state['status'] == 'failed'
+
+    # Model artık yüklenebiliyor: /health ısınmayı yeniden başlatır
+    monkeypatch.setitem(warmup.WARMUP_LOADERS, 'ultra', FakeSessionRemover)
+    client = warmup.app.test_client()
+    assert client.get('/health').status_code == 503
+    for thread in threading.enumerate():
+        if thread.name == 'model-warmup':
+            thread.join(timeout=5)
+
+    assert warmup.warmup_state['status'] == 'ready'
+    assert client.get('/health').status_code == 200
+
+
+def noisy_result(size=(400, 300)):
+    # Gürültü PNG'yi birkaç base64 parçasına yayacak kadar büyük tutar
+    pixels = np.random.default_rng(0).integers(0, 256, (size[1], size[0], 4), dtype=np.uint8)
+    return Image.fromarray(pixels, "RGBA")
+
+
+@pytest.fixture
+def base64_api(api, monkeypatch):
+    result = noisy_result()
+    monkeypatch.setattr(api, 'process_image_in_memory', lambda *args: (result, 'u2net_cloth_seg'))
+    return api, result
+
+
+def post_base64(client, headers=None):
+    buffer = io.BytesIO()
+    Image.new("RGB", (16, 16), (10, 200, 30)).save(buffer, "PNG")
+    body = {'image_base64': base64.b64encode(buffer.getvalue()).decode('ascii'), 'model': 'advanced'}
+    return client.post('/api/remove-background-base64', json=body, headers=headers or {})
+
+
+def test_streamed_base64_json_matches_content_length(base64_api):
+    api, result = base64_api
+    response = post_base64(api.app.test_client())
+    body = response.get_data()
+
+    assert response.status_code == 200
+    assert len(body) > 2 * api.BASE64_CHUNK_BYTES
+    assert int(response.headers['Content-Length']) == len(body)
+
+    data = json.loads(body)
+    assert data['success'] is True and data['model_used'] == 'u2net_cloth_seg'
+    decoded = Image.open(io.BytesIO(base64.b64decode(data['result_base64'])))
+    assert np.array_equal(np.asarray(decoded), np.asarray(result))
+
+
+def test_accept_png_returns_binary_image(base64_api):
+    api, result = base64_api
+    response = post_base64(api.app.test_client(), {'Accept': 'image/png'})
+
+    assert response.status_code == 200
+    assert response.mimetype == 'image/png'
+    assert response.headers['X-Model-Used'] == 'u2net_cloth_seg'
+    decoded = Image.open(io.BytesIO(response.get_data()))
+    assert np.array_equal(np.asarray(decoded), np.asarray(result))
@@ -0,0 +1,122 @@
+"""
+batch_runner: manifest ile devam, tekrar deneme ve çıktıların girdi sayılmaması
+"""
+
+import os
+from pathlib import Path
+
+import pytest
+
+import batch_runner
+from batch_runner import find_images, run_batch, BatchManifest
+
+
+class StubRemover:
+    """Girdinin yanına <kök>_no_bg.png yazan sahte remover"""
+
+    def __init__(self, fail=()):
+        self.calls = []
+        self.fail = set(fail)
+
+    def process_image(self, input_path, **kwargs):
+        self.calls.append(Path(input_path).name)
+        if Path(input_path).name in self.fail:
+            raise RuntimeError("bozuk görüntü")
+        output = Path(input_path).parent / f"{Path(input_path).stem}_no_bg.png"
+        output.write_bytes(b"png")
+        return output
+
+
+@pytest.fixture
+def folder(tmp_path):
+    images = tmp_path / "images"
+    images.mkdir()
+    for i in range(3):
+        (images / f"img{i}.jpg").write_bytes(f"jpeg-{i}".encode())
+    return images
+
+
+def run(folder, remover, manifest):
+    return run_batch(find_images(folder), 'process_image', remover=remover, manifest=manifest)
+
+
+def test_rerun_skips_done_inputs_and_previous_outputs(folder, tmp_path):
+    manifest = tmp_path / "run.jsonl"
+
+    first = StubRemover()
+    run(folder, first, manifest)
+    assert sorted(first.calls) == ['img0.jpg', 'img1.jpg', 'img2.jpg']
+
+    for _ in range(2):
+        again = StubRemover()
+        summary = run(folder, again, manifest)
+        assert again.calls == []
+        assert summary['skipped'] == 3
+
+    assert not list(folder.glob("*_no_bg_no_bg*"))
+
+
+def test_manifest_outputs_with_custom_names_are_not_inputs(folder, tmp_path):
+    manifest = BatchManifest(tmp_path / "run.jsonl")
+    output = folder / "custom-name.png"
+    output.write_bytes(b"png")
+    manifest.record(
+        {'input': str(folder / "img0.jpg"), 'output': str(output),
+         'status': 'ok', 'error': None, 'seconds': 0.1},
+        batch_runner.file_hash(folder / "img0.jpg"),
+        {'method': 'process_image'}
+    )
+
+    remover = StubRemover()
+    run(folder, remover, manifest)
+    assert 'custom-name.png' not in remover.calls
+    assert sorted(remover.calls) == ['img1.jpg', 'img2.jpg']
+
+
+def test_failed_inputs_are_retried(folder, tmp_path):
+    manifest = tmp_path / "run.jsonl"
+    run(folder, StubRemover(fail={'img1.jpg'}), manifest)
+
+    retry = StubRemover()
+    summary = run(folder, retry, manifest)
+    assert retry.calls == ['img1.jpg']
+    assert summary['succeeded'] == 1
+
+
+def test_changed_input_is_reprocessed(folder, tmp_path):
+    manifest = tmp_path / "run.jsonl"
+    run(folder, StubRemover(), manifest)
+
+    (folder / "img2.jpg").write_bytes(b"different content")
+    remover = StubRemover()
+    run(folder, remover, manifest)
+    assert remover.calls == ['img2.jpg']
+
+
+def test_unchanged_inputs_are_not_hashed_on_resume(folder, tmp_path, monkeypatch):
+    manifest = tmp_path / "run.jsonl"
+    run(folder, StubRemover(), manifest)
+
+    hashed = []
+    original = batch_runner.file_hash
+    monkeypatch.setattr(batch_runner, 'file_hash', lambda path: hashed.append(path) or original(path))
+
+    # Sadece mtime değişen dosya hash'lenir; içerik aynı olduğu için yine atlanır
+    stat = os.stat(folder / "img0.jpg")
+    os.utime(folder / "img0.jpg", ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    remover = StubRemover()
+    run(folder, remover, manifest)
+    assert remover.calls == []
+    assert [Path(p).name for p in hashed] == ['img0.jpg']
+
+
+def test_find_images_skips_derived_outputs(tmp_path):
+    for name in ("shirt.jpg", "shirt_no_bg.png", "shirt_no_bg_storefront_with_shadow.png",
+                 "dress_enhanced.png", "other.png"):
+        (tmp_path / name).write_bytes(b"x")
+
+    names = [f.name for f in find_images(tmp_path)]
+    # dress_enhanced.png'nin kaynağı klasörde yok, girdi sayılır
+    assert names == ['dress_enhanced.png', 'other.png', 'shirt.jpg']
+    assert len(find_images(tmp_path, skip_outputs=False)) == 5
@@ -0,0 +1,135 @@
+"""
+image_ops: birleşik iyileştirme eski ImageEnhance zinciriyle aynı sonucu verir,
+kılavuzlu büyütme kenarları kılavuza göre yerleştirir, gölge nesnenin altına
+kaydırılmış olarak eklenir
+"""
+
+import numpy as np
+import pytest
+from PIL import Image, ImageDraw, ImageEnhance, ImageFilter
+
+from image_ops import enhance_rgba, get_enhance_settings, guided_upsample, render_shadow
+
+# Eski zincirle fark: kanal başına en fazla / ortalama (0-255 seviyesi)
+ENHANCE_MAX_DIFF = 8
+ENHANCE_MEAN_DIFF = 1.5
+
+
+def garment_rgba(size=(200, 160)):
+    """Gürültülü renk geçişi, yumuşak kenarlı elips alpha"""
+    width, height = size
+    y, x = np.mgrid[:height, :width]
+    rgb = np.stack([x * 255 // width, y * 255 // height, (x + y) * 255 // (width + height)], axis=-1)
+    noise = np.random.default_rng(0).integers(-20, 21, rgb.shape)
+    rgb = np.clip(rgb + noise, 0, 255).astype(np.uint8)
+
+    alpha = Image.new("L", size, 0)
+    ImageDraw.Draw(alpha).ellipse([30, 20, width - 30, height - 20], fill=255)
+    alpha = alpha.filter(ImageFilter.GaussianBlur(3))
+
+    img = Image.fromarray(rgb).convert("RGBA")
+    img.putalpha(alpha)
+    return img
+
+
+def image_enhance_chain(img, settings):
+    """Remover'ların önceki hali: beyaz zemin + Contrast -> Brightness -> Sharpness -> Color"""
+    rgb_img = Image.new("RGB", img.size, (255, 255, 255))
+    rgb_img.paste(img, mask=img.getchannel("A"))
+    rgb_img = ImageEnhance.Contrast(rgb_img).enhance(settings['contrast_factor'])
+    rgb_img = ImageEnhance.Brightness(rgb_img).enhance(settings['brightness_factor'])
+    rgb_img = ImageEnhance.Sharpness(rgb_img).enhance(settings['sharpness_factor'])
+    rgb_img = ImageEnhance.Color(rgb_img).enhance(settings['color_factor'])
+    return rgb_img
+
+
+@pytest.mark.parametrize("profile", ["ecommerce", "ultra"])
+def test_enhance_rgba_matches_image_enhance_chain(profile):
+    img = garment_rgba()
+    settings = get_enhance_settings(profile)
+
+    expected = np.asarray(image_enhance_chain(img, settings), dtype=np.int16)
+    result = enhance_rgba(img, settings)
+    diff = np.abs(np.asarray(result.convert("RGB"), dtype=np.int16) - expected)
+
+    assert result.mode == "RGBA" and result.size == img.size
+    assert diff.max() <= ENHANCE_MAX_DIFF
+    assert diff.mean() <= ENHANCE_MEAN_DIFF
+    assert np.array_equal(np.asarray(result.getchannel("A")), np.asarray(img.getchannel("A")))
+
+
+def ellipse_guide(size=(400, 300)):
+    """Açık zeminde koyu elips; kenarlar maske ızgarasına hizalı değil"""
+    guide = Image.new("RGB", size, (230, 230, 230))
+    ImageDraw.Draw(guide).ellipse([83, 61, 317, 243], fill=(40, 40, 160))
+    truth = (np.asarray(guide.convert("L")) < 150).astype(np.uint8) * 255
+    return guide, truth
+
+
+def test_guided_upsample_shape_and_dtype():
+    guide, _ = ellipse_guide()
+    mask = guided_upsample(np.zeros((75, 100), np.uint8), guide)
+    assert mask.shape == (300, 400) and mask.dtype == np.uint8
+
+
+def test_guided_upsample_keeps_constant_mask_constant():
+    guide, _ = ellipse_guide()
+    mask = guided_upsample(np.full((75, 100), 200, np.uint8), guide)
+    assert np.abs(mask.astype(np.int16) - 200).max() <= 1
+
+
+def test_guided_upsample_edges_follow_guide():
+    guide, truth = ellipse_guide()
+    low = np.asarray(Image.fromarray(truth).resize((100, 75), Image.Resampling.BOX))
+
+    guided = guided_upsample(low, guide).astype(np.int16)
+    resized = np.asarray(Image.fromarray(low).resize(guide.size, Image.Resampling.BILINEAR), dtype=np.int16)
+
+    # Yalnızca kenar bandında karşılaştır: iç ve dış bölge iki yöntemde de tam
+    band = np.abs(resized - truth) > 0
+    guided_error = np.abs(guided - truth)[band].mean()
+    resized_error = np.abs(resized - truth)[band].mean()
+    assert guided_error < resized_error / 4
+
+
+SHADOW_SETTINGS = {'offset_x': 10, 'offset_y': 15, 'blur_radius': 4, 'opacity': 128, 'color': [0, 0, 0]}
+
+
+def subject_rgba():
+    """Sağ alt köşeye yakın opak dikdörtgen: gölge görüntü dışına taşar"""
+    img = Image.new("RGBA", (100, 80), (0, 0, 0, 0))
+    ImageDraw.Draw(img).rectangle([50, 40, 94, 74], fill=(200, 40, 40, 255))
+    return img
+
+
+def test_render_shadow_grows_canvas_to_fit_shadow():
+    result = render_shadow(subject_rgba(), SHADOW_SETTINGS)
+    # Nesne kutusu (50, 40, 95, 75) + bulanıklık 4 + kaydırma (10, 15)
+    assert result.mode == "RGBA"
+    assert result.size == (95 + 4 + 10, 75 + 4 + 15)
+
+
+def test_render_shadow_keeps_subject_unchanged():
+    img = subject_rgba()
+    result = np.asarray(render_shadow(img, SHADOW_SETTINGS))[:80, :100]
+    subject = np.asarray(img)[:, :, 3] == 255
+    assert np.array_equal(result[subject], np.asarray(img)[subject])
+
+
+def test_render_shadow_is_offset_under_subject():
+    img = subject_rgba()
+    result = np.asarray(render_shadow(img, SHADOW_SETTINGS))
+    original = np.zeros(result.shape[:2], np.uint8)
+    original[:80, :100] = np.asarray(img)[:, :, 3]
+    shadow = result[:, :, 3].astype(np.int16) - original
+
+    # Gölge yalnızca nesnenin dışında görünür, siyah ve yarı saydam
+    assert (shadow >= 0).all()
+    assert 0 < result[85, 100, 3] <= 128
+    assert (result[85, 100, :3] == 0).all()
+    # Üst ve sol taraf gölgesiz: gölge sağa-aşağı kaydırılmış
+    assert (result[:40, :, 3] == 0).all()
+    assert (result[:, :50, 3] == 0).all()
+
+    rows, cols = np.nonzero(shadow)
+    assert rows.mean() > 57 and cols.mean() > 72
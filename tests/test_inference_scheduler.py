@@ -0,0 +1,39 @@
+"""
+inference_scheduler: batch çıkarımı tek görüntülük session.predict ile aynı maskeyi vermeli
+"""
+
+import numpy as np
+import pytest
+from PIL import Image, ImageDraw
+
+pytest.importorskip("rembg")
+
+from image_ops import predict_mask
+from inference_scheduler import BATCH_MODEL_SPECS, predict_masks_batched, supports_batching
+
+
+def make_images():
+    images = []
+    for size, shift in (((301, 223), 0), ((180, 260), 17)):
+        img = Image.new("RGB", size, (20, 20, 20))
+        draw = ImageDraw.Draw(img)
+        # Farklı sınıfların birbirine ve arka plana değdiği kenarlar
+        draw.rectangle([20 + shift, 30, 120 + shift, 140], fill=(230, 30, 30))
+        draw.rectangle([121 + shift, 30, 170, 140], fill=(30, 230, 30))
+        draw.ellipse([60, 100 + shift, 150, 200], fill=(30, 30, 230))
+        images.append(img)
+    return images
+
+
+@pytest.mark.parametrize("model_name", sorted(BATCH_MODEL_SPECS))
+def test_batched_masks_match_predict_mask(model_name, fake_session):
+    session = fake_session(model_name)
+    assert supports_batching(session)
+
+    images = make_images()
+    batched = predict_masks_batched(session, images)
+
+    for img, mask in zip(images, batched):
+        expected = predict_mask(session, img)
+        assert mask.shape == expected.shape
+        assert np.array_equal(mask, expected)
@@ -0,0 +1,77 @@
+"""
+metrics: Prometheus metin biçimi (0.0.4)
+"""
+
+import pytest
+
+from metrics import MetricsRegistry, format_value
+
+
+def test_counter_and_gauge_text_format():
+    registry = MetricsRegistry()
+    requests = registry.counter('app_requests_total', 'İstek sayısı', ['endpoint', 'status'])
+    in_flight = registry.gauge('app_in_flight', 'İşlenen istek')
+
+    requests.inc(endpoint='/api/x', status=200)
+    requests.inc(2, endpoint='/api/x', status=200)
+    in_flight.set(0)
+    in_flight.inc()
+
+    assert registry.render().splitlines() == [
+        '# HELP app_requests_total İstek sayısı',
+        '# TYPE app_requests_total counter',
+        'app_requests_total{endpoint="/api/x",status="200"} 3',
+        '# HELP app_in_flight İşlenen istek',
+        '# TYPE app_in_flight gauge',
+        'app_in_flight 1',
+    ]
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = MetricsRegistry()
+    latency = registry.histogram('app_seconds', 'Süre', ['stage'], buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.7, 3.0):
+        latency.observe(value, stage='inference')
+
+    lines = registry.render().splitlines()
+    assert lines[2:] == [
+        'app_seconds_bucket{stage="inference",le="0.1"} 1',
+        'app_seconds_bucket{stage="inference",le="1"} 3',
+        'app_seconds_bucket{stage="inference",le="+Inf"} 4',
+        'app_seconds_sum{stage="inference"} 4.25',
+        'app_seconds_count{stage="inference"} 4',
+    ]
+
+
+def test_label_and_help_escaping():
+    registry = MetricsRegistry()
+    counter = registry.counter('app_total', 'satır\\nsonu\nyeni', ['name'])
+    counter.inc(name='a"b\\c\nd')
+
+    lines = registry.render().splitlines()
+    assert lines[0] == '# HELP app_total satır\\\\nsonu\\nyeni'
+    assert lines[2] == 'app_total{name="a\\"b\\\\c\\nd"} 1'
+
+
+def test_collectors_and_failing_collector():
+    registry = MetricsRegistry()
+    registry.add_collector(lambda: [('app_queue_depth', 'gauge', 'Kuyruk', [({}, 4)])])
+    registry.add_collector(lambda: 1 / 0)
+
+    assert 'app_queue_depth 4' in registry.render().splitlines()
+
+
+def test_label_names_are_enforced_and_counters_only_grow():
+    counter = MetricsRegistry().counter('app_total', 'x', ['model'])
+    with pytest.raises(ValueError):
+        counter.inc(endpoint='/')
+    with pytest.raises(ValueError):
+        counter.inc(-1, model='ultra')
+
+
+def test_format_value():
+    assert format_value(3) == '3'
+    assert format_value(2.0) == '2'
+    assert format_value(0.25) == '0.25'
+    assert format_value(float('inf')) == '+Inf'
+    assert format_value(True) == '1'
@@ -0,0 +1,49 @@
+"""
+model_sessions: boştaki oturumlar trafik olmadan da süpürücüyle atılır
+"""
+
+import time
+
+import pytest
+
+pytest.importorskip("rembg")
+
+import model_sessions
+from model_sessions import SessionRegistry
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    monkeypatch.setattr(model_sessions, 'create_session', lambda model_name, *args, **kwargs: object())
+    registry = SessionRegistry(idle_timeout=0.05, sweep_interval=0.01)
+    yield registry
+    registry.stop_sweeper()
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_idle_session_is_dropped_without_further_calls(registry):
+    session, _ = registry.acquire('u2net')
+    registry.release(session)
+    # release anında henüz zaman aşımı dolmadı
+    assert len(registry.get_stats()['sessions']) == 1
+
+    assert wait_for(lambda: not registry.get_stats()['sessions'])
+
+
+def test_session_in_use_is_kept(registry):
+    session, _ = registry.acquire('u2net')
+    other, _ = registry.acquire('u2net_cloth_seg')
+    registry.release(other)
+
+    assert wait_for(lambda: len(registry.get_stats()['sessions']) == 1)
+    time.sleep(0.1)
+    assert registry.get_stats()['sessions'][0]['model'] == 'u2net'
+    assert registry.acquire('u2net')[0] is session
@@ -0,0 +1,69 @@
+"""
+result_cache: anahtar üretimi, LRU/disk tahliyesi ve maske önbelleği
+"""
+
+import numpy as np
+from PIL import Image
+
+from result_cache import LRUCache, ResultCache, MaskCache
+
+
+def write_files(tmp_path, name, size):
+    path = tmp_path / name
+    path.write_bytes(b"x" * size)
+    return str(path)
+
+
+def test_make_key_ignores_option_order_but_not_values():
+    key = ResultCache.make_key(b"image", {'model_type': 'ultra', 'pipeline': 'advanced'})
+    assert key == ResultCache.make_key(b"image", {'pipeline': 'advanced', 'model_type': 'ultra'})
+    assert key != ResultCache.make_key(b"image", {'model_type': 'ultra', 'pipeline': 'ultra'})
+    assert key != ResultCache.make_key(b"other", {'model_type': 'ultra', 'pipeline': 'advanced'})
+
+
+def test_lru_evicts_least_recently_used_by_count_and_bytes():
+    cache = LRUCache(max_entries=2, max_bytes=10, sizeof=len)
+    cache.put('a', b"1234")
+    cache.put('b', b"1234")
+    cache.get('a')
+    cache.put('c', b"12")
+    assert cache.get('b') is None and cache.get('a') is not None
+
+    cache.put('d', b"12345678")
+    assert len(cache) == 1 and cache.total_bytes == 8
+
+    # Tek başına sınırı aşan değer hiç saklanmaz
+    cache.put('e', b"x" * 11)
+    assert cache.get('e') is None and cache.get('d') is not None
+
+
+def test_disk_tier_survives_restart_and_evicts_oldest(tmp_path):
+    cache_dir = tmp_path / "cache"
+    cache = ResultCache(str(cache_dir), memory_bytes=1024, disk_bytes=250)
+    cache.put('k1', {'result': 1}, [write_files(tmp_path, "a.png", 100)])
+    cache.put('k2', {'result': 2}, [write_files(tmp_path, "b.png", 100)])
+
+    restarted = ResultCache(str(cache_dir), memory_bytes=1024, disk_bytes=250)
+    entry = restarted.get('k1')
+    assert entry['response'] == {'result': 1}
+    assert entry['files'] == {'a.png': b"x" * 100}
+
+    restarted.put('k3', {'result': 3}, [write_files(tmp_path, "c.png", 100)])
+    assert restarted.get_stats()['disk_evictions'] == 1
+    assert ResultCache(str(cache_dir), disk_bytes=250).get('k2') is None
+
+
+def test_mask_cache_keys_by_model_and_freezes_masks():
+    cache = MaskCache(max_entries=4)
+    img = Image.new("RGB", (4, 4), (1, 2, 3))
+    calls = []
+
+    def compute(image):
+        calls.append(image)
+        return np.zeros((4, 4), dtype=np.uint8)
+
+    mask = cache.get_or_compute(img, 'u2net', compute)
+    assert cache.get_or_compute(img, 'u2net', compute) is mask
+    cache.get_or_compute(img, 'isnet-general-use', compute)
+    assert len(calls) == 2
+    assert not mask.flags.writeable
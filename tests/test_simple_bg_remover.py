@@ -0,0 +1,65 @@
+"""
+simple_bg_remover: merkez kırpma ve renk matı (hafif yedek mod)
+"""
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+from simple_bg_remover import SimpleBgRemover
+
+
+def studio_shot(size=(1200, 900)):
+    """Düz açık gri zemin üzerinde kırmızı elips"""
+    img = Image.new("RGB", size, (240, 240, 240))
+    width, height = size
+    ImageDraw.Draw(img).ellipse([width // 4, height // 4, width * 3 // 4, height * 3 // 4], fill=(200, 30, 30))
+    return img.convert("RGBA")
+
+
+def test_center_crop_keeps_center_and_clears_margins():
+    img = Image.new("RGBA", (120, 80), (10, 20, 30, 255))
+    result = SimpleBgRemover('crop').center_crop(img)
+    alpha = np.asarray(result.getchannel("A"))
+
+    assert result.mode == "RGBA" and result.size == img.size
+    # Kenar payları: genişlik/6, yükseklik/8
+    assert (alpha[10:70, 20:100] == 255).all()
+    assert (alpha[:10] == 0).all() and (alpha[70:] == 0).all()
+    assert (alpha[:, :20] == 0).all() and (alpha[:, 100:] == 0).all()
+    assert np.array_equal(np.asarray(result)[10:70, 20:100], np.asarray(img)[10:70, 20:100])
+
+
+def test_color_matte_separates_subject_from_plain_background():
+    img = studio_shot()
+    pixels = np.asarray(img.convert("RGB")).copy()
+    result = SimpleBgRemover('matte').color_matte(img)
+    alpha = np.asarray(result.getchannel("A"))
+
+    # Alpha yerinde yazılır, renkler değişmez
+    assert result is img and result.size == (1200, 900)
+    assert np.array_equal(np.asarray(result.convert("RGB")), pixels)
+    assert alpha[450, 600] == 255
+    assert alpha[20, 20] == 0 and alpha[880, 1180] == 0
+    # Yumuşak kenar: kenar bandında ara değerler var
+    assert ((alpha > 0) & (alpha < 255)).any()
+
+
+def test_color_matte_at_working_resolution():
+    img = studio_shot()
+    matte = SimpleBgRemover('matte').color_matte(img, work_size=256, full_size=False)
+
+    assert matte.mode == "L" and matte.size == (256, 192)
+    assert img.getchannel("A").getextrema() == (255, 255)
+
+
+def test_upscaled_matte_stays_close_to_bilinear():
+    matte = Image.new("L", (200, 150), 0)
+    ImageDraw.Draw(matte).ellipse([50, 40, 150, 110], fill=255)
+    size = (1600, 1200)
+
+    fast = np.asarray(SimpleBgRemover('matte').upscale_matte(matte, size), dtype=np.int16)
+    reference = np.asarray(matte.resize(size, Image.Resampling.BILINEAR), dtype=np.int16)
+    diff = np.abs(fast - reference)
+
+    assert fast.shape == (1200, 1600)
+    assert diff.mean() < 1.0
@@ -0,0 +1,81 @@
+"""
+Döşemeli çıkarım: ek yerleri referansla aynı, çıktı biçimi boyuttan bağımsız,
+döşemeler maske önbelleğine girmez
+"""
+
+import numpy as np
+import pytest
+from PIL import Image, ImageDraw
+
+from image_ops import tiled_predict_mask, inference_copy
+from result_cache import MaskCache
+
+TILE_SETTINGS = {
+    'enabled': True, 'min_side': 256, 'tile_size': 128, 'overlap': 32,
+    'coarse_side': 96, 'skip_margin': 8
+}
+
+
+def garment_image(size=(400, 300)):
+    img = Image.new("RGB", size, (20, 20, 20))
+    draw = ImageDraw.Draw(img)
+    draw.rectangle([60, 40, 250, 260], fill=(230, 30, 30))
+    draw.ellipse([200, 80, 360, 220], fill=(30, 30, 230))
+    return img
+
+
+def pixel_predict(img):
+    """Piksel başına model: her döşeme tam görüntü tahmininin aynı bölgesini verir"""
+    return np.asarray(img)[:, :, 0].copy()
+
+
+def test_crossfade_matches_full_image_reference():
+    img = garment_image()
+    # skip_margin=-1: kaba maske kısayolu kapalı, her döşeme modelden geçer
+    settings = dict(TILE_SETTINGS, skip_margin=-1)
+    mask = tiled_predict_mask(pixel_predict, img, settings)
+    assert np.array_equal(mask, pixel_predict(img))
+
+
+def test_tiled_mask_has_source_size():
+    img = garment_image((531, 287))
+    mask = tiled_predict_mask(pixel_predict, img, TILE_SETTINGS)
+    assert mask.shape == (287, 531)
+
+
+@pytest.mark.parametrize("size", [(200, 150), (400, 300)])
+def test_clothing_remover_output_is_one_cutout_at_source_size(size, fake_session, tmp_path):
+    from clothing_bg_remover import ClothingBgRemover
+
+    remover = ClothingBgRemover.__new__(ClothingBgRemover)
+    remover.session = fake_session('u2net_cloth_seg')
+    remover.tile_settings = TILE_SETTINGS
+
+    source = tmp_path / "shirt.jpg"
+    garment_image(size).save(source)
+    output = remover.remove_background(str(source))
+
+    with Image.open(output) as result:
+        # Döşemeli (400x300) ve döşemesiz (200x150) yol aynı biçimi üretir
+        assert result.size == size
+        assert result.mode == "RGBA"
+
+
+def test_tiles_bypass_mask_cache(fake_session):
+    from advanced_clothing_bg_remover import AdvancedClothingBgRemover
+
+    remover = AdvancedClothingBgRemover.__new__(AdvancedClothingBgRemover)
+    remover.session = fake_session('u2net_cloth_seg')
+    remover.scheduler = None
+    remover.model_key = 'u2net_cloth_seg'
+    remover.tile_settings = TILE_SETTINGS
+    remover.mask_cache = MaskCache(max_entries=8)
+
+    img = garment_image()
+    remover.predict_inference_mask(img, inference_copy(img, 96))
+    assert remover.mask_cache.get_stats()['entries'] == 0
+
+    # Tam görüntü maskesi önbelleğe girmeye devam eder
+    small = garment_image((200, 150))
+    remover.predict_inference_mask(small, small)
+    assert remover.mask_cache.get_stats()['entries'] == 1
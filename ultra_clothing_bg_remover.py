@@ -7,14 +7,25 @@ En son AI modelleri ve akıllı optimizasyonlar ile
 import os
 import sys
 from pathlib import Path
-from PIL import Image, ImageEnhance, ImageFilter
+from PIL import Image, ImageFilter
 import numpy as np
-from rembg import remove, new_session
 import cv2
 import time
 
+from image_ops import (
+    predict_mask, apply_mask, create_variants, crop_to_alpha,
+    get_inference_settings, inference_copy, upsample_mask,
+    get_tile_settings, needs_tiling, tiled_predict_mask,
+    get_enhance_settings, enhance_rgba
+)
+from model_sessions import (
+    probe_model, load_model_selection, save_model_selection, timed_new_session, release_session,
+    quantized_model_path
+)
+from stage_timer import timed
+
 class UltraClothingBgRemover:
-    def __init__(self):
+    def __init__(self, quantized=False):
         # En son ve en gelişmiş modeller
         self.premium_models = {
             'isnet-general-use': {
@@ -49,13 +60,56 @@ class UltraClothingBgRemover:
         
         self.best_model = None
         self.session = None
+        self.load_timings = {}
+        # INT8 istenirse seçilen modelin yerel INT8 sürümü varsa o açılır
+        self.use_quantized = quantized
+        self.quantized = False
+        self.model_key = None
+        # API sunucusu mikro-batch zamanlayıcısı ve maske önbelleği bağlayabilir
+        self.scheduler = None
+        self.mask_cache = None
+        # Uyarlanır çıkarım ayarları (config.json inference_settings)
+        self.inference_settings = get_inference_settings()
+        # Çok büyük görüntüler döşemeli işlenir (config.json tile_settings)
+        self.tile_settings = get_tile_settings()
+        # İyileştirme faktörleri (config.json enhance_settings.profiles.ultra)
+        self.enhance_settings = get_enhance_settings('ultra')
         self.auto_select_best_model()
         
+    def close(self):
+        """
+        Paylaşılan oturum referansını bırak
+        """
+        if self.session is not None:
+            release_session(self.session)
+            self.session = None
+    
+    def predict_mask(self, img):
+        """
+        Maskeyi tahmin et (önbellekte varsa modeli çalıştırma)
+        """
+        if self.mask_cache is not None:
+            return self.mask_cache.get_or_compute(img, self.model_key, self._run_mask_model)
+        return self._run_mask_model(img)
+    
+    def _run_mask_model(self, img):
+        """
+        Modeli çalıştır (zamanlayıcı bağlıysa onun üzerinden)
+        """
+        if self.scheduler is not None:
+            return self.scheduler.predict_mask(img)
+        return predict_mask(self.session, img)
+    
     def auto_select_best_model(self):
         """
         Sistemde mevcut olan en iyi modeli otomatik seç
+        Oturum açmadan yerel model dosyaları yoklanır, oturum yalnızca seçilen
+        model için açılır. Seçim model_selection.json'a kaydedilir ve sonraki
+        açılışlarda önce o model denenir (yeniden seçim için dosyayı silin)
         """
         print("🔍 En iyi model aranıyor...")
+        start = time.time()
+        self.load_timings = {}
         
         # Öncelik sırası: kalite * kıyafet_skoru
         model_scores = {}
@@ -65,16 +119,49 @@ class UltraClothingBgRemover:
                 score = (info['quality'] * info['clothing_score']) / 100
                 model_scores[model_name] = score
         
-        # En yüksek skordan başlayarak dene
         sorted_models = sorted(model_scores.items(), key=lambda x: x[1], reverse=True)
         
+        # Yerel model dosyalarını yokla (indirme ve oturum yok)
+        probes = {name: probe_model(name) for name, _ in sorted_models}
+        self.load_timings['probe'] = round(time.time() - start, 3)
+        
         for model_name, score in sorted_models:
+            probe = probes[model_name]
+            if probe['available']:
+                print(f"📦 {model_name} (skor: {score:.1f}) yerelde hazır - {probe['size_mb']} MB")
+            elif not probe['known']:
+                print(f"⏭️  {model_name} bu rembg sürümünde yok")
+        
+        candidates = [name for name, _ in sorted_models if probes[name]['available']]
+        
+        # Kayıtlı seçim hâlâ yerelde varsa önce onu dene
+        record = load_model_selection()
+        if record and record.get('model') in candidates:
+            print(f"📒 Kayıtlı model: {record['model']}")
+            candidates.remove(record['model'])
+            candidates.insert(0, record['model'])
+        
+        # Hiçbiri yerelde yoksa eskisi gibi skor sırasıyla dene (ilk model indirilir)
+        if not candidates:
+            candidates = [name for name, _ in sorted_models if probes[name]['known']]
+        
+        for model_name in candidates:
             try:
-                print(f"🧪 Test ediliyor: {model_name} (skor: {score:.1f})")
-                self.session = new_session(model_name)
+                print(f"🧪 Yükleniyor: {model_name} (skor: {model_scores[model_name]:.1f})")
+                quantized = bool(self.use_quantized and quantized_model_path(model_name))
+                self.session, seconds = timed_new_session(model_name, quantized=quantized)
                 self.best_model = model_name
-                print(f"✅ Seçildi: {model_name}")
+                self.quantized = quantized
+                self.model_key = f"{model_name}:int8" if quantized else model_name
+                self.load_timings['session'] = seconds
+                self.load_timings['total'] = round(time.time() - start, 3)
+                save_model_selection(model_name, self.load_timings)
+                print(f"✅ Seçildi: {self.model_key}")
+                if self.use_quantized and not quantized:
+                    print(f"⚠️  {model_name} için INT8 model bulunamadı, FP32 kullanılıyor")
                 print(f"📋 {self.premium_models[model_name]['description']}")
+                print(f"⏱️  Yoklama {self.load_timings['probe']:.3f}s, "
+                      f"oturum {seconds:.2f}s, toplam {self.load_timings['total']:.2f}s")
                 return
             except Exception as e:
                 print(f"❌ {model_name} yüklenemedi: {e}")
@@ -82,15 +169,27 @@ class UltraClothingBgRemover:
         
         # Hiçbiri çalışmazsa son çare
         print("⚠️  Premium modeller yüklenemedi, varsayılan kullanılıyor...")
-        self.session = new_session('u2net')
+        self.session, seconds = timed_new_session('u2net')
         self.best_model = 'u2net'
+        self.model_key = 'u2net'
+        self.load_timings['session'] = seconds
+        self.load_timings['total'] = round(time.time() - start, 3)
+    
+    @staticmethod
+    def _open_image(image):
+        """
+        Dosya yolu ya da bellekteki PIL görüntüsünü aynı şekilde kabul et
+        """
+        if isinstance(image, Image.Image):
+            return image
+        return Image.open(image)
     
     def intelligent_preprocessing(self, image_path):
         """
         Akıllı ön işleme - görüntü tipine göre optimize et
         """
         try:
-            img = Image.open(image_path)
+            img = self._open_image(image_path)
             original_size = img.size
             
             print(f"🧠 Akıllı analiz: {original_size[0]}x{original_size[1]}")
@@ -122,9 +221,65 @@ class UltraClothingBgRemover:
             
         except Exception as e:
             print(f"❌ Ön işleme hatası: {e}")
-            return Image.open(image_path)
+            return self._open_image(image_path)
+    
+    def adaptive_preprocessing(self, image_path):
+        """
+        Uyarlanır çıkarım için (kaynak görüntü, model girdisi) döndür
+        Kaynak çözünürlüğü korunur; model yalnızca uzun kenarı max_side'a
+        küçültülmüş kopyayı görür
+        """
+        img = self._open_image(image_path)
+        if img.mode != 'RGB':
+            img = img.convert('RGB')
+        
+        model_img = inference_copy(img, self.inference_settings['max_side'])
+        print(f"🔬 Uyarlanır çıkarım: {img.size} -> model {model_img.size}")
+        return img, model_img
+    
+    def remove_background_image(self, image, adaptive=False):
+        """
+        Ultra arka plan kaldırma (bellek içi)
+        Dosya yolu ya da PIL görüntüsü alır, RGBA PIL görüntüsü döndürür
+        adaptive: maske küçük kopyada tahmin edilip kılavuzlu filtre ile
+        kaynak çözünürlüğe büyütülür, çıktı kaynak boyutunda olur
+        """
+        try:
+            with timed('decode'):
+                source = self._open_image(image)
+                source.load()
+            
+            with timed('preprocess'):
+                large = needs_tiling(source.size, self.tile_settings)
+                
+                # Akıllı ön işleme
+                if large:
+                    # 2048'e küçültmek yerine tam çözünürlükte döşemeli segmentasyon
+                    processed_img = source.convert('RGB')
+                    print(f"🧩 Büyük görüntü: {processed_img.size}, döşemeli çıkarım")
+                elif adaptive:
+                    processed_img, model_img = self.adaptive_preprocessing(source)
+                else:
+                    processed_img = model_img = self.intelligent_preprocessing(source)
+            
+            # Arka planı kaldır (PNG'ye çevirmeden doğrudan modele ver)
+            print("🧠 AI model çalışıyor...")
+            with timed('inference'):
+                if large:
+                    # Döşeme maskeleri bir daha sorulmaz; maske önbelleğine yazılmaz
+                    mask = tiled_predict_mask(self._run_mask_model, processed_img, self.tile_settings)
+                else:
+                    mask = self.predict_mask(model_img)
+            
+            with timed('compose'):
+                mask = upsample_mask(mask, processed_img, self.inference_settings)
+                return apply_mask(processed_img, mask)
+            
+        except Exception as e:
+            print(f"❌ Ultra işlem hatası: {e}")
+            return None
     
-    def ultra_background_removal(self, input_path, output_path=None):
+    def ultra_background_removal(self, input_path, output_path=None, adaptive=False):
         """
         Ultra gelişmiş arka plan kaldırma
         """
@@ -134,18 +289,9 @@ class UltraClothingBgRemover:
             
             start_time = time.time()
             
-            # Akıllı ön işleme
-            processed_img = self.intelligent_preprocessing(input_path)
-            
-            # Byte array'e çevir
-            import io
-            img_byte_arr = io.BytesIO()
-            processed_img.save(img_byte_arr, format='PNG', quality=95)
-            input_data = img_byte_arr.getvalue()
-            
-            # Arka planı kaldır
-            print("🧠 AI model çalışıyor...")
-            output_data = remove(input_data, session=self.session)
+            result_img = self.remove_background_image(input_path, adaptive=adaptive)
+            if result_img is None:
+                return None
             
             process_time = time.time() - start_time
             
@@ -155,8 +301,8 @@ class UltraClothingBgRemover:
                 output_path = input_file.parent / f"{input_file.stem}_ultra_bg_removed.png"
             
             # Kaydet
-            with open(output_path, 'wb') as f:
-                f.write(output_data)
+            with timed('encode'):
+                result_img.save(output_path, "PNG")
             
             print(f"✅ Tamamlandı: {process_time:.2f} saniye")
             print(f"📁 Çıktı: {output_path}")
@@ -167,29 +313,33 @@ class UltraClothingBgRemover:
             print(f"❌ Ultra işlem hatası: {e}")
             return None
     
-    def ai_positioning(self, image_path, output_path=None, mode='smart'):
+    def ai_positioning_image(self, img, mode='smart', alpha_threshold=0):
         """
-        AI destekli akıllı konumlandırma
+        AI destekli akıllı konumlandırma (bellek içi)
+        Nesne bulunamazsa ya da hata olursa girdiyi aynen döndürür
+        alpha_threshold: nesneye sayılacak en düşük alpha
         """
+        with timed('positioning'):
+            return self._ai_positioning_image(img, mode, alpha_threshold)
+    
+    def _ai_positioning_image(self, img, mode, alpha_threshold):
         try:
-            img = Image.open(image_path).convert("RGBA")
+            if img.mode != "RGBA":
+                img = img.convert("RGBA")
             width, height = img.size
             
             print(f"🧠 AI konumlandırma: {width}x{height}")
             
             # Alpha kanalından nesne analizi
-            alpha = np.array(img)[:,:,3]
-            non_zero_indices = np.where(alpha > 0)
+            object_img, box = crop_to_alpha(img, alpha_threshold)
             
-            if len(non_zero_indices[0]) == 0:
+            if box is None:
                 print("⚠️  Nesne bulunamadı")
-                return image_path
+                return img
             
-            # Nesne sınırları
-            top = np.min(non_zero_indices[0])
-            bottom = np.max(non_zero_indices[0])
-            left = np.min(non_zero_indices[1])
-            right = np.max(non_zero_indices[1])
+            # Nesne sınırları (sağ/alt dahil)
+            left, top = box[0], box[1]
+            right, bottom = box[2] - 1, box[3] - 1
             
             object_height = bottom - top
             object_width = right - left
@@ -212,19 +362,36 @@ class UltraClothingBgRemover:
             else:
                 paste_y = (canvas_height - object_height) // 2  # Merkez
             
-            # Nesneyi kes ve yapıştır
-            crop_box = (left, top, right + 1, bottom + 1)
-            object_img = img.crop(crop_box)
+            # Nesneyi yapıştır
             new_canvas.paste(object_img, (paste_x, paste_y), object_img)
             
+            print(f"✅ AI konumlandırma: {canvas_width}x{canvas_height}")
+            
+            return new_canvas
+            
+        except Exception as e:
+            print(f"❌ AI konumlandırma hatası: {e}")
+            return img
+    
+    def ai_positioning(self, image_path, output_path=None, mode='smart', alpha_threshold=0):
+        """
+        AI destekli akıllı konumlandırma
+        alpha_threshold: nesneye sayılacak en düşük alpha
+        """
+        try:
+            with timed('decode'):
+                img = Image.open(image_path).convert("RGBA")
+            positioned = self.ai_positioning_image(img, mode=mode, alpha_threshold=alpha_threshold)
+            if positioned is img:
+                return image_path
+            
             # Çıktı dosyası
             if output_path is None:
                 input_file = Path(image_path)
                 output_path = input_file.parent / f"{input_file.stem}_ai_positioned.png"
             
-            new_canvas.save(output_path, "PNG")
-            
-            print(f"✅ AI konumlandırma: {canvas_width}x{canvas_height}")
+            with timed('encode'):
+                positioned.save(output_path, "PNG")
             
             return str(output_path)
             
@@ -232,34 +399,34 @@ class UltraClothingBgRemover:
             print(f"❌ AI konumlandırma hatası: {e}")
             return image_path
     
+    def enhance_image(self, img):
+        """
+        E-ticaret iyileştirmesi (bellek içi), hata olursa girdiyi döndürür
+        """
+        try:
+            # Beyaz zemin + tek renk dönüşümü + tek keskinlik evrişimi
+            with timed('enhance'):
+                return enhance_rgba(img, self.enhance_settings)
+            
+        except Exception as e:
+            print(f"❌ İyileştirme hatası: {e}")
+            return img
+    
     def enhance_for_ecommerce(self, image_path, output_path=None):
         """E-ticaret iyileştirmesi"""
         try:
-            img = Image.open(image_path).convert("RGBA")
-            
-            # RGB kısmını al
-            rgb_img = Image.new("RGB", img.size, (255, 255, 255))
-            rgb_img.paste(img, mask=img.split()[3])
-            
-            # İyileştirmeler
-            enhancer = ImageEnhance.Contrast(rgb_img)
-            rgb_img = enhancer.enhance(1.15)
-            
-            enhancer = ImageEnhance.Brightness(rgb_img)
-            rgb_img = enhancer.enhance(1.05)
-            
-            enhancer = ImageEnhance.Sharpness(rgb_img)
-            rgb_img = enhancer.enhance(1.1)
-            
-            # Alpha geri ekle
-            final_img = rgb_img.convert("RGBA")
-            final_img.putalpha(img.split()[3])
+            with timed('decode'):
+                img = Image.open(image_path).convert("RGBA")
+            final_img = self.enhance_image(img)
+            if final_img is img:
+                return image_path
             
             if output_path is None:
                 input_file = Path(image_path)
                 output_path = input_file.parent / f"{input_file.stem}_ultra_enhanced.png"
             
-            final_img.save(output_path, "PNG")
+            with timed('encode'):
+                final_img.save(output_path, "PNG")
             print(f"✅ Ultra iyileştirme: {output_path}")
             
             return str(output_path)
@@ -276,8 +443,6 @@ class UltraClothingBgRemover:
             else:
                 output_dir = Path(output_dir)
             
-            output_dir.mkdir(exist_ok=True)
-            
             img = Image.open(image_path).convert("RGBA")
             base_name = Path(image_path).stem
             
@@ -289,20 +454,14 @@ class UltraClothingBgRemover:
                 "xl": (1600, 1600)
             }
             
-            created_files = []
-            
-            for variant_name, size in variants.items():
-                img_copy = img.copy()
-                img_copy.thumbnail(size, Image.Resampling.LANCZOS)
-                
-                canvas = Image.new("RGBA", size, (0, 0, 0, 0))
-                paste_x = (size[0] - img_copy.width) // 2
-                paste_y = (size[1] - img_copy.height) // 2
-                canvas.paste(img_copy, (paste_x, paste_y), img_copy)
-                
-                variant_path = output_dir / f"{base_name}_ultra_{variant_name}.png"
-                canvas.save(variant_path, "PNG")
-                created_files.append(str(variant_path))
+            # Tek kaynaktan piramit küçültme + paralel PNG encode
+            paths = create_variants(
+                img,
+                variants,
+                output_dir=output_dir,
+                file_names={name: f"{base_name}_ultra_{name}.png" for name in variants}
+            )
+            created_files = [paths[name] for name in variants]
             
             return created_files
             
@@ -310,20 +469,55 @@ class UltraClothingBgRemover:
             print(f"❌ Varyant hatası: {e}")
             return []
     
-    def ultra_process(self, input_path, options=None):
+    def process_options(self, options=None):
         """
-        Ultra tam işlem pipeline'ı
+        Varsayılan ultra işlem seçeneklerini verilenlerle birleştir
         """
         default_options = {
             'ai_positioning': True,
             'enhance': True,
             'create_variants': True,
-            'positioning_mode': 'smart'
+            'positioning_mode': 'smart',
+            'adaptive_inference': self.inference_settings['adaptive']
         }
         
         if options:
             default_options.update(options)
         
+        return default_options
+    
+    def ultra_process_image(self, image, options=None):
+        """
+        Ultra işlem pipeline'ı (bellek içi)
+        Dosya yolu ya da PIL görüntüsü alır, son RGBA görüntüyü döndürür;
+        ara dosya ve varyant yazılmaz
+        """
+        default_options = self.process_options(options)
+        
+        current_img = self.remove_background_image(
+            image,
+            adaptive=default_options['adaptive_inference']
+        )
+        if current_img is None:
+            return None
+        
+        if default_options['ai_positioning']:
+            current_img = self.ai_positioning_image(
+                current_img,
+                mode=default_options['positioning_mode']
+            )
+        
+        if default_options['enhance']:
+            current_img = self.enhance_image(current_img)
+        
+        return current_img
+    
+    def ultra_process(self, input_path, options=None):
+        """
+        Ultra tam işlem pipeline'ı
+        """
+        default_options = self.process_options(options)
+        
         print(f"\n{'='*60}")
         print(f"🚀 ULTRA PROCESS: {os.path.basename(input_path)}")
         print(f"{'='*60}")
@@ -331,7 +525,10 @@ class UltraClothingBgRemover:
         current_file = input_path
         
         # 1. Ultra arka plan kaldırma
-        bg_removed = self.ultra_background_removal(current_file)
+        bg_removed = self.ultra_background_removal(
+            current_file,
+            adaptive=default_options['adaptive_inference']
+        )
         if not bg_removed:
             return None
         current_file = bg_removed
@@ -351,7 +548,8 @@ class UltraClothingBgRemover:
         
         # 4. Varyantlar
         if default_options['create_variants']:
-            variants = self.create_variants(current_file)
+            with timed('variants'):
+                variants = self.create_variants(current_file)
             print(f"✅ {len(variants)} varyant oluşturuldu")
         
         print(f"\n🎉 ULTRA İŞLEM TAMAMLANDI!")
@@ -371,10 +569,21 @@ Kullanım:
   python ultra_clothing_bg_remover.py <görüntü>
   python ultra_clothing_bg_remover.py --smart <görüntü>
   python ultra_clothing_bg_remover.py --center <görüntü>
+  
+  --quantized: INT8 modeli kullan (quantize_models.py ile üretilmiş olmalı)
+  --adaptive:  Modeli küçültülmüş kopyada çalıştır, maskeyi kaynak çözünürlüğe büyüt
         """)
         return
     
-    remover = UltraClothingBgRemover()
+    quantized = '--quantized' in sys.argv
+    if quantized:
+        sys.argv.remove('--quantized')
+    
+    adaptive = '--adaptive' in sys.argv
+    if adaptive:
+        sys.argv.remove('--adaptive')
+    
+    remover = UltraClothingBgRemover(quantized=quantized)
     
     if sys.argv[1] == "--smart":
         if len(sys.argv) < 3:
@@ -394,6 +603,9 @@ Kullanım:
         input_path = sys.argv[1]
         options = {'positioning_mode': 'smart'}
     
+    if adaptive:
+        options['adaptive_inference'] = True
+    
     result = remover.ultra_process(input_path, options)
     
     if result: